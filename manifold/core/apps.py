@@ -7,4 +7,6 @@ class CoreConfig(AppConfig):
 
     def ready(self):
         import core.signals
+
+        core.signals.connect_search_index()
         # import core.utils.user_signal
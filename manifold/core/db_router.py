@@ -1,39 +1,26 @@
-from django.core.cache import cache
+from .utils.tenant_context import get_current_tenant
 
 
 class MultiTenantRouter:
+    """
+    Routes every query to the tenant database selected for the current request
+    by `TenantMiddleware`. The tenant is read from a context variable, so the
+    lookup costs no cache round-trip and concurrent requests for different
+    tenants never see each other's selection.
+    """
+
     def db_for_read(self, model, **hints):
         """Direct read queries to the correct tenant database."""
-        tenant_db = cache.get("tenant_db")
-
-        if not tenant_db:
-            tenant_name = hints.get("tenant_name", None)
-            if tenant_name:
-                tenant_db = cache.get(f"tenant_db")
-
-        if tenant_db:
-            return tenant_db
-
-        return "default"
+        return get_current_tenant() or hints.get("tenant_name") or "default"
 
     def db_for_write(self, model, **hints):
         """Direct write queries to the correct tenant database."""
-        tenant_db = cache.get("tenant_db")
-
-        if not tenant_db:
-            tenant_name = hints.get("tenant_name", None)
-            if tenant_name:
-                tenant_db = cache.get(f"tenant_db")
-
-        if tenant_db:
-            return tenant_db
-
-        return "default"
+        return get_current_tenant() or hints.get("tenant_name") or "default"
 
     def allow_relation(self, obj1, obj2, **hints):
         """Allow relations if both objects are in the same database."""
-        db_obj1 = cache.get("tenant_db")
-        db_obj2 = cache.get("tenant_db")
+        db_obj1 = obj1._state.db
+        db_obj2 = obj2._state.db
 
         if db_obj1 and db_obj2:
             return db_obj1 == db_obj2
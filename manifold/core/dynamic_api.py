@@ -1,4 +1,8 @@
 import importlib
+import threading
+
+from django.apps import apps
+from django.conf import settings
 from django.http import HttpResponseBadRequest, HttpResponseNotFound
 from rest_framework.viewsets import ViewSetMixin
 
@@ -11,39 +15,158 @@ DEFAULT_ACTIONS = {
     'DELETE': 'destroy'
 }
 
-def dynamic_forward_view(request, target_path):
+
+class TargetNotCallable(ValueError):
+    pass
+
+
+class ResolvedTarget:
     """
-    Dynamically resolve and forward the request to the specified function/class.
-    Supports DRF ViewSets, APIViews, CBVs, FBVs.
-    Accepts both dot-separated and slash-separated paths.
+    A resolved target path with its view callables prebuilt. ViewSets get one
+    callable per HTTP method, built on first use.
+    """
+
+    def __init__(self, target):
+        self.target = target
+        self.is_viewset = isinstance(target, type) and issubclass(target, ViewSetMixin)
+        self.view = None
+        self.viewset_views = {}
+        if not self.is_viewset:
+            if isinstance(target, type) and hasattr(target, 'as_view'):
+                self.view = target.as_view()
+            else:
+                self.view = target
+
+    def get_view(self, http_method):
+        if not self.is_viewset:
+            return self.view
+
+        view = self.viewset_views.get(http_method)
+        if view is None:
+            action = DEFAULT_ACTIONS.get(http_method)
+            if action is None:
+                return None
+            view = self.target.as_view({http_method.lower(): action})
+            self.viewset_views[http_method] = view
+        return view
+
+
+def get_allowed_modules(exposed, installed):
+    """
+    Top-level modules reachable through `dynamic_forward_view`: every exposed
+    Django app that is installed and, for the "<app>_app" wrappers created by
+    `installdjangoapp`, the custom app package "<app>" it adds to `sys.path`.
+    """
+    allowed = []
+    for app in exposed:
+        if app not in installed:
+            continue
+        allowed.append(app)
+        if app.endswith("_app"):
+            allowed.append(app[: -len("_app")])
+    return tuple(allowed)
+
+
+class DispatchTable:
     """
-    try:
+    Cache of target paths resolved by `dynamic_forward_view`.
+
+    Only modules of the apps in `CUSTOM_APPS` (or `DYNAMIC_API_ALLOWED_APPS`
+    when set) and of their custom app packages can be reached; the allowlist
+    is built from the installed apps on first use. Resolved paths keep their prebuilt view callables, and paths
+    that fail to resolve are remembered (up to `DYNAMIC_API_MAX_NEGATIVE`,
+    default 1000) so repeated calls skip the import machinery.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._allowed_apps = None
+        self._targets = {}
+        self._missing = {}
+
+    @property
+    def allowed_apps(self):
+        if self._allowed_apps is None:
+            exposed = getattr(
+                settings,
+                "DYNAMIC_API_ALLOWED_APPS",
+                getattr(settings, "CUSTOM_APPS", []),
+            )
+            installed = {app_config.name for app_config in apps.get_app_configs()}
+            self._allowed_apps = get_allowed_modules(exposed, installed)
+        return self._allowed_apps
+
+    def is_allowed(self, module_path):
+        return any(
+            module_path == app or module_path.startswith(f"{app}.")
+            for app in self.allowed_apps
+        )
+
+    def resolve(self, target_path):
+        """
+        Returns:
+            tuple: (ResolvedTarget or None, the exception that prevented
+            resolving it or None).
+        """
+        resolved = self._targets.get(target_path)
+        if resolved is not None:
+            return resolved, None
+        error = self._missing.get(target_path)
+        if error is not None:
+            return None, error
+
+        try:
+            resolved = self._import(target_path)
+        except (ImportError, AttributeError, ValueError) as e:
+            with self._lock:
+                if len(self._missing) < getattr(settings, "DYNAMIC_API_MAX_NEGATIVE", 1000):
+                    self._missing[target_path] = e
+            return None, e
+
+        with self._lock:
+            self._targets[target_path] = resolved
+        return resolved, None
+
+    def _import(self, target_path):
         # Convert slashes to dots to allow flexible path formats
         normalized_path = target_path.replace('/', '.')
-        
+
         module_path, func_name = normalized_path.rsplit('.', 1)
+        if not self.is_allowed(module_path):
+            raise ImportError(f"Module '{module_path}' is not exposed")
+        if func_name.startswith('_'):
+            raise AttributeError(f"'{func_name}' is private")
+
         module = importlib.import_module(module_path)
         target = getattr(module, func_name)
+        if not callable(target):
+            raise TargetNotCallable("Target is not callable.")
+        return ResolvedTarget(target)
 
-        if callable(target):
-            if isinstance(target, type) and issubclass(target, ViewSetMixin):
-                http_method = request.method.upper()
-                action = DEFAULT_ACTIONS.get(http_method)
-
-                if action is None:
-                    return HttpResponseBadRequest(f"HTTP method '{http_method}' not supported for ViewSet.")
+    def clear(self):
+        with self._lock:
+            self._allowed_apps = None
+            self._targets.clear()
+            self._missing.clear()
 
-                view_func = target.as_view({http_method.lower(): action})
-                return view_func(request)
 
-            elif isinstance(target, type) and hasattr(target, 'as_view'):
-                view_func = target.as_view()
-                return view_func(request)
+dispatch_table = DispatchTable()
 
-            else:
-                return target(request)
 
-        return HttpResponseBadRequest("Target is not callable.")
+def dynamic_forward_view(request, target_path):
+    """
+    Dynamically resolve and forward the request to the specified function/class.
+    Supports DRF ViewSets, APIViews, CBVs, FBVs.
+    Accepts both dot-separated and slash-separated paths.
+    """
+    resolved, error = dispatch_table.resolve(target_path)
+    if isinstance(error, TargetNotCallable):
+        return HttpResponseBadRequest(str(error))
+    if resolved is None:
+        return HttpResponseNotFound(f"Function not found: {error}")
 
-    except (ImportError, AttributeError, ValueError) as e:
-        return HttpResponseNotFound(f"Function not found: {e}")
+    http_method = request.method.upper()
+    view_func = resolved.get_view(http_method)
+    if view_func is None:
+        return HttpResponseBadRequest(f"HTTP method '{http_method}' not supported for ViewSet.")
+    return view_func(request)
@@ -0,0 +1,12 @@
+import django_filters as filters
+from core.models.data_job import DataJob
+
+
+class DataJobFilter(filters.FilterSet):
+    id = filters.CharFilter(label="ID")
+    status = filters.CharFilter(label="Status")
+    job_type = filters.CharFilter(label="Job Type")
+
+    class Meta:
+        model = DataJob
+        fields = ["id", "status", "job_type", "model_name"]
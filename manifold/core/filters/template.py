@@ -1,116 +1,120 @@
+import copy
+import threading
+
 import django_filters
 
+# Lookups generated for every declared filter, each also with an `__exclude` variant
+CONDITIONS = ["lt", "gt", "lte", "gte", "icontains", "istartswith", "iendswith"]
+ID_CONDITIONS = ["lt", "gt", "lte", "gte"]
+
 
 class DynamicFilterSet(django_filters.FilterSet):
+    """
+    A FilterSet that accepts comparison, pattern, `__exclude` and `__isnull`
+    variants of every declared filter, plus `start`/`stop`/`first`/`last`/
+    `page` helpers.
+
+    The generated filters are built once per FilterSet class and kept on the
+    class; an instance copies only those its query parameters refer to.
+    """
+
     class Meta:
         model = None
         fields = ()
 
+    _expanded_filters_lock = threading.Lock()
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
-        # Create a list to store dynamically added keys
-        dynamic_keys = []
-
-        # Iterate over the existing keys
-        for field_name in list(self.filters.keys()):
-            # Iterate over the conditions
-            for condition in [
-                "lt",
-                "gt",
-                "lte",
-                "gte",
-                "icontains",
-                "istartswith",
-                "iendswith",
-            ]:
-                # Create the new key
-                new_field_name = f"{field_name}__{condition}"
-                # Add it to the list
-                dynamic_keys.append(new_field_name)
-                # Add it to the filters dictionary
-                self.filters[new_field_name] = django_filters.CharFilter(
+        expanded_filters = self.get_expanded_filters()
+        model = self.queryset.model
+        for name in self.get_referenced_filter_names():
+            template = expanded_filters.get(name)
+            if template is None:
+                continue
+            filter_ = copy.deepcopy(template)
+            filter_.model = model
+            filter_.parent = self
+            self.filters[name] = filter_
+
+        # Store the page_length value, defaulting to 5
+        self.page_length_value = 5
+        self.total_pages = 1  # Default total pages
+
+    def get_referenced_filter_names(self):
+        """
+        The filter names used in the bound data, without the form prefix.
+        """
+        prefix = f"{self.form_prefix}-" if self.form_prefix else ""
+        return [
+            key[len(prefix) :] for key in self.data.keys() if key.startswith(prefix)
+        ]
+
+    @classmethod
+    def get_expanded_filters(cls):
+        """
+        Returns:
+            dict: The generated filters of this class by name, built on first
+            use. They are templates shared by all instances and must be copied
+            before use.
+        """
+        expanded_filters = cls.__dict__.get("_expanded_filters")
+        if expanded_filters is None:
+            with cls._expanded_filters_lock:
+                expanded_filters = cls.__dict__.get("_expanded_filters")
+                if expanded_filters is None:
+                    expanded_filters = cls.build_expanded_filters()
+                    cls._expanded_filters = expanded_filters
+        return expanded_filters
+
+    @classmethod
+    def build_expanded_filters(cls):
+        filters = {}
+        for field_name in cls.base_filters:
+            for condition in CONDITIONS:
+                filters[f"{field_name}__{condition}"] = django_filters.CharFilter(
                     field_name=field_name, lookup_expr=condition
                 )
-
-                # Add __exclude filter for this condition
-                new_exclude_field_name = f"{field_name}__{condition}__exclude"
-                dynamic_keys.append(new_exclude_field_name)
-                # Add a CharFilter with exclude=True to filter out results not matching the condition
-                self.filters[new_exclude_field_name] = django_filters.CharFilter(
-                    field_name=field_name, lookup_expr=condition, exclude=True
+                # Filter out results matching the condition
+                filters[f"{field_name}__{condition}__exclude"] = (
+                    django_filters.CharFilter(
+                        field_name=field_name, lookup_expr=condition, exclude=True
+                    )
                 )
 
-            # Add __exclude filter for exact matching
-            new_exclude_field_name = f"{field_name}__exclude"
-            dynamic_keys.append(new_exclude_field_name)
-            # Add a CharFilter with exact matching and exclude=True
-            self.filters[new_exclude_field_name] = django_filters.CharFilter(
+            filters[f"{field_name}__exclude"] = django_filters.CharFilter(
                 field_name=field_name, lookup_expr="exact", exclude=True
             )
-
-            # Add __isnull filter for checking non-null values
-            new_isnull_field_name = f"{field_name}__isnull"
-            dynamic_keys.append(new_isnull_field_name)
-            self.filters[new_isnull_field_name] = django_filters.BooleanFilter(
+            filters[f"{field_name}__isnull"] = django_filters.BooleanFilter(
                 field_name=field_name, lookup_expr="isnull"
             )
-        # Add filters for the 'id' field with comparison operators
-        for condition in ["lt", "gt", "lte", "gte"]:
-            # Create the new key for the 'id' field with the condition
-            new_field_name = f"id__{condition}"
-            # Add it to the list
-            dynamic_keys.append(new_field_name)
-            # Add it to the filters dictionary
-            self.filters[new_field_name] = django_filters.NumberFilter(
+
+        # Numeric comparisons on the 'id' field
+        for condition in ID_CONDITIONS:
+            filters[f"id__{condition}"] = django_filters.NumberFilter(
                 field_name="id", lookup_expr=condition
             )
-
-            # Add __exclude filter for id field
-            new_exclude_field_name = f"id__{condition}__exclude"
-            dynamic_keys.append(new_exclude_field_name)
-            # Add it to the filters dictionary
-            self.filters[new_exclude_field_name] = django_filters.NumberFilter(
+            filters[f"id__{condition}__exclude"] = django_filters.NumberFilter(
                 field_name="id", lookup_expr=condition, exclude=True
             )
+        filters["id__isnull"] = django_filters.BooleanFilter(
+            field_name="id", lookup_expr="isnull"
+        )
 
-            # Add __isnull filter for id field
-            new_isnull_field_name = f"id__isnull"
-            dynamic_keys.append(new_isnull_field_name)
-            self.filters[new_isnull_field_name] = django_filters.BooleanFilter(
-                field_name="id", lookup_expr="isnull"
-            )
-
-        # Add start and stop filters for id field
-        dynamic_keys.extend(["start", "stop"])
-        self.filters["start"] = django_filters.NumberFilter(
+        # Start and stop filters for the id field
+        filters["start"] = django_filters.NumberFilter(
             field_name="id", lookup_expr="gte"
         )
-        self.filters["stop"] = django_filters.NumberFilter(
+        filters["stop"] = django_filters.NumberFilter(
             field_name="id", lookup_expr="lte"
         )
 
-        # Add filters for first and last entries
-        dynamic_keys.extend(["first", "last"])
-        self.filters["first"] = django_filters.NumberFilter(method=self.filter_first)
-        self.filters["last"] = django_filters.NumberFilter(method=self.filter_last)
-
-        # Add filters for page
-        dynamic_keys.extend(["page"])
-        self.filters["page"] = django_filters.CharFilter(method=self.filter_page)
-
-        # Store the page_length value, defaulting to 5
-        self.page_length_value = 5
-        self.total_pages = 1  # Default total pages
-
-        # Now iterate over the dynamically added keys and add corresponding filter methods
-        for key in dynamic_keys:
-            method_name = f"filter_{key}"
-            setattr(self, method_name, self.create_filter_method(method_name))
-
-    def create_filter_method(self, method_name):
-        # Add more custom filter methods here if needed
-        return None
+        # First and last entries, and pages
+        filters["first"] = django_filters.NumberFilter(method="filter_first")
+        filters["last"] = django_filters.NumberFilter(method="filter_last")
+        filters["page"] = django_filters.CharFilter(method="filter_page")
+        return filters
 
     def filter_first(self, queryset, name, value):
         return queryset[: int(value)]
@@ -0,0 +1,45 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+
+from core.utils.search_index import search_index
+
+
+class Command(BaseCommand):
+    help = "Build the search index of doctypes that configure search fields"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "models",
+            nargs="*",
+            help="Models to index as app_label.ModelName (default: all indexed models)",
+        )
+        parser.add_argument("--database", help="Database alias (default: routed)")
+        parser.add_argument(
+            "--chunk-size", type=int, default=1000, help="Records per batch"
+        )
+
+    def handle(self, *args, **options):
+        if options["models"]:
+            try:
+                models = [apps.get_model(label) for label in options["models"]]
+            except (LookupError, ValueError) as e:
+                raise CommandError(str(e))
+        else:
+            models = [
+                model for model in apps.get_models() if search_index.is_indexed(model)
+            ]
+
+        for model in models:
+            if not search_index.is_indexed(model):
+                self.stdout.write(
+                    self.style.WARNING(
+                        f"{model._meta.label} has no search fields configured, skipped"
+                    )
+                )
+                continue
+            documents = search_index.rebuild(
+                model, using=options["database"], chunk_size=options["chunk_size"]
+            )
+            self.stdout.write(
+                self.style.SUCCESS(f"Indexed {documents} {model._meta.label} records")
+            )
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from core.utils.data_jobs import DataJobWorker
+
+
+class Command(BaseCommand):
+    help = "Run queued data import jobs on a local process pool"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, help="Number of worker processes")
+        parser.add_argument(
+            "--poll-interval", type=float, help="Seconds between queue polls"
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Process the jobs currently queued, then exit",
+        )
+
+    def handle(self, *args, **options):
+        worker = DataJobWorker(
+            workers=options["workers"], poll_interval=options["poll_interval"]
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Data job worker started with {worker.workers} processes"
+            )
+        )
+        try:
+            worker.run(once=options["once"])
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.WARNING("Data job worker stopped"))
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from core.utils.notifications import dispatch_notifications
+
+
+class Command(BaseCommand):
+    help = "Send the queued email and SMS notifications"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--poll-interval", type=float, help="Seconds between outbox polls"
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Send the notifications currently due, then exit",
+        )
+
+    def handle(self, *args, **options):
+        if options["once"]:
+            processed = dispatch_notifications(once=True)
+            self.stdout.write(
+                self.style.SUCCESS(f"Dispatched {processed} notifications")
+            )
+            return
+
+        self.stdout.write(self.style.SUCCESS("Notification dispatcher started"))
+        try:
+            dispatch_notifications(poll_interval=options["poll_interval"])
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.WARNING("Notification dispatcher stopped"))
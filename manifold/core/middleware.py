@@ -1,8 +1,6 @@
 from threading import local
 
 from django.conf import settings
-from django.core.cache import cache
-from django.db import connections
 from django.utils import timezone
 from django.utils.deprecation import MiddlewareMixin
 from rest_framework.authentication import (
@@ -13,12 +11,11 @@ from rest_framework.authentication import (
 from rest_framework.exceptions import AuthenticationFailed
 from rest_framework.request import Request
 
-from .models import UserIPAddress
+from .utils.activity_tracker import activity_tracker
+from .utils.tenant_connections import tenant_connections
+from .utils.tenant_context import reset_current_tenant, set_current_tenant
+from .utils.tenant_index import tenant_index
 
-import os
-import json
-from pathlib import Path
-from django.conf import settings
 
 _request_local = local()
 
@@ -43,13 +40,10 @@ class UserActivityMiddleware:
 
         # If user is authenticated (either via session or API token)
         if request.user and request.user.is_authenticated:
-            # Update last activity timestamp
+            # Buffer the activity timestamp and IP address; they are written in batches
             request.user.last_activity = timezone.now()
-            request.user.save()
             _request_local.user = request.user
-
-            # Log the unique IP address
-            self.log_user_ip(request.user, ip_address)
+            activity_tracker.record(request.user, ip_address, request.user.last_activity)
 
         # Proceed with the response
         response = self.get_response(request)
@@ -84,12 +78,15 @@ class UserActivityMiddleware:
             ip = request.META.get("REMOTE_ADDR")
         return ip
 
-    def log_user_ip(self, user, ip_address):
-        """Log the user's IP address if it hasn't been logged before."""
-        UserIPAddress.objects.get_or_create(user=user, ip_address=ip_address)
-
 
 class TenantMiddleware(MiddlewareMixin):
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        # Build the domain index and open the busiest connections once when
+        # the worker loads its middleware
+        tenant_index.refresh(force=True)
+        tenant_connections.prewarm()
+
     def process_request(self, request):
         """Determine the tenant's database and set it in the request context."""
         tenant_name = request.headers.get("X-Tenant")
@@ -99,38 +96,28 @@ class TenantMiddleware(MiddlewareMixin):
         if not tenant_name or tenant_name not in settings.DATABASES:
             request.tenant_db = "default"  # Default to main database
             request.allowed_apps = settings.INSTALLED_APPS  # Default access
-            return
-
-        # Set the tenant database context in the request
-        request.tenant_db = tenant_name
-
-        # Optionally, set allowed apps if needed (if you have a list for each tenant)
-        # request.allowed_apps = settings.TENANT_APPS.get(tenant_name, settings.INSTALLED_APPS)
-
-        # Store the tenant's database info in the cache for later use in the router
-        cache.set(f"tenant_db", tenant_name, timeout=300)  # Cache for 5 minutes
-
-        # Switch to the tenant's database connection
-        connections["default"].close()
-        connections[tenant_name] = connections[tenant_name]
+        else:
+            # Set the tenant database context in the request
+            request.tenant_db = tenant_name
+
+            # Optionally, set allowed apps if needed (if you have a list for each tenant)
+            # request.allowed_apps = settings.TENANT_APPS.get(tenant_name, settings.INSTALLED_APPS)
+
+        # Route this request's queries to the tenant database. The selection is
+        # local to the request, so connections stay open and are reused
+        # according to each database's CONN_MAX_AGE.
+        request._tenant_token = set_current_tenant(request.tenant_db)
+        tenant_connections.acquire(request.tenant_db)
+
+    def process_response(self, request, response):
+        token = getattr(request, "_tenant_token", None)
+        if token is not None:
+            reset_current_tenant(token)
+            request._tenant_token = None
+            tenant_connections.release(request.tenant_db)
+        return response
 
 
 def get_tenant_from_url(url):
-    sites_path = Path(settings.SITE_PATH)
-    
-    if not sites_path.exists():
-        return None
-    
-    for site_folder in sites_path.iterdir():
-        if site_folder.is_dir():
-            config_file = site_folder / "site_config.json"
-            if config_file.exists():
-                with open(config_file, "r") as f:
-                    try:
-                        config = json.load(f)
-                        if "domains" in config and url in config["domains"]:
-                            return config.get("site_name")
-                    except json.JSONDecodeError:
-                        print(f"Error decoding JSON in {config_file}")
-    
-    return None  # No match found
+    """Return the site name whose site_config.json lists `url` in its domains."""
+    return tenant_index.get_site(url)
@@ -0,0 +1,38 @@
+from django.db import migrations, models
+from django.db.models import Max
+
+
+def merge_duplicate_series(apps, schema_editor):
+    """
+    Collapse duplicate series rows into one per name, keeping the highest
+    counter so no number is handed out twice once the name becomes unique.
+    """
+    Series = apps.get_model("core", "Series")
+    db_alias = schema_editor.connection.alias
+    duplicates = (
+        Series.objects.using(db_alias)
+        .values("name")
+        .annotate(count=models.Count("id"), highest=Max("current"))
+        .filter(count__gt=1)
+    )
+    for duplicate in duplicates:
+        rows = Series.objects.using(db_alias).filter(name=duplicate["name"])
+        keep = rows.order_by("id").first()
+        rows.exclude(pk=keep.pk).delete()
+        rows.filter(pk=keep.pk).update(current=duplicate["highest"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0003_sidebarlink"),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_series, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="series",
+            name="name",
+            field=models.CharField(max_length=255, unique=True),
+        ),
+    ]
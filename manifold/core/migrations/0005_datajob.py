@@ -0,0 +1,99 @@
+import core.models.template
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0004_series_unique_name"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DataJob",
+            fields=[
+                (
+                    "id",
+                    models.CharField(
+                        default=core.models.template.generate_by_hash,
+                        max_length=255,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("created", models.DateTimeField(auto_now_add=True)),
+                ("modified", models.DateTimeField(auto_now=True)),
+                (
+                    "job_type",
+                    models.CharField(
+                        choices=[("import", "Import")], default="import", max_length=50
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("Queued", "Queued"),
+                            ("Running", "Running"),
+                            ("Completed", "Completed"),
+                            ("Failed", "Failed"),
+                        ],
+                        db_index=True,
+                        default="Queued",
+                        max_length=50,
+                    ),
+                ),
+                ("model_name", models.CharField(max_length=255)),
+                (
+                    "file",
+                    models.FileField(blank=True, null=True, upload_to="data_jobs/"),
+                ),
+                (
+                    "payload",
+                    models.JSONField(
+                        blank=True,
+                        help_text="Inline rows or options for the job.",
+                        null=True,
+                    ),
+                ),
+                ("rows_processed", models.PositiveIntegerField(default=0)),
+                ("rows_succeeded", models.PositiveIntegerField(default=0)),
+                ("rows_failed", models.PositiveIntegerField(default=0)),
+                (
+                    "throughput",
+                    models.FloatField(default=0, help_text="Rows per second."),
+                ),
+                ("started_at", models.DateTimeField(blank=True, null=True)),
+                ("finished_at", models.DateTimeField(blank=True, null=True)),
+                ("error", models.TextField(blank=True, null=True)),
+                ("errors", models.JSONField(blank=True, null=True)),
+                (
+                    "modified_by",
+                    models.ForeignKey(
+                        blank=True,
+                        help_text="The user who last modified this record.",
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="%(app_label)s_%(class)s_modified",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "owner",
+                    models.ForeignKey(
+                        blank=True,
+                        help_text="The user who created this record.",
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="%(app_label)s_%(class)s_created",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "abstract": False,
+            },
+        ),
+    ]
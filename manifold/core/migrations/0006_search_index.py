@@ -0,0 +1,101 @@
+from django.db import migrations, models
+
+
+def create_search_backend_tables(apps, schema_editor):
+    """
+    Add the FULLTEXT index on MySQL, or the FTS5 table on SQLite builds
+    that include it. Other databases use the portable token index only.
+    """
+    connection = schema_editor.connection
+    if connection.vendor == "mysql":
+        schema_editor.execute(
+            "CREATE FULLTEXT INDEX core_searchdocument_fulltext "
+            "ON core_searchdocument (title, content)"
+        )
+    elif connection.vendor == "sqlite":
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA compile_options")
+            options = {row[0] for row in cursor.fetchall()}
+        if "ENABLE_FTS5" in options:
+            schema_editor.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS core_search_fts "
+                "USING fts5(title, content, prefix='2 3')"
+            )
+
+
+def drop_search_backend_tables(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == "sqlite":
+        schema_editor.execute("DROP TABLE IF EXISTS core_search_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0005_datajob"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SearchIndex",
+            fields=[
+                (
+                    "doctype",
+                    models.CharField(max_length=255, primary_key=True, serialize=False),
+                ),
+                ("backend", models.CharField(max_length=50)),
+                ("documents", models.PositiveIntegerField(default=0)),
+                ("built_at", models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="SearchDocument",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("doctype", models.CharField(max_length=255)),
+                ("object_id", models.CharField(max_length=255)),
+                ("title", models.TextField(blank=True, default="")),
+                ("content", models.TextField(blank=True, default="")),
+            ],
+            options={
+                "unique_together": {("doctype", "object_id")},
+            },
+        ),
+        migrations.CreateModel(
+            name="SearchToken",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("doctype", models.CharField(max_length=255)),
+                ("object_id", models.CharField(max_length=255)),
+                ("token", models.CharField(max_length=64)),
+                ("weight", models.PositiveSmallIntegerField(default=1)),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["doctype", "token"], name="core_search_token_idx"
+                    ),
+                    models.Index(
+                        fields=["doctype", "object_id"], name="core_search_object_idx"
+                    ),
+                ],
+            },
+        ),
+        migrations.RunPython(create_search_backend_tables, drop_search_backend_tables),
+    ]
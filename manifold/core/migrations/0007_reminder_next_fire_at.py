@@ -0,0 +1,43 @@
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_next_fire_at(apps, schema_editor):
+    """
+    Set `next_fire_at` of the existing reminders with two UPDATEs: the run
+    time, then the pre-reminder time where one is still pending.
+    """
+    Reminder = apps.get_model("core", "Reminder")
+    reminders = Reminder.objects.using(schema_editor.connection.alias)
+    reminders.filter(enabled=True, next_run__isnull=False).update(
+        next_fire_at=F("next_run")
+    )
+    reminders.filter(
+        enabled=True,
+        next_run__isnull=False,
+        pre_reminder_enabled=True,
+        pre_reminder_duration__isnull=False,
+        prereminder_ran=False,
+    ).update(next_fire_at=F("next_run") - F("pre_reminder_duration"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0006_search_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="reminder",
+            name="next_fire_at",
+            field=models.DateTimeField(
+                blank=True,
+                db_index=True,
+                editable=False,
+                help_text="The next time the reminder or its pre-reminder fires.",
+                null=True,
+            ),
+        ),
+        migrations.RunPython(backfill_next_fire_at, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,32 @@
+from django.db import migrations, models
+
+
+def create_permission_version(apps, schema_editor):
+    PermissionVersion = apps.get_model("core", "PermissionVersion")
+    PermissionVersion.objects.using(schema_editor.connection.alias).get_or_create(pk=1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0008_notification"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PermissionVersion",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("version", models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(create_permission_version, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,22 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0009_permissionversion"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="notification",
+            name="claim_token",
+            field=models.CharField(
+                blank=True,
+                editable=False,
+                help_text="Set by the dispatcher that claimed the row for sending.",
+                max_length=64,
+                null=True,
+            ),
+        ),
+    ]
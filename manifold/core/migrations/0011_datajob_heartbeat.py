@@ -0,0 +1,41 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0010_notification_claim_token"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="datajob",
+            name="job_type",
+            field=models.CharField(
+                choices=[("import", "Import"), ("delete", "Delete")],
+                default="import",
+                max_length=50,
+            ),
+        ),
+        migrations.AddField(
+            model_name="datajob",
+            name="worker_id",
+            field=models.CharField(
+                blank=True,
+                editable=False,
+                help_text="The worker running the job.",
+                max_length=255,
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="datajob",
+            name="heartbeat_at",
+            field=models.DateTimeField(
+                blank=True,
+                editable=False,
+                help_text="Refreshed by the worker while the job runs.",
+                null=True,
+            ),
+        ),
+    ]
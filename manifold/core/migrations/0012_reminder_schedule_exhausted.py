@@ -0,0 +1,20 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0011_datajob_heartbeat"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="reminder",
+            name="schedule_exhausted",
+            field=models.BooleanField(
+                default=False,
+                editable=False,
+                help_text="The schedule produces no further runs.",
+            ),
+        ),
+    ]
@@ -6,5 +6,8 @@ from .core import *
 from .template import *
 from .user_role import Permission, Role, UserRole
 from .sidebar_link import SidebarLink
+from .data_job import DataJob
+from .notification import Notification
+from .search import SearchDocument, SearchIndex, SearchToken
 
 # from .barcode import *
@@ -73,3 +73,16 @@ class UserIPAddress(models.Model):
 
     def __str__(self):
         return f"{self.user.username} - {self.ip_address} ({self.timestamp})"
+
+
+class PermissionVersion(models.Model):
+    """
+    The permission version of this database, a single row. It is bumped
+    whenever group membership or permissions change, and every process
+    compares it with the version of its cached permission snapshots.
+    """
+
+    version = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return str(self.version)
@@ -52,17 +52,6 @@ def correct_timezone_conversion(naive_datetime, tz_name):
         return naive_datetime.replace(tzinfo=pytz.UTC)
 
 
-class ReminderManager(models.Manager):
-    def get_queryset(self):
-        queryset = super().get_queryset()
-
-        # Auto-update `next_run` before fetching results
-        for reminder in queryset:
-            reminder.ensure_next_run_is_valid()
-
-        return queryset
-
-
 class Reminder(BaseModel):
     name = models.CharField(verbose_name="Name", null=True, blank=True, max_length=255)
 
@@ -153,10 +142,21 @@ class Reminder(BaseModel):
     repeat_count = models.PositiveIntegerField(blank=True, null=True)
     repeat_until = models.DateTimeField(blank=True, null=True)
 
-    def __init__(self, *args, **kwargs):
-        """Ensure `next_run` is valid when an instance is initialized."""
-        super().__init__(*args, **kwargs)
-        self.ensure_next_run_is_valid()  # Run validation once on object initialization
+    # Set once the schedule has no run left, so the scheduler stops revisiting it
+    schedule_exhausted = models.BooleanField(
+        default=False,
+        editable=False,
+        help_text="The schedule produces no further runs.",
+    )
+
+    # When the scheduler next has to act: the pending pre-reminder or the run
+    next_fire_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        db_index=True,
+        editable=False,
+        help_text="The next time the reminder or its pre-reminder fires.",
+    )
 
     def get_timezone(self):
         """Returns the timezone object based on the `timezone` field from given options."""
@@ -192,6 +192,7 @@ class Reminder(BaseModel):
             or self.next_run > current_time + timedelta(days=365)
         ):
             self.update_next_run()
+        self.schedule_exhausted = self.next_run is None
 
     def update_next_run(self):
         """Sets `next_run` to the calculated next run time."""
@@ -200,8 +201,12 @@ class Reminder(BaseModel):
             self.next_run = next_run
             self.prereminder_ran = False
 
-    def calculate_next_run(self):
-        """Calculates the next run datetime based on frequency and settings."""
+    def calculate_next_run(self, after=None):
+        """
+        Calculates the next run datetime based on frequency and settings.
+        Weekly, Monthly and Custom schedules anchored on a past `date` are
+        rolled forward to their first run after `after` (default: now).
+        """
         if not self.enabled:
             return None
 
@@ -216,6 +221,7 @@ class Reminder(BaseModel):
         current_datetime = datetime.combine(current_date, current_time)
 
         if self.frequency == "Once":
+            current_datetime = tz.localize(current_datetime)
             return current_datetime if current_datetime > timezone.now() else None
 
         if self.frequency == "Daily":
@@ -302,8 +308,103 @@ class Reminder(BaseModel):
             return None
 
         # return correct_timezone_conversion(next_datetime, tz) if self.time else next_datetime
+        if timezone.is_naive(next_datetime):
+            next_datetime = tz.localize(next_datetime)
+        return self.roll_forward(next_datetime, after or timezone.now(), tz)
+
+    def roll_forward(self, next_datetime, after, tz):
+        """Returns the first run of the schedule from `next_datetime` that is later than `after`."""
+        if next_datetime > after:
+            return next_datetime
+
+        local_next = next_datetime.astimezone(tz)
+        run_time = local_next.time().replace(tzinfo=None)
+        local_after = after.astimezone(tz)
+
+        if self.frequency == "Custom":
+            interval = timedelta(days=self.custom_interval_days)
+            naive_next = local_next.replace(tzinfo=None)
+            steps = (local_after.replace(tzinfo=None) - naive_next) // interval + 1
+            candidate = tz.localize(naive_next + steps * interval)
+            while candidate <= after:
+                steps += 1
+                candidate = tz.localize(naive_next + steps * interval)
+            return candidate
+
+        if self.frequency == "Daily":
+            candidate = tz.localize(datetime.combine(local_after.date(), run_time))
+            if candidate <= after:
+                candidate = tz.localize(
+                    datetime.combine(local_after.date() + timedelta(days=1), run_time)
+                )
+            return candidate
+
+        if self.frequency == "Weekly":
+            weekdays = {
+                index
+                for index, day in enumerate(
+                    ["Mon", "Tue", "Wed", "Thur", "Fri", "Sat", "Sun"]
+                )
+                if day in self.days
+            }
+            for offset in range(8):
+                day = local_after.date() + timedelta(days=offset)
+                if day.weekday() in weekdays:
+                    candidate = tz.localize(datetime.combine(day, run_time))
+                    if candidate > after:
+                        return candidate
+            return None
+
+        if self.frequency == "Monthly":
+            year, month = local_after.year, local_after.month
+            for _ in range(13):
+                try:
+                    candidate = tz.localize(
+                        datetime(
+                            year, month, int(self.day), run_time.hour, run_time.minute
+                        )
+                    )
+                except ValueError:
+                    candidate = None  # The month has no such day
+                if candidate and candidate > after:
+                    return candidate
+                year, month = (year, month + 1) if month < 12 else (year + 1, 1)
+            return None
+
         return next_datetime
 
+    def get_next_fire_at(self):
+        """Returns the pending pre-reminder time, else `next_run`, for enabled reminders."""
+        if not self.enabled or not self.next_run:
+            return None
+        pre_reminder_time = self.get_pre_reminder_datetime()
+        if pre_reminder_time and not self.prereminder_ran:
+            return pre_reminder_time
+        return self.next_run
+
+    def save(self, *args, **kwargs):
+        """
+        Validates `next_run` and keeps `next_fire_at` in step with the
+        schedule on every save. Reminders that are only read are maintained
+        in batches by `ReminderScheduler.refresh_next_runs`.
+        """
+        self.ensure_next_run_is_valid()
+        self.next_fire_at = self.get_next_fire_at()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            kwargs["update_fields"] = list(
+                dict.fromkeys(
+                    [
+                        *update_fields,
+                        "next_run",
+                        "prereminder_ran",
+                        "schedule_exhausted",
+                        "next_fire_at",
+                    ]
+                )
+            )
+        super().save(*args, **kwargs)
+
     def get_pre_reminder_datetime(self):
         """Calculates when the pre-reminder should be triggered."""
         if self.pre_reminder_enabled and self.pre_reminder_duration and self.next_run:
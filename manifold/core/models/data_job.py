@@ -0,0 +1,55 @@
+from django.db import models
+
+from core.models.template import BaseModel
+
+
+class DataJob(BaseModel):
+    """
+    A bulk data operation queued in the database and executed by the
+    `run_data_jobs` worker outside the HTTP request.
+    """
+
+    TYPE_CHOICES = [
+        ("import", "Import"),
+        ("delete", "Delete"),
+    ]
+    STATUS_CHOICES = [
+        ("Queued", "Queued"),
+        ("Running", "Running"),
+        ("Completed", "Completed"),
+        ("Failed", "Failed"),
+    ]
+
+    job_type = models.CharField(max_length=50, choices=TYPE_CHOICES, default="import")
+    status = models.CharField(
+        max_length=50, choices=STATUS_CHOICES, default="Queued", db_index=True
+    )
+    model_name = models.CharField(max_length=255)
+    file = models.FileField(upload_to="data_jobs/", null=True, blank=True)
+    payload = models.JSONField(
+        null=True, blank=True, help_text="Inline rows or options for the job."
+    )
+    rows_processed = models.PositiveIntegerField(default=0)
+    rows_succeeded = models.PositiveIntegerField(default=0)
+    rows_failed = models.PositiveIntegerField(default=0)
+    throughput = models.FloatField(default=0, help_text="Rows per second.")
+    started_at = models.DateTimeField(null=True, blank=True)
+    worker_id = models.CharField(
+        max_length=255,
+        null=True,
+        blank=True,
+        editable=False,
+        help_text="The worker running the job.",
+    )
+    heartbeat_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        editable=False,
+        help_text="Refreshed by the worker while the job runs.",
+    )
+    finished_at = models.DateTimeField(null=True, blank=True)
+    error = models.TextField(null=True, blank=True)
+    errors = models.JSONField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.job_type} {self.model_name} ({self.status})"
@@ -0,0 +1,53 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Notification(models.Model):
+    """
+    An email or SMS waiting in the outbox. Rows are written by
+    `core.utils.notifications.queue_email` and `queue_sms` and sent in batches
+    by the `NotificationDispatcher`, which retries failures with backoff.
+    """
+
+    CHANNEL_CHOICES = [
+        ("email", "Email"),
+        ("sms", "SMS"),
+    ]
+    STATUS_CHOICES = [
+        ("Queued", "Queued"),
+        ("Sending", "Sending"),
+        ("Sent", "Sent"),
+        ("Failed", "Failed"),
+    ]
+
+    channel = models.CharField(max_length=10, choices=CHANNEL_CHOICES)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="Queued")
+    recipient = models.CharField(
+        max_length=255, help_text="Email address or normalized phone number."
+    )
+    subject = models.CharField(max_length=255, null=True, blank=True)
+    body = models.TextField(help_text="Plain text body, or the SMS message.")
+    html_body = models.TextField(null=True, blank=True)
+    from_email = models.CharField(max_length=255, null=True, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    claim_token = models.CharField(
+        max_length=64,
+        null=True,
+        blank=True,
+        editable=False,
+        help_text="Set by the dispatcher that claimed the row for sending.",
+    )
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    created = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    error = models.TextField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["status", "next_attempt_at"], name="core_notification_due_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.channel} to {self.recipient} ({self.status})"
@@ -0,0 +1,59 @@
+from django.db import models
+
+
+class SearchIndex(models.Model):
+    """
+    One row per doctype whose search index has been built. Searches on a
+    doctype without a row fall back to `icontains` over its search fields.
+    """
+
+    doctype = models.CharField(max_length=255, primary_key=True)
+    backend = models.CharField(max_length=50)
+    documents = models.PositiveIntegerField(default=0)
+    built_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.doctype} ({self.backend})"
+
+
+class SearchToken(models.Model):
+    """
+    Inverted index entry of the portable "token" search backend: one row per
+    distinct word of a record's search fields, with the weight of the most
+    important field it appears in.
+    """
+
+    doctype = models.CharField(max_length=255)
+    object_id = models.CharField(max_length=255)
+    token = models.CharField(max_length=64)
+    weight = models.PositiveSmallIntegerField(default=1)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["doctype", "token"], name="core_search_token_idx"),
+            models.Index(
+                fields=["doctype", "object_id"], name="core_search_object_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.doctype} {self.object_id}: {self.token}"
+
+
+class SearchDocument(models.Model):
+    """
+    Searchable text of one record, used by the MySQL "fulltext" backend
+    through a FULLTEXT index on (title, content) and by the SQLite "fts5"
+    backend as the rowid of its virtual table.
+    """
+
+    doctype = models.CharField(max_length=255)
+    object_id = models.CharField(max_length=255)
+    title = models.TextField(blank=True, default="")
+    content = models.TextField(blank=True, default="")
+
+    class Meta:
+        unique_together = ("doctype", "object_id")
+
+    def __str__(self):
+        return f"{self.doctype} {self.object_id}"
@@ -70,5 +70,5 @@ class SingletonModel(BaseModel):
 
 class Series(models.Model):
     id = models.AutoField(primary_key=True, editable=False)
-    name = models.CharField(max_length=255)
+    name = models.CharField(max_length=255, unique=True)
     current = models.IntegerField(default=0)
@@ -1,6 +1,8 @@
 # permissions.py
 from rest_framework.permissions import BasePermission
 
+from .utils.permission_cache import permission_cache
+
 
 class IsSuperUser(BasePermission):
     """
@@ -16,6 +18,9 @@ class HasGroupPermission(BasePermission):
     """
     Custom permission to check if the user belongs to a group and has the correct default Django permission
     for the current action on the current model. Superusers are granted access to everything.
+
+    Group membership and permissions come from the user's cached permission
+    snapshot, so a check costs no queries.
     """
 
     def has_permission(self, request, view):
@@ -45,7 +50,9 @@ class HasGroupPermission(BasePermission):
             permission = (
                 f"{model._meta.app_label}.{permission_type}_{model._meta.model_name}"
             )
-            if request.user.groups.exists() and request.user.has_perm(permission):
+            if permission_cache.get(request.user).has_groups and (
+                permission_cache.has_perm(request.user, permission)
+            ):
                 return True
 
         return False
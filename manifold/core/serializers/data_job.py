@@ -0,0 +1,9 @@
+from rest_framework import serializers
+from core.models.data_job import DataJob
+
+
+class DataJobSerializer(serializers.ModelSerializer):
+
+    class Meta:
+        model = DataJob
+        exclude = ["payload", "errors"]
@@ -1,10 +1,15 @@
 from threading import local
 
-from django.db.models.signals import pre_save
+from django.apps import apps
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
 from django.dispatch import receiver
 
-from .utils.get_model_details import get_model_doctype_json
+from .utils.model_resolver import model_resolver
 from .utils.naming_manager import NamingManager
+from .utils.naming_plan import SKIP_MODELS, get_naming_plan
+from .utils.permission_cache import permission_cache
+from .utils.search_index import search_index
 
 _request_local = local()
 
@@ -18,42 +23,25 @@ def generate_name_for_model(sender, instance, **kwargs):
     """
     Pre-save signal to generate a name for models.
     Skips certain models like 'Token' that don't require name generation.
-    """
-    SKIP_MODELS = {
-        "Token",
-        "Session",
-        "LogEntry",
-        "Group",
-        "Permission",
-        "UserIPAddress",
-        "OTP",
-        "User",
-        "ChangeLog",
-    }
 
+    The doctype config is resolved once per model into a cached naming plan,
+    so a save does no filesystem or JSON work.
+    """
     if sender.__name__ in SKIP_MODELS:
         return
 
-    model_name = instance.__class__.__name__
-    doctype_config = get_model_doctype_json(model_name)
+    plan = get_naming_plan(instance.__class__)
+    doctype_config = plan.config
     naming_manager = NamingManager(instance, doctype_config)
-    
-    is_single =  str((doctype_config or {}).get("issingle")).lower() in ("1", "true")
-
-    if doctype_config and doctype_config.get("fields"):
-        for field in doctype_config.get("fields", []):
-            fieldname = field.get("fieldname")
-            fieldtype = field.get("fieldtype")
-            format_value = field.get("format")
-
-            if format_value:
-                instance.__dict__[fieldname] = naming_manager.generate_code(
-                    fieldname, format_value
-                )
-    
+
+    for fieldname, format_value in plan.format_fields:
+        instance.__dict__[fieldname] = naming_manager.generate_code(
+            fieldname, format_value
+        )
+
     if not getattr(instance, "created", None):
 
-        if is_single:
+        if plan.is_single:
             instance.id = "1"
         else:
             id = naming_manager.generate_name()
@@ -61,25 +49,72 @@ def generate_name_for_model(sender, instance, **kwargs):
             if id:
                 instance.id = id
 
-    if doctype_config and doctype_config.get("fields"):
-        for field in doctype_config.get("fields", []):
-            fieldname = field.get("fieldname")
-            fieldtype = field.get("fieldtype")
-            format_value = field.get("format")
-
-            if fieldtype in ["Barcode", "QR Code"]:
-                options = field.get("options", "{id}")
-                code = naming_manager.generate_code(fieldname, options)
-                instance.__dict__[fieldname] = code
-
-    if (
-        getattr(instance, "created", None)
-        and doctype_config
-        and doctype_config.get("track_changes") == (True or "1")
-    ):
+    for fieldname, options in plan.code_fields:
+        instance.__dict__[fieldname] = naming_manager.generate_code(fieldname, options)
+
+    if getattr(instance, "created", None) and plan.track_changes:
         track_changes_after_save(sender, instance, **kwargs)
 
 
+@receiver(post_save, sender="core.Document")
+@receiver(post_delete, sender="core.Document")
+def clear_model_resolver(sender, instance, using=None, **kwargs):
+    """Drop the cached model lookups of a database when its documents change."""
+    model_resolver.clear(using)
+
+
+@receiver(m2m_changed, sender="core.User_groups")
+@receiver(m2m_changed, sender="core.User_user_permissions")
+@receiver(m2m_changed, sender="auth.Group_permissions")
+def bump_permission_version_on_m2m(sender, action, using=None, **kwargs):
+    """Group membership or granted permissions changed."""
+    if action in ("post_add", "post_remove", "post_clear"):
+        bump_permission_version_on_commit(using)
+
+
+@receiver(post_save, sender="auth.Group")
+@receiver(post_delete, sender="auth.Group")
+@receiver(post_save, sender="auth.Permission")
+@receiver(post_delete, sender="auth.Permission")
+def bump_permission_version(sender, instance, using=None, **kwargs):
+    bump_permission_version_on_commit(using)
+
+
+def bump_permission_version_on_commit(using):
+    using = using or "default"
+    transaction.on_commit(lambda: permission_cache.bump(using), using=using)
+
+
+def update_search_index(sender, instance, using=None, raw=False, **kwargs):
+    if not raw:
+        search_index.update(instance, using)
+
+
+def remove_from_search_index(sender, instance, using=None, **kwargs):
+    search_index.remove(instance, using)
+
+
+def connect_search_index():
+    """
+    Connect the search index receivers to every model whose doctype
+    configures search. They are connected per model so that deletes of the
+    other models keep Django's fast path, which any post_delete receiver
+    disables.
+    """
+    for model in apps.get_models():
+        if not search_index.is_indexed(model):
+            continue
+        label = model._meta.label_lower
+        post_save.connect(
+            update_search_index, sender=model, dispatch_uid=f"search_save_{label}"
+        )
+        post_delete.connect(
+            remove_from_search_index,
+            sender=model,
+            dispatch_uid=f"search_delete_{label}",
+        )
+
+
 def track_changes_after_save(sender, instance, **kwargs):
     model_name = sender.__name__
     object_id = str(instance.pk)
@@ -1 +1,329 @@
-# Create your tests here.
+import sys
+import types
+from datetime import timedelta
+from unittest import mock
+
+from django.core import mail
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from core.dynamic_api import DispatchTable, get_allowed_modules
+from core.models import Notification, Reminder, RoleType, Series
+from core.signals import generate_name_for_model
+from core.utils.data_import import DataImporter
+from core.utils.model_resolver import ModelResolver
+from core.utils.notifications import NotificationDispatcher
+from core.utils.pagination import KeysetPaginator, count_queryset
+from core.utils.series_allocator import SeriesAllocator
+
+
+class DispatchTableAllowlistTests(SimpleTestCase):
+    def setUp(self):
+        # A custom app package as installdjangoapp lays it out: "masafa" on
+        # sys.path, wrapped by the "masafa_app" Django app
+        self.modules = {
+            "masafa": types.ModuleType("masafa"),
+            "masafa.api": types.ModuleType("masafa.api"),
+            "masafa.api.masafa": types.ModuleType("masafa.api.masafa"),
+        }
+        self.modules["masafa.api.masafa"].TransitCrossborder = lambda request: None
+        self.modules["masafa.api.masafa"]._private = lambda request: None
+        for name, module in self.modules.items():
+            sys.modules[name] = module
+        self.addCleanup(self.remove_modules)
+
+        self.table = DispatchTable()
+        self.table._allowed_apps = get_allowed_modules(
+            ["core", "masafa_app", "shop_app"], {"core", "masafa_app"}
+        )
+
+    def remove_modules(self):
+        for name in self.modules:
+            sys.modules.pop(name, None)
+
+    def test_allowed_modules_include_custom_app_packages(self):
+        self.assertEqual(
+            get_allowed_modules(["core", "masafa_app"], {"core", "masafa_app"}),
+            ("core", "masafa_app", "masafa"),
+        )
+
+    def test_allowed_modules_skip_apps_not_installed(self):
+        self.assertNotIn("shop", self.table.allowed_apps)
+        self.assertNotIn("shop_app", self.table.allowed_apps)
+
+    def test_resolves_custom_app_package_path(self):
+        resolved, error = self.table.resolve("masafa/api/masafa/TransitCrossborder")
+        self.assertIsNone(error)
+        self.assertIs(
+            resolved.target, self.modules["masafa.api.masafa"].TransitCrossborder
+        )
+
+    def test_refuses_modules_outside_the_allowlist(self):
+        resolved, error = self.table.resolve("os/system")
+        self.assertIsNone(resolved)
+        self.assertIsInstance(error, ImportError)
+
+    def test_refuses_private_names(self):
+        resolved, error = self.table.resolve("masafa/api/masafa/_private")
+        self.assertIsNone(resolved)
+        self.assertIsInstance(error, AttributeError)
+
+
+class KeysetPaginatorTests(TestCase):
+    def setUp(self):
+        names = {"r1": "b", "r2": "a", "r3": None, "r4": "a", "r5": None, "r6": "c"}
+        Reminder.objects.bulk_create(
+            [Reminder(id=pk, name=name) for pk, name in names.items()]
+        )
+
+    def pages(self, descending):
+        paginator = KeysetPaginator(Reminder.objects.all(), "name", descending, 2)
+        pages, cursor = [], None
+        while True:
+            rows, cursor, previous = paginator.page(cursor)
+            pages.append(([row.pk for row in rows], previous))
+            if not cursor:
+                return paginator, pages
+
+    def test_ascending_pages_keep_nulls_last(self):
+        _, pages = self.pages(descending=False)
+        self.assertEqual(
+            [pks for pks, _ in pages], [["r2", "r4"], ["r1", "r6"], ["r3", "r5"]]
+        )
+
+    def test_descending_pages_keep_nulls_last(self):
+        _, pages = self.pages(descending=True)
+        self.assertEqual(
+            [pks for pks, _ in pages], [["r6", "r1"], ["r4", "r2"], ["r5", "r3"]]
+        )
+
+    def test_previous_cursors_walk_back_over_the_same_pages(self):
+        for descending in (False, True):
+            paginator, pages = self.pages(descending)
+            backwards, previous = [], pages[-1][1]
+            while previous:
+                rows, _, previous = paginator.page(previous)
+                backwards.append([row.pk for row in rows])
+            self.assertEqual(backwards, [pks for pks, _ in pages[-2::-1]])
+
+
+class ModelResolverTests(SimpleTestCase):
+    def setUp(self):
+        self.resolver = ModelResolver()
+        self.index = {
+            "documents": {"reminder": ("Reminder", "core", "Core")},
+            "resolved": {},
+        }
+
+    def test_resolves_models_named_by_a_document(self):
+        model = self.resolver._resolve(self.index, "Reminder", "reminder")
+        self.assertEqual(model.__name__, "Reminder")
+
+    def test_refuses_models_no_document_names(self):
+        self.assertIsNone(self.resolver._resolve({"documents": {}}, "User", "user"))
+        self.assertIsNone(self.resolver._resolve({"documents": {}}, "Series", "series"))
+
+
+class CountQuerysetTests(SimpleTestCase):
+    def test_empty_filter_counts_zero_without_a_query(self):
+        queryset = Reminder.objects.filter(pk__in=[])
+        self.assertEqual(count_queryset(queryset, "exact"), (0, False))
+        self.assertEqual(count_queryset(queryset, "estimate"), (0, False))
+
+
+class SeriesAllocatorTests(TestCase):
+    def setUp(self):
+        self.allocator = SeriesAllocator()
+
+    def current(self, name):
+        return Series.objects.get(name=name).current
+
+    def test_reserve_hands_out_consecutive_ranges(self):
+        self.assertEqual(self.allocator.reserve("INV", 3), (1, 3))
+        self.assertEqual(self.allocator.reserve("INV", 2), (4, 5))
+        self.assertEqual(self.current("INV"), 5)
+
+    def test_reserve_starts_a_missing_series_after_the_seed(self):
+        self.assertEqual(self.allocator.reserve("SO", 1, seed=lambda: 41), (42, 42))
+        self.assertEqual(self.allocator.reserve("SO", 1, seed=lambda: 0), (43, 43))
+
+    def test_block_is_served_from_memory(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.allocator.next("PO", block_size=5), 1)
+        self.assertEqual(self.current("PO"), 5)
+
+        with self.assertNumQueries(0):
+            numbers = [self.allocator.next("PO", block_size=5) for _ in range(4)]
+        self.assertEqual(numbers, [2, 3, 4, 5])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.allocator.next("PO", block_size=5), 6)
+        self.assertEqual(self.current("PO"), 10)
+
+    def test_block_is_dropped_when_the_transaction_rolls_back(self):
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            self.allocator.next("PO", block_size=5)
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(self.allocator._blocks, {})
+
+    def naming(self, numbers):
+        for name in ["A", "B", "A", "A"]:
+            numbers.append((name, self.allocator.next(name)))
+
+    def test_count_reserves_nothing(self):
+        counts = self.allocator.count(lambda: self.naming([]))
+        self.assertEqual(counts, {("default", "A"): 3, ("default", "B"): 1})
+        self.assertFalse(Series.objects.exists())
+
+    def test_batch_reserves_exactly_the_counted_numbers(self):
+        counts = self.allocator.count(lambda: self.naming([]))
+        numbers = []
+        with CaptureQueriesContext(connection) as queries:
+            with self.allocator.batch(counts):
+                self.naming(numbers)
+        # One reservation per series, not one per number
+        updates = [q for q in queries if q["sql"].startswith("UPDATE")]
+        self.assertEqual(len(updates), 2)
+        self.assertEqual(numbers, [("A", 1), ("B", 1), ("A", 2), ("A", 3)])
+        self.assertEqual(self.current("A"), 3)
+        self.assertEqual(self.current("B"), 1)
+        self.assertEqual(self.allocator.next("A"), 4)
+
+    def test_batch_queues_leftovers_behind_the_shared_cursor(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.allocator.next("A", block_size=2)
+            with self.allocator.batch({("default", "A"): 3}):
+                self.assertEqual(self.allocator.next("A"), 3)
+        self.assertEqual([self.allocator.next("A") for _ in range(3)], [2, 4, 5])
+
+
+class DataImporterTests(TestCase):
+    def setUp(self):
+        # bulk_create skips the naming signal, so the id stays as given
+        RoleType.objects.bulk_create([RoleType(id="kept-1", name="Old")])
+
+    def test_upsert_keeps_ids_and_names_only_inserted_rows(self):
+        importer = DataImporter(RoleType)
+        with mock.patch(
+            "core.utils.data_import.generate_name_for_model",
+            wraps=generate_name_for_model,
+        ) as naming, mock.patch("core.signals.track_changes_after_save") as track:
+            result = importer.run(
+                importer.iter_data_chunks(
+                    [{"id": "kept-1", "name": "New"}, {"name": "Fresh"}]
+                )
+            )
+
+        self.assertEqual(result.imported, 2)
+        self.assertEqual(RoleType.objects.get(pk="kept-1").name, "New")
+        self.assertEqual(RoleType.objects.count(), 2)
+        # The inserted row is named twice, once counted and once for real;
+        # the upserted row is never renamed
+        self.assertEqual(
+            [call.args[1].name for call in naming.call_args_list], ["Fresh"] * 2
+        )
+        track.assert_not_called()
+
+
+@override_settings(
+    NOTIFICATION_MAX_ATTEMPTS=3,
+    NOTIFICATION_RETRY_DELAY=30,
+    SMS_API_URL="http://sms.test/send",
+    SMS_SENDER_ID="TEST",
+    SMS_API_KEY="key",
+    SMS_CLIENT_ID="client",
+)
+class NotificationDispatcherTests(TestCase):
+    def setUp(self):
+        self.now = timezone.now()
+        self.dispatcher = NotificationDispatcher(using="default", batch_size=10)
+
+    def queue(self, count=1, **fields):
+        fields = {
+            "channel": "email",
+            "recipient": "ann@example.com",
+            "subject": "Hi",
+            "body": "Hello",
+            "next_attempt_at": self.now,
+            **fields,
+        }
+        return Notification.objects.bulk_create(
+            [Notification(**fields) for _ in range(count)]
+        )
+
+    def test_claim_batch_claims_due_rows_once(self):
+        due = self.queue(3)
+        self.queue(next_attempt_at=self.now + timedelta(minutes=5))
+        self.queue(status="Sent")
+
+        claimed = self.dispatcher.claim_batch(self.now)
+        self.assertEqual(
+            sorted(row.id for row in claimed), sorted(row.id for row in due)
+        )
+        self.assertEqual({row.status for row in claimed}, {"Sending"})
+        self.assertEqual(len({row.claim_token for row in claimed}), 1)
+        self.assertEqual(self.dispatcher.claim_batch(self.now), [])
+
+    def test_claim_batch_returns_only_rows_it_changed(self):
+        due = self.queue(2)
+
+        def new_token():
+            # Another dispatcher claims a row between the SELECT and the UPDATE
+            Notification.objects.filter(id=due[0].id).update(status="Sending")
+            return mock.Mock(hex="mine")
+
+        with mock.patch("core.utils.notifications.uuid.uuid4", new_token):
+            claimed = self.dispatcher.claim_batch(self.now)
+        self.assertEqual([row.id for row in claimed], [due[1].id])
+
+    def test_record_results_backs_off_then_fails(self):
+        notification = self.queue()[0]
+        delays = []
+        for _ in range(3):
+            claimed = self.dispatcher.claim_batch(notification.next_attempt_at)
+            self.dispatcher.record_results(claimed, {notification.id: "boom"}, self.now)
+            notification.refresh_from_db()
+            delays.append(notification.next_attempt_at - self.now)
+
+        self.assertEqual(notification.status, "Failed")
+        self.assertEqual(notification.attempts, 3)
+        self.assertEqual(notification.error, "boom")
+        self.assertEqual(delays[:2], [timedelta(seconds=30), timedelta(seconds=60)])
+
+    def test_requeue_stale_releases_expired_claims_only(self):
+        stale = self.queue(status="Sending")[0]
+        live = self.queue(
+            status="Sending", next_attempt_at=self.now + timedelta(minutes=5)
+        )[0]
+        self.assertEqual(self.dispatcher.requeue_stale(self.now), 1)
+        stale.refresh_from_db()
+        live.refresh_from_db()
+        self.assertEqual((stale.status, live.status), ("Queued", "Sending"))
+
+    def test_run_sends_emails_and_packs_sms(self):
+        self.queue(2)
+        numbers = ["254700000001", "254700000002"]
+        for number in numbers:
+            self.queue(channel="sms", recipient=number, subject=None)
+        session = mock.Mock()
+        session.post.return_value = mock.Mock(
+            status_code=200,
+            json=lambda: {
+                "ErrorCode": 0,
+                "Data": [
+                    {"MobileNumber": number, "MessageErrorCode": 0}
+                    for number in numbers
+                ],
+            },
+        )
+
+        with mock.patch("core.utils.sms.get_session", return_value=session):
+            self.assertEqual(self.dispatcher.run(self.now), 4)
+
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(session.post.call_count, 1)
+        self.assertEqual(
+            set(Notification.objects.values_list("status", flat=True)), {"Sent"}
+        )
@@ -18,6 +18,8 @@ from .views import (
     CreateModuleAPIView,
     CreatePrintFormatAPIView,
     DataImportAPIView,
+    DataJobViewSet,
+    DiagnosticsAPIView,
     DocumentViewSet,
     FileUploadView,
     GroupViewSet,
@@ -58,6 +60,7 @@ router.register(r"core/role_type", RoleViewSet, basename="core_role_type")
 router.register(r"core/branch", BranchViewSet, basename="core_branch")
 router.register(r"core/rolegroup", GroupViewSet, basename="core_rolegroup")
 router.register(r"core/sidebar_link", SidebarLinkViewSet, basename="core_sidebarlink")
+router.register(r"core/data_job", DataJobViewSet, basename="core_datajob")
 router.register(r"core/group", GroupViewSet, basename="core_group")
 router.register(r"core/permission", PermissionViewSet, basename="core_permission")
 router.register(
@@ -93,6 +96,7 @@ urlpatterns = [
     path("bulkdelete/", BulkDeleteAPIView.as_view(), name="bulkdelete"), 
     path("sendemail/", SendEmailView.as_view(), name="email"),
     path("upload-file/", FileUploadView.as_view(), name="upload-file"),
+    path("diagnostics/", DiagnosticsAPIView.as_view(), name="diagnostics"),
     path("admin/", admin.site.urls),
     path("", include(static_urlpatterns)),
     path('method/<path:target_path>/', dynamic_forward_view, name='dynamic_forward'),
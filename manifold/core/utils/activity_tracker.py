@@ -0,0 +1,127 @@
+import atexit
+import logging
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import router
+from django.db.models import Case, DateTimeField, Value, When
+
+logger = logging.getLogger(__name__)
+
+
+class ActivityTracker:
+    """
+    Buffers user activity in memory and writes it in batches.
+
+    Every authenticated request records the user's last-seen time and IP
+    address. Timestamps are kept at most once per `USER_ACTIVITY_RESOLUTION`
+    seconds (default 60) per user, and the buffer is written every
+    `USER_ACTIVITY_FLUSH_INTERVAL` seconds (default 60) or once it holds
+    `USER_ACTIVITY_FLUSH_SIZE` entries (default 500): one UPDATE per database
+    for all timestamps and one `bulk_create(ignore_conflicts=True)` for new
+    (user, ip) pairs. Pairs already written are remembered, so a known IP
+    costs nothing.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._last_seen = {}
+        self._recorded = {}
+        self._ips = set()
+        self._known_ips = set()
+        self._last_flush = time.monotonic()
+
+    @property
+    def resolution(self):
+        return getattr(settings, "USER_ACTIVITY_RESOLUTION", 60)
+
+    def record(self, user, ip_address, now):
+        """
+        Buffer one request of `user` from `ip_address` at `now`, flushing the
+        buffer when it is due.
+        """
+        from ..models import User
+
+        using = router.db_for_write(User)
+        key = (using, user.pk)
+        with self._lock:
+            recorded = self._recorded.get(key)
+            if recorded is None or (now - recorded).total_seconds() >= self.resolution:
+                self._recorded[key] = now
+                self._last_seen[key] = now
+
+            if ip_address and (using, user.pk, ip_address) not in self._known_ips:
+                self._ips.add((using, user.pk, ip_address))
+
+            due = time.monotonic() - self._last_flush >= getattr(
+                settings, "USER_ACTIVITY_FLUSH_INTERVAL", 60
+            ) or len(self._last_seen) + len(self._ips) >= getattr(
+                settings, "USER_ACTIVITY_FLUSH_SIZE", 500
+            )
+
+        if due:
+            self.flush()
+
+    def flush(self):
+        """
+        Write the buffered timestamps and IP addresses.
+        """
+        with self._lock:
+            last_seen, self._last_seen = self._last_seen, {}
+            ips, self._ips = self._ips, set()
+            self._last_flush = time.monotonic()
+            if len(self._recorded) > 10000:
+                self._recorded.clear()
+            if len(self._known_ips) > 10000:
+                self._known_ips.clear()
+
+        if not last_seen and not ips:
+            return
+
+        try:
+            self._write_last_seen(last_seen)
+            self._write_ips(ips)
+        except Exception:
+            logger.exception("Failed to write user activity")
+            return
+
+        with self._lock:
+            self._known_ips.update(ips)
+
+    def _write_last_seen(self, last_seen):
+        from ..models import User
+
+        by_database = defaultdict(dict)
+        for (using, user_id), seen in last_seen.items():
+            by_database[using][user_id] = seen
+
+        for using, seen_by_user in by_database.items():
+            User.objects.using(using).filter(pk__in=list(seen_by_user)).update(
+                last_activity=Case(
+                    *[
+                        When(pk=user_id, then=Value(seen))
+                        for user_id, seen in seen_by_user.items()
+                    ],
+                    output_field=DateTimeField(),
+                )
+            )
+
+    def _write_ips(self, ips):
+        from ..models import UserIPAddress
+
+        by_database = defaultdict(list)
+        for using, user_id, ip_address in ips:
+            by_database[using].append(
+                UserIPAddress(user_id=user_id, ip_address=ip_address)
+            )
+
+        for using, addresses in by_database.items():
+            UserIPAddress.objects.using(using).bulk_create(
+                addresses, ignore_conflicts=True
+            )
+
+
+activity_tracker = ActivityTracker()
+atexit.register(activity_tracker.flush)
@@ -0,0 +1,137 @@
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import router, transaction
+
+from ..models import Document
+
+
+class BulkDeleter:
+    """
+    Deletes a set of records by primary key with set-based queries.
+
+    The ids that exist are looked up with one `filter(pk__in=...)`, then the
+    records are deleted chunk by chunk with `QuerySet.delete()`, which collects
+    cascades once per chunk instead of once per row. All chunks run in one
+    transaction; a chunk the database rejects (for example a protected
+    relation) is rolled back to its savepoint and retried row by row so only
+    the offending ids are reported. Deleted documents have their doctype
+    folders removed afterwards with one `3plug drop-doc` call per app/module,
+    addressed by folder ids as `DocumentViewSet.destroy` does.
+    """
+
+    def __init__(self, model, chunk_size=None):
+        self.model = model
+        self.chunk_size = chunk_size or getattr(
+            settings, "BULK_DELETE_BATCH_SIZE", 1000
+        )
+        self.using = router.db_for_write(model)
+        self.deleted = 0
+        self.errors = []
+        self.processed = 0
+        self.started = time.monotonic()
+
+    def add_error(self, record_id, error):
+        self.errors.append({"id": record_id, "error": str(error)})
+
+    def run(self, ids):
+        """
+        Delete the records with the given ids.
+
+        Args:
+            ids (list): The primary keys to delete, as received in the request.
+
+        Returns:
+            BulkDeleter: self, with `deleted` and per-id `errors` filled in.
+        """
+        ids = list(dict.fromkeys(str(record_id) for record_id in ids))
+        self.processed = len(ids)
+        self.started = time.monotonic()
+        manager = self.model.objects.using(self.using)
+        existing = {}
+        for start in range(0, len(ids), self.chunk_size):
+            chunk = ids[start : start + self.chunk_size]
+            for pk in manager.filter(pk__in=chunk).values_list("pk", flat=True):
+                existing[str(pk)] = pk
+        for record_id in ids:
+            if record_id not in existing:
+                self.add_error(record_id, "Record not found")
+
+        pks = [existing[record_id] for record_id in ids if record_id in existing]
+        documents = self._collect_documents(pks)
+
+        deleted_pks = []
+        with transaction.atomic(using=self.using):
+            for start in range(0, len(pks), self.chunk_size):
+                deleted_pks += self._delete_chunk(pks[start : start + self.chunk_size])
+
+        self.deleted = len(deleted_pks)
+        if documents:
+            deleted_pks = set(deleted_pks)
+            self.cleanup_documents([doc for pk, *doc in documents if pk in deleted_pks])
+        return self
+
+    def as_dict(self):
+        elapsed = time.monotonic() - self.started
+        return {
+            "processed": self.processed,
+            "deleted": self.deleted,
+            "failed": len(self.errors),
+            "elapsed_seconds": round(elapsed, 3),
+            "rows_per_second": round(self.processed / elapsed, 1) if elapsed else 0,
+        }
+
+    def _delete_chunk(self, chunk):
+        manager = self.model.objects.using(self.using)
+        try:
+            with transaction.atomic(using=self.using):
+                manager.filter(pk__in=chunk).delete()
+            return chunk
+        except Exception:
+            deleted = []
+            for pk in chunk:
+                try:
+                    with transaction.atomic(using=self.using):
+                        manager.filter(pk=pk).delete()
+                    deleted.append(pk)
+                except Exception as e:
+                    self.add_error(str(pk), e)
+            return deleted
+
+    def _collect_documents(self, pks):
+        """
+        Fetch (pk, app id, module id, document id) of the documents about to
+        be deleted, since their folders can only be located while the rows
+        still exist.
+        """
+        if self.model is not Document or not pks:
+            return []
+        documents = []
+        manager = self.model.objects.using(self.using)
+        for start in range(0, len(pks), self.chunk_size):
+            documents += manager.filter(
+                pk__in=pks[start : start + self.chunk_size]
+            ).values_list("pk", "app_id", "module_id", "pk")
+        return documents
+
+    def cleanup_documents(self, documents):
+        """
+        Remove the doctype folders of deleted documents, batching every
+        document of the same app and module into a single CLI call.
+        """
+        from ..views.core import run_subprocess
+
+        groups = defaultdict(list)
+        for app_id, module_id, doc_id in documents:
+            groups[(app_id, module_id)].append(doc_id)
+
+        for (app_id, module_id), doc_ids in groups.items():
+            response = run_subprocess(
+                ["3plug", "drop-doc", "--app", app_id, "--module", module_id, *doc_ids],
+                "Documents deleted successfully",
+                "Failed to delete document files",
+            )
+            if response.status_code != 200:
+                for doc_id in doc_ids:
+                    self.add_error(doc_id, "Failed to delete document files")
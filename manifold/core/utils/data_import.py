@@ -0,0 +1,260 @@
+import math
+import re
+import time
+
+import pandas as pd
+from django.conf import settings
+from django.db import connections, router, transaction
+
+from ..signals import generate_name_for_model
+from .search_index import search_index
+from .series_allocator import series_allocator
+
+SUPPORTED_EXTENSIONS = ("csv", "txt", "xls", "xlsx")
+TEXT_FIELD_TYPES = ("CharField", "TextField", "EmailField", "URLField", "SlugField")
+
+
+class UnsupportedFileFormat(ValueError):
+    pass
+
+
+class NoValidColumnsError(ValueError):
+    pass
+
+
+def normalize_header(header):
+    """Normalize a column header to a snake_case field name."""
+    header = re.sub(r"[^\w\s]", "", str(header))  # Remove non-alphanumeric characters
+    return header.strip().lower().replace(" ", "_")
+
+
+class ImportResult:
+    """
+    Running totals of an import, updated after every chunk.
+    """
+
+    def __init__(self, max_errors):
+        self.max_errors = max_errors
+        self.processed = 0
+        self.imported = 0
+        self.failed = 0
+        self.chunks = 0
+        self.errors = []
+        self.started = time.monotonic()
+
+    def add_error(self, row, error):
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"data": row, "error": str(error)})
+
+    @property
+    def elapsed(self):
+        return time.monotonic() - self.started
+
+    def as_dict(self):
+        elapsed = self.elapsed
+        return {
+            "processed": self.processed,
+            "imported": self.imported,
+            "failed": self.failed,
+            "chunks": self.chunks,
+            "elapsed_seconds": round(elapsed, 3),
+            "rows_per_second": round(self.processed / elapsed, 1) if elapsed else 0,
+        }
+
+
+class DataImporter:
+    """
+    Streams rows into a model in fixed-size chunks.
+
+    CSV and TXT files are read lazily with pandas `chunksize`, so memory stays
+    bounded by the chunk size rather than the file size. Every chunk is coerced
+    with the model field map and written in its own transaction: rows with an
+    `id` are upserted with `bulk_create(update_conflicts=True)` (or an
+    `in_bulk` + `bulk_update` on backends without upsert support), new rows are
+    named in one batch and inserted with `bulk_create`. If the database rejects
+    a chunk, its rows are retried one by one so only the failing rows are
+    reported.
+    """
+
+    def __init__(
+        self, model, chunk_size=None, progress=None, max_errors=None, using=None
+    ):
+        self.model = model
+        self.chunk_size = chunk_size or getattr(
+            settings, "DATA_IMPORT_CHUNK_SIZE", 1000
+        )
+        self.progress = progress
+        self.result = ImportResult(
+            max_errors or getattr(settings, "DATA_IMPORT_MAX_ERRORS", 1000)
+        )
+        self.pk_name = model._meta.pk.attname
+        self.using = using or router.db_for_write(model)
+        self.columns = self._build_column_map()
+
+    def _build_column_map(self):
+        """
+        Map every accepted column name to (attribute name, field). Relation
+        fields accept both `customer` and `customer_id` and store the raw id.
+        """
+        columns = {}
+        for field in self.model._meta.concrete_fields:
+            columns[field.attname] = (field.attname, field)
+            columns[field.name] = (field.attname, field)
+        return columns
+
+    def iter_file_chunks(self, file, file_extension):
+        """
+        Yield lists of row dicts from an uploaded CSV, TXT or Excel file.
+        Excel workbooks cannot be read incrementally and are split after loading.
+        """
+        file_extension = file_extension.lower()
+        if file_extension not in SUPPORTED_EXTENSIONS:
+            raise UnsupportedFileFormat("Unsupported file format")
+
+        if file_extension in ["xls", "xlsx"]:
+            frames = [pd.read_excel(file, dtype=str)]
+        else:
+            frames = pd.read_csv(
+                file,
+                delimiter="\t" if file_extension == "txt" else ",",
+                dtype=str,
+                chunksize=self.chunk_size,
+            )
+
+        for frame in frames:
+            frame.columns = [normalize_header(col) for col in frame.columns]
+            records = frame.to_dict(orient="records")
+            for start in range(0, len(records), self.chunk_size):
+                yield records[start : start + self.chunk_size]
+
+    def iter_data_chunks(self, data_list):
+        for start in range(0, len(data_list), self.chunk_size):
+            yield data_list[start : start + self.chunk_size]
+
+    def run(self, chunks):
+        """
+        Import every chunk and return the final result.
+
+        Raises:
+            NoValidColumnsError: If the first chunk has no column matching a model field.
+        """
+        for chunk in chunks:
+            if not chunk:
+                continue
+            if not self.result.chunks and not any(
+                col in self.columns for col in chunk[0].keys()
+            ):
+                raise NoValidColumnsError(
+                    "No valid fields found in the data matching model fields"
+                )
+
+            self.import_chunk(chunk)
+            self.result.chunks += 1
+            if self.progress:
+                self.progress(self.result)
+        return self.result
+
+    def coerce_row(self, row):
+        values = {}
+        for column, value in row.items():
+            if column not in self.columns:
+                continue
+            attname, field = self.columns[column]
+            if value is None or (isinstance(value, float) and math.isnan(value)):
+                values[attname] = None
+                continue
+            if value == "" and field.get_internal_type() not in TEXT_FIELD_TYPES:
+                values[attname] = None
+                continue
+            values[attname] = field.to_python(value)
+        return values
+
+    def import_chunk(self, chunk):
+        rows = []
+        for row in chunk:
+            self.result.processed += 1
+            try:
+                rows.append((row, self.coerce_row(row)))
+            except Exception as e:
+                self.result.add_error(row, e)
+
+        try:
+            with transaction.atomic(using=self.using):
+                self._write_rows(rows)
+            self.result.imported += len(rows)
+        except Exception:
+            for row, values in rows:
+                try:
+                    with transaction.atomic(using=self.using):
+                        self._write_rows([(row, values)])
+                    self.result.imported += 1
+                except Exception as e:
+                    self.result.add_error(row, e)
+
+    def _write_rows(self, rows):
+        updates, inserts, upserted = {}, [], []
+        for _, values in rows:
+            if values.get(self.pk_name) not in [None, ""]:
+                # Group upserts by column set so missing columns are never overwritten
+                updates.setdefault(frozenset(values), []).append(values)
+                upserted.append(values[self.pk_name])
+            else:
+                values.pop(self.pk_name, None)
+                inserts.append(self.model(**values))
+
+        for columns, group in updates.items():
+            self._upsert(columns, group)
+
+        if inserts:
+            counts = series_allocator.count(lambda: self._name_rows(inserts))
+            with series_allocator.batch(counts):
+                self._name_rows(inserts)
+            self.model.objects.using(self.using).bulk_create(inserts)
+
+        # bulk_create sends no post_save, so index the rows explicitly
+        search_index.reindex(
+            self.model, upserted + [instance.pk for instance in inserts], self.using
+        )
+
+    def _name_rows(self, instances):
+        for instance in instances:
+            generate_name_for_model(self.model, instance)
+
+    def _upsert(self, columns, group):
+        update_fields = [
+            self.columns[column][1].name for column in columns if column != self.pk_name
+        ]
+        update_fields += [
+            field.name
+            for field in self.model._meta.concrete_fields
+            if getattr(field, "auto_now", False) and field.name not in update_fields
+        ]
+        instances = [self.model(**values) for values in group]
+        manager = self.model.objects.using(self.using)
+        features = connections[self.using].features
+
+        if not update_fields:
+            manager.bulk_create(instances, ignore_conflicts=True)
+        elif features.supports_update_conflicts:
+            unique_fields = (
+                [self.model._meta.pk.name]
+                if features.supports_update_conflicts_with_target
+                else None
+            )
+            manager.bulk_create(
+                instances,
+                update_conflicts=True,
+                update_fields=update_fields,
+                unique_fields=unique_fields,
+            )
+        else:
+            existing = manager.in_bulk(
+                [getattr(obj, self.pk_name) for obj in instances]
+            )
+            to_update = [obj for obj in instances if obj.pk in existing]
+            to_create = [obj for obj in instances if obj.pk not in existing]
+            if to_update:
+                manager.bulk_update(to_update, update_fields)
+            if to_create:
+                manager.bulk_create(to_create)
@@ -0,0 +1,282 @@
+import logging
+import multiprocessing
+import os
+import socket
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, wait
+from datetime import timedelta
+
+import django
+from django.apps import apps
+from django.conf import settings
+from django.db import close_old_connections, connections
+from django.utils import timezone
+
+from .tenant_context import use_tenant
+
+logger = logging.getLogger(__name__)
+
+
+def submit_job(job_type, model, using="default", file=None, payload=None, owner=None):
+    """
+    Queue a data job for the worker pool.
+
+    Args:
+        job_type (str): One of the registered job handlers, e.g. "import".
+        model: The target model class; stored by its app label.
+        using (str): The database alias the job and its data belong to.
+        file (File, optional): The uploaded file to process.
+        payload (dict, optional): Inline rows or options for the handler.
+        owner (User, optional): The user who submitted the job.
+
+    Returns:
+        DataJob: The queued job.
+    """
+    from ..models import DataJob
+
+    return DataJob.objects.using(using).create(
+        job_type=job_type,
+        model_name=model._meta.label,
+        file=file,
+        payload=payload,
+        owner=owner,
+    )
+
+
+def claim_next_job(using, worker_id=None):
+    """
+    Atomically move the oldest queued job to Running and return it.
+    The conditional update makes sure two workers never claim the same job.
+    The claiming worker and a first heartbeat are recorded with it.
+    """
+    from ..models import DataJob
+
+    queued = DataJob.objects.using(using).filter(status="Queued").order_by("created")
+    for job_id in queued.values_list("id", flat=True)[:10]:
+        now = timezone.now()
+        claimed = (
+            DataJob.objects.using(using)
+            .filter(id=job_id, status="Queued")
+            .update(
+                status="Running",
+                started_at=now,
+                worker_id=worker_id,
+                heartbeat_at=now,
+            )
+        )
+        if claimed:
+            return job_id
+    return None
+
+
+def update_progress(job_id, using, result):
+    from ..models import DataJob
+
+    summary = result.as_dict()
+    DataJob.objects.using(using).filter(id=job_id).update(
+        rows_processed=summary["processed"],
+        rows_succeeded=summary.get("imported", summary.get("deleted", 0)),
+        rows_failed=summary["failed"],
+        throughput=summary["rows_per_second"],
+    )
+
+
+def run_import_job(job, using):
+    from .data_import import DataImporter
+
+    model = apps.get_model(job.model_name)
+    importer = DataImporter(
+        model,
+        progress=lambda result: update_progress(job.id, using, result),
+        using=using,
+    )
+    if job.file:
+        with job.file.open("rb") as file:
+            result = importer.run(
+                importer.iter_file_chunks(file, job.file.name.split(".")[-1])
+            )
+    else:
+        result = importer.run(
+            importer.iter_data_chunks((job.payload or {}).get("data", []))
+        )
+    return result
+
+
+def run_delete_job(job, using):
+    from .bulk_delete import BulkDeleter
+
+    model = apps.get_model(job.model_name)
+    return BulkDeleter(model).run((job.payload or {}).get("ids", []))
+
+
+JOB_HANDLERS = {
+    "import": run_import_job,
+    "delete": run_delete_job,
+}
+
+
+def run_job(job_id, using):
+    """
+    Execute a claimed job and record its outcome. Runs inside a pool process.
+    """
+    from ..models import DataJob
+
+    close_old_connections()
+    job = DataJob.objects.using(using).get(id=job_id)
+    try:
+        handler = JOB_HANDLERS[job.job_type]
+        # Route naming series and any other routed queries to the job's tenant
+        with use_tenant(using):
+            result = handler(job, using)
+        update_progress(job.id, using, result)
+        DataJob.objects.using(using).filter(id=job.id).update(
+            status="Completed", finished_at=timezone.now(), errors=result.errors or None
+        )
+    except Exception as e:
+        logger.exception(f"Data job {job_id} failed")
+        DataJob.objects.using(using).filter(id=job.id).update(
+            status="Failed", finished_at=timezone.now(), error=str(e)
+        )
+    finally:
+        connections.close_all()
+    return job_id
+
+
+def _init_worker_process():
+    """Set up Django in a freshly spawned pool process."""
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "manifold.settings")
+    django.setup()
+
+
+def get_worker_id():
+    """Identify this worker process across hosts and restarts."""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class DataJobWorker:
+    """
+    Polls every configured database for queued jobs and runs them on a pool
+    of spawned processes, so pandas parsing and model work use other cores
+    without any external broker.
+
+    Every job claimed carries the worker id, and its heartbeat is refreshed
+    every `DATA_JOB_HEARTBEAT_INTERVAL` seconds (default 15) while it runs.
+    Running jobs whose heartbeat is older than `DATA_JOB_HEARTBEAT_TIMEOUT`
+    seconds (default 120) belong to a worker that died and are failed, so
+    several workers can share the databases.
+    """
+
+    def __init__(self, workers=None, poll_interval=None):
+        self.workers = workers or getattr(
+            settings, "DATA_JOB_WORKERS", max((os.cpu_count() or 2) - 1, 1)
+        )
+        self.poll_interval = poll_interval or getattr(
+            settings, "DATA_JOB_POLL_INTERVAL", 2
+        )
+        self.heartbeat_interval = getattr(settings, "DATA_JOB_HEARTBEAT_INTERVAL", 15)
+        self.heartbeat_timeout = getattr(settings, "DATA_JOB_HEARTBEAT_TIMEOUT", 120)
+        self.worker_id = get_worker_id()
+        self.running = {}
+        self.last_heartbeat = None
+
+    def recover_stale_jobs(self, now=None):
+        """
+        Jobs left Running by a worker that died cannot be resumed safely, so
+        the ones whose heartbeat went stale are marked as Failed.
+
+        Returns:
+            int: The number of jobs failed.
+        """
+        from ..models import DataJob
+
+        now = now or timezone.now()
+        cutoff = now - timedelta(seconds=self.heartbeat_timeout)
+        recovered = 0
+        for using in settings.DATABASES:
+            recovered += (
+                DataJob.objects.using(using)
+                .filter(status="Running", heartbeat_at__lt=cutoff)
+                .exclude(worker_id=self.worker_id)
+                .update(
+                    status="Failed",
+                    finished_at=now,
+                    error="The worker stopped before the job finished.",
+                )
+            )
+            # Jobs claimed before heartbeats were recorded
+            recovered += (
+                DataJob.objects.using(using)
+                .filter(
+                    status="Running", heartbeat_at__isnull=True, started_at__lt=cutoff
+                )
+                .update(
+                    status="Failed",
+                    finished_at=now,
+                    error="The worker stopped before the job finished.",
+                )
+            )
+        if recovered:
+            logger.warning(f"Failed {recovered} data jobs left by stopped workers")
+        return recovered
+
+    def heartbeat(self, now=None):
+        """
+        Refresh the heartbeat of the jobs this worker runs, then fail the
+        stale jobs of other workers. Runs at most once per heartbeat interval.
+        """
+        from ..models import DataJob
+
+        now = now or timezone.now()
+        if (
+            self.last_heartbeat
+            and (now - self.last_heartbeat).total_seconds() < self.heartbeat_interval
+        ):
+            return
+        self.last_heartbeat = now
+
+        jobs_by_db = {}
+        for job_id, using in self.running.values():
+            jobs_by_db.setdefault(using, []).append(job_id)
+        for using, job_ids in jobs_by_db.items():
+            DataJob.objects.using(using).filter(
+                id__in=job_ids, worker_id=self.worker_id, status="Running"
+            ).update(heartbeat_at=now)
+        self.recover_stale_jobs(now)
+
+    def poll(self, pool):
+        """
+        Claim queued jobs while there are free workers. Returns how many were started.
+        """
+        for future in [future for future in self.running if future.done()]:
+            self.running.pop(future)
+        self.heartbeat()
+
+        started = 0
+        for using in settings.DATABASES:
+            while len(self.running) < self.workers:
+                job_id = claim_next_job(using, self.worker_id)
+                if not job_id:
+                    break
+                self.running[pool.submit(run_job, job_id, using)] = (job_id, using)
+                started += 1
+        return started
+
+    def run(self, once=False):
+        self.recover_stale_jobs()
+        connections.close_all()
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=context,
+            initializer=_init_worker_process,
+        ) as pool:
+            while True:
+                self.poll(pool)
+                if once and not self.running:
+                    break
+                if once:
+                    # Wake up in time to keep the heartbeats fresh
+                    wait(list(self.running), timeout=self.poll_interval)
+                    continue
+                time.sleep(self.poll_interval)
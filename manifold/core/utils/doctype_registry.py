@@ -0,0 +1,220 @@
+import json
+import os
+import threading
+
+from django.conf import settings
+
+_UNBUILT = object()
+
+
+def normalize_key(value):
+    """
+    Normalize a lookup key by removing spaces and underscores and lowercasing it,
+    so that "Sales Invoice", "sales_invoice" and "SalesInvoice" share one key.
+    """
+    return str(value or "").replace(" ", "").replace("_", "").lower()
+
+
+class DoctypeRegistry:
+    """
+    Process-wide index of `sites/doctypes.json` and the per-doctype JSON configs.
+
+    The index is rebuilt only when the mtime of doctypes.json changes and every
+    parsed doctype config is kept until its own file mtime changes, so repeated
+    lookups cost a couple of `os.stat` calls instead of opening and parsing JSON.
+
+    Configs are shared between callers and must be treated as read-only.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._index_mtime = _UNBUILT
+        self._by_id = {}
+        self._by_name = {}
+        self._by_model = {}
+        self._by_model_key = {}
+        self._configs = {}
+        self.hits = 0
+        self.misses = 0
+        self.index_builds = 0
+
+    @property
+    def doctypes_path(self):
+        return os.path.join(settings.SITE_PATH, "doctypes.json")
+
+    def _get_mtime(self, path):
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _ensure_index(self):
+        """
+        Rebuild the lookup tables when doctypes.json has been created, removed
+        or modified since the last build.
+        """
+        mtime = self._get_mtime(self.doctypes_path)
+        if mtime == self._index_mtime:
+            return
+
+        with self._lock:
+            if mtime == self._index_mtime:
+                return
+
+            by_id, by_name, by_model, by_model_key = {}, {}, {}, {}
+            if mtime is not None:
+                with open(self.doctypes_path, "r") as file:
+                    doctypes_data = json.load(file)
+
+                for app in doctypes_data:
+                    for module in app.get("modules", []):
+                        for doc in module.get("docs", []):
+                            entry = self._build_entry(app, module, doc)
+                            # The first occurrence wins, matching the old linear scan
+                            by_id.setdefault(normalize_key(doc.get("id")), entry)
+                            by_name.setdefault(normalize_key(doc.get("name")), entry)
+                            if doc.get("model"):
+                                by_model.setdefault(doc["model"], []).append(entry)
+                                by_model_key.setdefault(
+                                    normalize_key(doc["model"]), entry
+                                )
+
+            self._by_id, self._by_name = by_id, by_name
+            self._by_model, self._by_model_key = by_model, by_model_key
+            self._index_mtime = mtime
+            self.index_builds += 1
+
+    def _build_entry(self, app, module, doc):
+        return {
+            "app_id": app.get("id"),
+            "app_name": app.get("name"),
+            "module_id": module.get("id"),
+            "module_name": module.get("name"),
+            "doc_id": doc.get("id"),
+            "doc_name": doc.get("name"),
+            "model": doc.get("model"),
+        }
+
+    def build_file_path(self, entry, filename=None):
+        """
+        Construct the path of a file inside the doctype folder of `entry`.
+        Defaults to the `<doc_id>.json` settings file.
+        """
+        return os.path.join(
+            settings.PROJECT_PATH,
+            "apps",
+            entry["app_id"],
+            entry["app_id"],
+            entry["module_id"],
+            "doctype",
+            entry["doc_id"],
+            filename or f"{entry['doc_id']}.json",
+        )
+
+    def find(self, name):
+        """
+        Find a doctype entry by doc id, then by display name, then by model
+        class name, all compared in normalized form.
+
+        Args:
+            name (str): The doc id, doc name or model name to look up.
+
+        Returns:
+            dict or None: The doctype entry, or None if no match is found.
+        """
+        self._ensure_index()
+        key = normalize_key(name)
+        return (
+            self._by_id.get(key)
+            or self._by_name.get(key)
+            or self._by_model_key.get(key)
+        )
+
+    def find_by_model(self, model_name):
+        """
+        Return every doctype entry registered for the exact model class name.
+        """
+        self._ensure_index()
+        return self._by_model.get(model_name, [])
+
+    def load(self, path):
+        """
+        Return the parsed JSON at `path`, re-reading it only when its mtime has
+        changed since it was cached.
+
+        Returns:
+            dict or None: The parsed content, or None if the file does not exist.
+        """
+        mtime = self._get_mtime(path)
+        if mtime is None:
+            self._configs.pop(path, None)
+            return None
+
+        cached = self._configs.get(path)
+        if cached and cached[0] == mtime:
+            self.hits += 1
+            return cached[1]
+
+        with self._lock:
+            cached = self._configs.get(path)
+            if cached and cached[0] == mtime:
+                self.hits += 1
+                return cached[1]
+
+            with open(path, "r", encoding="utf-8") as file:
+                data = json.load(file)
+            self._configs[path] = (mtime, data)
+            self.misses += 1
+            return data
+
+    def get_config(self, name, filename=None):
+        """
+        Return the parsed doctype file for `name`, or None when either the doctype
+        or its file cannot be found.
+        """
+        entry = self.find(name)
+        if not entry:
+            return None
+        return self.load(self.build_file_path(entry, filename))
+
+    def get_model_config(self, model_name):
+        """
+        Return the parsed settings file of the first doctype registered for the
+        model class name whose file exists on disk.
+        """
+        for entry in self.find_by_model(model_name):
+            config = self.load(self.build_file_path(entry))
+            if config is not None:
+                return config
+        return None
+
+    def stats(self):
+        """
+        Return the cache counters and index sizes for diagnostics.
+        """
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+            "index_builds": self.index_builds,
+            "doctypes": len(self._by_id),
+            "models": len(self._by_model),
+            "cached_configs": len(self._configs),
+        }
+
+    def clear(self):
+        """
+        Drop the index and every cached config; the next lookup rebuilds them.
+        """
+        with self._lock:
+            self._index_mtime = _UNBUILT
+            self._by_id, self._by_name = {}, {}
+            self._by_model, self._by_model_key = {}, {}
+            self._configs = {}
+            self.hits = 0
+            self.misses = 0
+            self.index_builds = 0
+
+
+doctype_registry = DoctypeRegistry()
@@ -1,7 +1,150 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
 from django.conf import settings
 from django.core.mail import EmailMultiAlternatives
-from django.template.loader import render_to_string
-from django.utils.html import strip_tags
+from django.template.loader import get_template
+from django.utils.autoreload import file_changed
+from django.utils.html import conditional_escape, strip_tags
+
+MERGE_FIELD_TOKEN = "[[merge:{name}]]"
+
+
+class EmailRenderer:
+    """
+    Renders email templates into (html, text) bodies.
+
+    Each template is loaded and compiled once per process. Rendered bodies are
+    kept, up to `EMAIL_RENDER_CACHE_SIZE` entries (default 256, least recently
+    used first out), under the template name and a hash of the context, so
+    the same email is rendered once however many times it is sent. Contexts
+    that cannot be serialized to JSON are rendered without caching.
+
+    Merge fields are rendered as placeholders and filled in per recipient
+    with `merge`, so a bulk email with a personal greeting is still rendered
+    once. They must be output plainly in the template (`{{ name }}`), not
+    used in tags or filters.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._templates = {}
+        self._bodies = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get_template(self, template_name):
+        template = self._templates.get(template_name)
+        if template is None:
+            template = get_template(template_name)
+            with self._lock:
+                self._templates[template_name] = template
+        return template
+
+    def get_key(self, template_name, context):
+        try:
+            encoded = json.dumps(context, sort_keys=True)
+        except (TypeError, ValueError):
+            return None
+        return (template_name, hashlib.sha1(encoded.encode()).hexdigest())
+
+    def render(self, template_name, context, merge_fields=()):
+        """
+        Args:
+            template_name (str): The HTML template, e.g. "email/default.html".
+            context (dict): The template context.
+            merge_fields (iterable): Names of per-recipient fields, rendered
+                as placeholders for `merge`.
+
+        Returns:
+            tuple: (html body, plain text body).
+        """
+        context = dict(context or {})
+        for name in merge_fields:
+            context[name] = MERGE_FIELD_TOKEN.format(name=name)
+
+        key = self.get_key(template_name, context)
+        if key is not None:
+            bodies = self._bodies.get(key)
+            if bodies is not None:
+                with self._lock:
+                    self.hits += 1
+                    if key in self._bodies:
+                        self._bodies.move_to_end(key)
+                return bodies
+
+        html_content = self.get_template(template_name).render(context)
+        bodies = (html_content, strip_tags(html_content))
+        with self._lock:
+            self.misses += 1
+            if key is not None:
+                self._bodies[key] = bodies
+                while len(self._bodies) > getattr(
+                    settings, "EMAIL_RENDER_CACHE_SIZE", 256
+                ):
+                    self._bodies.popitem(last=False)
+        return bodies
+
+    def merge(self, bodies, values):
+        """
+        Fill the merge fields of rendered bodies with one recipient's values,
+        escaped as the template would have.
+
+        Returns:
+            tuple: (html body, plain text body).
+        """
+        html_content, text_content = bodies
+        for name, value in values.items():
+            token = MERGE_FIELD_TOKEN.format(name=name)
+            escaped = str(conditional_escape("" if value is None else value))
+            html_content = html_content.replace(token, escaped)
+            text_content = text_content.replace(token, escaped)
+        return html_content, text_content
+
+    def stats(self):
+        return {
+            "templates": len(self._templates),
+            "bodies": len(self._bodies),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    def clear(self):
+        with self._lock:
+            self._templates.clear()
+            self._bodies.clear()
+
+
+email_renderer = EmailRenderer()
+
+
+def reset_email_renderer(sender, file_path, **kwargs):
+    """Drop compiled templates when the development server sees a file change."""
+    email_renderer.clear()
+
+
+file_changed.connect(reset_email_renderer)
+
+
+def render_email(template_name, context):
+    """
+    Returns:
+        tuple: (html body, plain text body) of an email template.
+    """
+    return email_renderer.render(template_name, context)
+
+
+def build_email(
+    subject, text_content, html_content, from_email, recipient_list, connection=None
+):
+    email = EmailMultiAlternatives(
+        subject, text_content, from_email, recipient_list, connection=connection
+    )
+    if html_content:
+        email.attach_alternative(html_content, "text/html")
+    return email
 
 
 def send_custom_email(
@@ -11,8 +154,6 @@ def send_custom_email(
     recipient_list,
     from_email=settings.DEFAULT_FROM_EMAIL,
 ):
-    html_content = render_to_string(template_name, context)
-    text_content = strip_tags(html_content)
-    email = EmailMultiAlternatives(subject, text_content, from_email, recipient_list)
-    email.attach_alternative(html_content, "text/html")
+    html_content, text_content = render_email(template_name, context)
+    email = build_email(subject, text_content, html_content, from_email, recipient_list)
     email.send()
@@ -0,0 +1,124 @@
+import threading
+import time
+from difflib import get_close_matches
+
+from django.apps import apps
+from django.conf import settings
+from django.db import router
+
+from .doctype_registry import normalize_key
+
+
+class ModelResolver:
+    """
+    Resolves the model named by a data import or bulk delete request.
+
+    Lookup order, all on normalized names (no spaces or underscores, lower
+    case): a Document name or id, whose app then provides the model, and
+    finally the old fuzzy match over document and model names. Only models a
+    Document names are reachable, so tables such as `User` or `Series` can
+    never be imported into or deleted from. The Document index is loaded once
+    per database and dropped whenever a Document is saved or deleted (and after `MODEL_RESOLVER_TTL` seconds,
+    default 300, for changes made by other processes). Every answer, including
+    "no such model", is cached until then.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._indexes = {}
+        self._models = None
+
+    def _model_index(self):
+        if self._models is None:
+            by_app = {}
+            for model in apps.get_models():
+                app = model._meta.app_config.name
+                by_app.setdefault(app, {})[model.__name__] = model
+            self._models = by_app
+        return self._models
+
+    def _get_index(self, using):
+        index = self._indexes.get(using)
+        ttl = getattr(settings, "MODEL_RESOLVER_TTL", 300)
+        if index is not None and time.monotonic() - index["built_at"] < ttl:
+            return index
+
+        from ..models import Document
+
+        documents = {}
+        for doc_id, name, app_id, app_name in Document.objects.using(using).values_list(
+            "id", "name", "app_id", "app__name"
+        ):
+            entry = (name, app_id, app_name)
+            documents.setdefault(normalize_key(name), entry)
+            documents.setdefault(normalize_key(doc_id), entry)
+
+        index = {"built_at": time.monotonic(), "documents": documents, "resolved": {}}
+        with self._lock:
+            self._indexes[using] = index
+        return index
+
+    def _match_app(self, app_id, app_name):
+        """Find the installed app of a Document, e.g. "pos" → "pos_app"."""
+        installed = self._model_index()
+        for candidate in (app_id, app_name):
+            if not candidate:
+                continue
+            for name in (candidate, f"{candidate}_app"):
+                if name in installed:
+                    return name
+        return None
+
+    def _model_in_app(self, app, key, normalized_name):
+        app_models = self._model_index().get(app, {})
+        for model_name, model in app_models.items():
+            if normalize_key(model_name) == key:
+                return model
+        matched = get_close_matches(normalized_name, app_models.keys(), n=1)
+        return app_models[matched[0]] if matched else None
+
+    def resolve(self, name):
+        """
+        Return the model class for `name`, or None.
+        """
+        from ..models import Document
+
+        index = self._get_index(router.db_for_read(Document))
+        key = normalize_key(name)
+        if key in index["resolved"]:
+            return index["resolved"][key]
+
+        model = self._resolve(index, name, key)
+        if len(index["resolved"]) < getattr(
+            settings, "MODEL_RESOLVER_MAX_ENTRIES", 10000
+        ):
+            index["resolved"][key] = model
+        return model
+
+    def _resolve(self, index, name, key):
+        normalized_name = "".join(str(name).split()).title()
+        documents = index["documents"]
+
+        entry = documents.get(key)
+        if entry is None:
+            closest = get_close_matches(key, documents.keys(), n=1)
+            if not closest:
+                return None
+            entry = documents[closest[0]]
+
+        _, app_id, app_name = entry
+        app = self._match_app(app_id, app_name)
+        if app is None:
+            return None
+        return self._model_in_app(app, key, normalized_name)
+
+    def clear(self, using=None):
+        with self._lock:
+            if using is None:
+                self._indexes.clear()
+                self._models = None
+            else:
+                self._indexes.pop(using, None)
+
+
+model_resolver = ModelResolver()
@@ -1,13 +1,15 @@
+import hashlib
 import re
 import uuid
 from datetime import datetime
+from functools import lru_cache
 
 from django.core.exceptions import ObjectDoesNotExist
-from django.db import transaction
 
-from ..models import Series
+from .series_allocator import get_block_size, next_series_value, series_allocator
 
 NAMING_SERIES_PATTERN = re.compile(r"^[\w\- \/.#{}]+$", re.UNICODE)
+FORMAT_TOKEN_PATTERN = re.compile(r"{([^{}]+)}")
 
 
 class InvalidNamingSeriesError(Exception):
@@ -118,15 +120,21 @@ class NamingManager:
     def generate_by_naming_series(self, series):
         """Generate a name using a naming series."""
         naming_series = NamingSeries()
-        return naming_series.generate_next_name(series, self.instance)
+        return naming_series.generate_next_name(
+            series, self.instance, number_generator=self.get_series_number
+        )
+
+    def get_series_number(self, doctype, digits, series):
+        """Number generator for naming series honouring the doctype block size."""
+        return get_series(doctype, digits, series, config=self.config)
 
     def generate_by_format(self, format_pattern):
         """
         Generate a name using a flexible format pattern.
         Handles tokens like {fieldname}, {MM}, {DD}, {YYYY}, {###}, and more.
-        Auto-increment tokens ({###}) consider the latest instance in the database.
+        Auto-increment tokens ({###}) use a series counter per resolved prefix.
         """
-        return generate_next_id(self.instance, format_pattern)
+        return generate_next_id(self.instance, format_pattern, self.config)
 
     def generate_by_old_style_expression(self, expression):
         """
@@ -152,11 +160,7 @@ class NamingManager:
         Retrieve the next number in the series for the given prefix.
         Ensures unique numbering for each prefix.
         """
-        with transaction.atomic():
-            obj, _ = Series.objects.get_or_create(name=prefix, defaults={"current": 0})
-            obj.current += 1
-            obj.save()
-            return str(obj.current).zfill(digits)
+        return next_series_value(prefix, digits, get_block_size(prefix, self.config))
 
     def generate_by_hash(self):
         """Generate a random hash-based name."""
@@ -171,11 +175,7 @@ class NamingManager:
     def get_series(self, digits):
         """Retrieve the next number in the series with the specified digits."""
         prefix = ""
-        with transaction.atomic():
-            obj, _ = Series.objects.get_or_create(name=prefix, defaults={"current": 0})
-            obj.current += 1
-            obj.save()
-            return str(obj.current).zfill(digits)
+        return next_series_value(prefix, digits, get_block_size(prefix, self.config))
 
 
 class NamingSeries:
@@ -202,13 +202,14 @@ class NamingSeries:
                 f"Special characters except '-', '#', '.', '/', '{{' and '}}' not allowed in naming series {series}"
             )
 
-    def generate_next_name(self, series, instance):
+    def generate_next_name(self, series, instance, number_generator=None):
         """
         Generate the next name based on the provided naming series and instance.
 
         Args:
             series (str): The naming series defining the format.
             instance: The model instance for which the name is generated.
+            number_generator (callable, optional): Allocator for `#` parts.
 
         Returns:
             str: The next name in the series.
@@ -222,7 +223,7 @@ class NamingSeries:
 
         # Split the series into parts and process it
         parts = series.split(".")
-        return parse_naming_series(parts, instance, series)
+        return parse_naming_series(parts, instance, series, number_generator)
 
 
 def parse_naming_series(parts, instance, series, number_generator=None):
@@ -254,28 +255,26 @@ def parse_naming_series(parts, instance, series, number_generator=None):
     return name
 
 
-def get_series(doctype, digits, series):
+def get_series(doctype, digits, series, config=None):
     """
     Get the next series number for a given doctype, ensuring uniqueness,
     but still keeping the original series name.
 
+    Numbers come from the shared series allocator, so concurrent workers never
+    receive the same value.
+
     Args:
         doctype (str): The name of the doctype (model).
         digits (int): The number of digits to pad the series number.
+        series (str): The naming series the number belongs to.
+        config (dict, optional): The doctype config, used for the block size.
 
     Returns:
         str: The next series number with padding, keeping original name.
     """
-    with transaction.atomic():
-        # Keep the original series name, but make it unique by adding the doctype
-        obj, _ = Series.objects.get_or_create(
-            id=f"{doctype}_{series}_series",
-            name=f"{doctype}_{series}_series",
-            defaults={"current": 0},
-        )
-        obj.current += 1
-        obj.save()
-        return str(obj.current).zfill(digits)
+    # Keep the original series name, but make it unique by adding the doctype
+    name = f"{doctype}_{series}_series"
+    return next_series_value(name, digits, get_block_size(name, config))
 
 
 def generate_autoincrement(instance):
@@ -314,74 +313,164 @@ def apply_indexing(value, index_str):
     return value
 
 
-def generate_next_id(instance, format_pattern):
+@lru_cache(maxsize=1024)
+def parse_format(format_pattern):
     """
-    Generate the next ID by matching the last ID to the format pattern,
-    replacing placeholders with current or incremented values.
+    Split a format pattern into its `{token}` placeholders once and cache the result.
+
+    Returns:
+        tuple: `(token, field_name, index_str)` triples in pattern order.
     """
-    model = instance._meta.model
-    try:
-        last_entry = model.objects.latest("created")  # Adjust 'created' field if needed
-        last_id = str(getattr(last_entry, "id", ""))
-    except ObjectDoesNotExist:
-        last_id = ""
-
-    token_pattern = re.compile(r"{([^{}]+)}")
-    tokens = token_pattern.findall(format_pattern)
-    escaped_pattern = re.escape(format_pattern)
-
-    for token in tokens:
-        field_name, index_str = extract_field_and_index(token)
-        if field_name.startswith("#"):
-            token_length = len(field_name)
-            escaped_pattern = escaped_pattern.replace(
-                re.escape(f"{{{token}}}"), rf"(\d{{{token_length}}})"
-            )
-        elif any(c in field_name for c in ["Y", "m", "d", "H", "M", "S", "%"]):
-            escaped_pattern = escaped_pattern.replace(
-                re.escape(f"{{{token}}}"), r"(\d+)"
-            )
-        else:
-            escaped_pattern = escaped_pattern.replace(
-                re.escape(f"{{{token}}}"), r"(.*?)"
-            )
+    return tuple(
+        (token,) + extract_field_and_index(token)
+        for token in FORMAT_TOKEN_PATTERN.findall(format_pattern)
+    )
+
+
+DATE_TOKEN_CHARS = ("Y", "m", "d", "H", "M", "S", "%")
+
+
+def to_strftime(field_name):
+    """Translate a date token such as `YYYY-MM` into a strftime format."""
+    return (
+        field_name.replace("YYYY", "%Y")
+        .replace("YY", "%y")
+        .replace("MM", "%m")
+        .replace("DD", "%d")
+        .replace("hh", "%H")
+        .replace("mm", "%M")
+        .replace("ss", "%S")
+    )
+
+
+class CompiledFormat:
+    """
+    A format pattern such as `INV-{YYYY}-{####}` compiled once for a model.
 
-    match = re.match(escaped_pattern, last_id)
-    matched_values = match.groups() if match else ["_"] * len(tokens)
-
-    result = format_pattern
-    for i, token in enumerate(tokens):
-        field_name, index_str = extract_field_and_index(token)
-
-        if field_name.startswith("#"):
-            try:
-                last_number = int(matched_values[i])
-            except ValueError:
-                last_number = 0
-            replacement = str(last_number + 1).zfill(len(field_name))
-        elif hasattr(instance, field_name):
-            value = getattr(instance, field_name, "")
-            if hasattr(value, "id"):
-                value = str(value.id)
+    Every `{#...}` token shares one counter kept in the `Series` table under
+    the resolved prefix, i.e. the pattern with all field and date tokens filled
+    in, so `{YYYY}-{####}` restarts per year and each allocation is a single
+    atomic update instead of a `latest("created")` query and a regex parse.
+    """
+
+    COUNTER = "counter"
+    FIELD = "field"
+    DATE = "date"
+    LITERAL = "literal"
+
+    def __init__(self, model, format_pattern):
+        self.model = model
+        self.format_pattern = format_pattern
+        self.segments = []
+        self.has_counter = False
+
+        for token, field_name, index_str in parse_format(format_pattern):
+            placeholder = f"{{{token}}}"
+            if field_name.startswith("#"):
+                kind, value = self.COUNTER, len(field_name)
+                self.has_counter = True
+            elif hasattr(model, field_name):
+                kind, value = self.FIELD, (field_name, index_str)
+            elif any(c in field_name for c in DATE_TOKEN_CHARS):
+                kind, value = self.DATE, to_strftime(field_name)
             else:
-                value = str(value)
-            if index_str:
-                value = apply_indexing(value, index_str)
-            replacement = str(value)
-        elif any(c in field_name for c in ["Y", "m", "d", "H", "M", "S", "%"]):
-            today = datetime.today()
-            replacement = today.strftime(
-                field_name.replace("YYYY", "%Y")
-                .replace("YY", "%y")
-                .replace("MM", "%m")
-                .replace("DD", "%d")
-                .replace("hh", "%H")
-                .replace("mm", "%M")
-                .replace("ss", "%S")
-            )
-        else:
-            replacement = matched_values[i] if matched_values[i] else f"{{{token}}}"
+                kind, value = self.LITERAL, placeholder
+            self.segments.append((placeholder, kind, value))
 
-        result = result.replace(f"{{{token}}}", replacement, 1)
+    def resolve(self, instance, today=None):
+        """
+        Fill in every non-counter token for `instance`.
 
-    return result
+        Returns:
+            str: The pattern with only the counter placeholders left.
+        """
+        today = today or datetime.today()
+        result = self.format_pattern
+        for placeholder, kind, value in self.segments:
+            if kind == self.FIELD:
+                field_name, index_str = value
+                field_value = getattr(instance, field_name, "")
+                if hasattr(field_value, "id"):
+                    field_value = str(field_value.id)
+                else:
+                    field_value = str(field_value)
+                if index_str:
+                    field_value = apply_indexing(field_value, index_str)
+                replacement = str(field_value)
+            elif kind == self.DATE:
+                replacement = today.strftime(value)
+            else:
+                continue
+            result = result.replace(placeholder, replacement, 1)
+        return result
+
+    def render(self, resolved, number):
+        """Substitute the counter placeholders of a resolved pattern."""
+        result = resolved
+        for placeholder, kind, value in self.segments:
+            if kind == self.COUNTER:
+                result = result.replace(placeholder, str(number).zfill(value), 1)
+        return result
+
+    def series_name(self, resolved):
+        name = f"{self.model._meta.label_lower}:{resolved}"
+        if len(name) > 255:
+            # Keep long resolved prefixes within Series.name
+            digest = hashlib.sha1(resolved.encode("utf-8")).hexdigest()
+            name = f"{self.model._meta.label_lower}:{digest}"
+        return name
+
+    def existing_max(self, resolved):
+        """
+        Highest counter already used for `resolved`, read once from the model
+        table when the series row does not exist yet (e.g. after upgrading from
+        the `latest("created")` based naming).
+        """
+        resolved_regex = re.escape(resolved)
+        for placeholder, kind, value in self.segments:
+            if kind == self.COUNTER:
+                resolved_regex = resolved_regex.replace(
+                    re.escape(placeholder), rf"(\d{{{value}}})", 1
+                )
+        pattern = re.compile(rf"^{resolved_regex}$")
+        literal_prefix = resolved.split("{", 1)[0]
+
+        highest = 0
+        ids = self.model._default_manager.filter(
+            pk__startswith=literal_prefix
+        ).values_list("pk", flat=True)
+        for existing_id in ids.iterator():
+            match = pattern.match(str(existing_id))
+            if match:
+                highest = max(highest, int(match.group(1)))
+        return highest
+
+    def generate(self, instance, config=None):
+        resolved = self.resolve(instance)
+        if not self.has_counter:
+            return resolved
+
+        name = self.series_name(resolved)
+        number = series_allocator.next(
+            name,
+            get_block_size(name, config),
+            seed=lambda: self.existing_max(resolved),
+        )
+        return self.render(resolved, number)
+
+
+@lru_cache(maxsize=1024)
+def compile_format(model, format_pattern):
+    """Compile and cache a format pattern per (model, pattern)."""
+    return CompiledFormat(model, format_pattern)
+
+
+def generate_next_id(instance, format_pattern, config=None):
+    """
+    Generate the next ID for the format pattern, replacing placeholders with
+    field values, the current date and the next number of the series for the
+    resolved prefix.
+    """
+    return compile_format(instance._meta.model, format_pattern).generate(
+        instance, config
+    )
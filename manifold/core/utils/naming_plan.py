@@ -0,0 +1,100 @@
+import threading
+import time
+
+from django.conf import settings
+
+from .doctype_registry import doctype_registry
+from .naming_manager import parse_format
+
+# Models that never go through doctype naming
+SKIP_MODELS = {
+    "Token",
+    "Session",
+    "LogEntry",
+    "Group",
+    "Permission",
+    "UserIPAddress",
+    "OTP",
+    "User",
+    "ChangeLog",
+}
+
+CODE_FIELD_TYPES = ("Barcode", "QR Code")
+
+
+class NamingPlan:
+    """
+    Everything the pre_save naming signal needs for one model, derived once from
+    its doctype config: the naming rule, the formatted fields and the
+    Barcode/QR code fields, with their templates already parsed.
+    """
+
+    def __init__(self, model_name, config):
+        self.model_name = model_name
+        self.config = config
+        self.is_single = str((config or {}).get("issingle")).lower() in ("1", "true")
+        self.track_changes = (config or {}).get("track_changes") in (True, 1)
+        self.format_fields = []
+        self.code_fields = []
+        self.loaded_at = time.monotonic()
+
+        for field in (config or {}).get("fields") or []:
+            fieldname = field.get("fieldname")
+            format_value = field.get("format")
+
+            if format_value:
+                parse_format(format_value)
+                self.format_fields.append((fieldname, format_value))
+
+            if field.get("fieldtype") in CODE_FIELD_TYPES:
+                options = field.get("options", "{id}")
+                parse_format(options)
+                self.code_fields.append((fieldname, options))
+
+        autoname = (config or {}).get("autoname") or ""
+        if config and config.get("naming_rule") == "Expression" and ":" in autoname:
+            parse_format(autoname[autoname.index(":") + 1 :].strip())
+
+
+_plans = {}
+_plans_lock = threading.Lock()
+
+
+def get_naming_plan(model):
+    """
+    Return the cached naming plan for a model class, building it on first use.
+
+    Plans are re-validated against the doctype registry at most once every
+    `NAMING_PLAN_REFRESH_SECONDS` (default 30), so saves in between do no
+    filesystem work at all.
+
+    Args:
+        model: The model class being saved.
+
+    Returns:
+        NamingPlan: The naming plan for the model.
+    """
+    model_name = model.__name__
+    refresh_seconds = getattr(settings, "NAMING_PLAN_REFRESH_SECONDS", 30)
+
+    plan = _plans.get(model)
+    if plan and time.monotonic() - plan.loaded_at < refresh_seconds:
+        return plan
+
+    config = doctype_registry.get_model_config(model_name)
+    if plan and plan.config is config:
+        plan.loaded_at = time.monotonic()
+        return plan
+
+    with _plans_lock:
+        plan = NamingPlan(model_name, config)
+        _plans[model] = plan
+    return plan
+
+
+def clear_naming_plans():
+    """
+    Drop every cached naming plan; they are rebuilt on the next save.
+    """
+    with _plans_lock:
+        _plans.clear()
@@ -0,0 +1,445 @@
+import logging
+import threading
+import time
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.db import connections, router, transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from .email import build_email, email_renderer
+from .sms import (
+    get_provider,
+    normalize_phone_number,
+    send_254_sms_batch,
+    send_sms_to_27_batch,
+)
+
+logger = logging.getLogger(__name__)
+
+UPDATE_FIELDS = ["status", "attempts", "next_attempt_at", "sent_at", "error"]
+
+SMS_SENDERS = {
+    "254": send_254_sms_batch,
+    "27": send_sms_to_27_batch,
+}
+
+
+def queue_email(
+    subject,
+    template_name,
+    context,
+    recipient_list,
+    from_email=None,
+    using=None,
+    merge_fields=None,
+):
+    """
+    Render an email once and queue one outbox row per recipient.
+
+    Args:
+        subject (str): The subject line.
+        template_name (str): The HTML template, e.g. "email/default.html".
+        context (dict): The template context, shared by every recipient.
+        recipient_list (list): Email addresses; blanks are skipped.
+        from_email (str, optional): Defaults to `DEFAULT_FROM_EMAIL`.
+        using (str, optional): The database of the outbox.
+        merge_fields (dict, optional): Per-recipient values keyed by email
+            address, e.g. {"a@example.com": {"name": "Ann"}}, filled into
+            the rendered body without rendering it again.
+
+    Returns:
+        list: The queued Notification rows.
+    """
+    from ..models import Notification
+
+    merge_fields = merge_fields or {}
+    field_names = sorted({name for values in merge_fields.values() for name in values})
+    bodies = email_renderer.render(template_name, context, merge_fields=field_names)
+    empty = dict.fromkeys(field_names)
+
+    notifications = []
+    for recipient in dict.fromkeys(recipient_list):
+        if not recipient:
+            continue
+        html_content, text_content = (
+            email_renderer.merge(bodies, {**empty, **merge_fields.get(recipient, {})})
+            if field_names
+            else bodies
+        )
+        notifications.append(
+            Notification(
+                channel="email",
+                recipient=recipient,
+                subject=subject,
+                body=text_content,
+                html_body=html_content,
+                from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+            )
+        )
+    using = using or router.db_for_write(Notification)
+    return Notification.objects.using(using).bulk_create(notifications)
+
+
+def queue_sms(phone_numbers, message, code="254", using=None):
+    """
+    Queue one SMS per phone number. Numbers are normalized as `send_sms`
+    does, and the ones no gateway serves are dropped.
+
+    Returns:
+        list: The queued Notification rows.
+    """
+    from ..models import Notification
+
+    notifications = []
+    for phone_number in dict.fromkeys(phone_numbers):
+        if not phone_number:
+            continue
+        number = normalize_phone_number(phone_number, code)
+        if get_provider(number) is None:
+            logger.warning(f"No SMS gateway for {phone_number}")
+            continue
+        notifications.append(
+            Notification(channel="sms", recipient=number, body=message)
+        )
+    using = using or router.db_for_write(Notification)
+    return Notification.objects.using(using).bulk_create(notifications)
+
+
+class NotificationStats:
+    """
+    Throughput and failure counters of the dispatcher, per channel, for this
+    process.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._channels = {}
+
+    def record(self, channel, sent=0, failed=0, retried=0, seconds=0.0):
+        with self._lock:
+            entry = self._channels.setdefault(
+                channel,
+                {"batches": 0, "sent": 0, "failed": 0, "retried": 0, "seconds": 0.0},
+            )
+            entry["batches"] += 1
+            entry["sent"] += sent
+            entry["failed"] += failed
+            entry["retried"] += retried
+            entry["seconds"] += seconds
+
+    def stats(self):
+        with self._lock:
+            return {
+                channel: {
+                    **entry,
+                    "seconds": round(entry["seconds"], 3),
+                    "per_second": (
+                        round(entry["sent"] / entry["seconds"], 1)
+                        if entry["seconds"]
+                        else 0
+                    ),
+                }
+                for channel, entry in self._channels.items()
+            }
+
+    def clear(self):
+        with self._lock:
+            self._channels.clear()
+
+
+notification_stats = NotificationStats()
+
+
+def outbox_summary(using=None):
+    """
+    Returns:
+        dict: Row counts of the outbox by channel and status.
+    """
+    from ..models import Notification
+
+    using = using or router.db_for_read(Notification)
+    summary = {}
+    for row in (
+        Notification.objects.using(using)
+        .values("channel", "status")
+        .annotate(total=Count("id"))
+        .order_by()
+    ):
+        summary.setdefault(row["channel"], {})[row["status"]] = row["total"]
+    return summary
+
+
+class NotificationDispatcher:
+    """
+    Sends the queued notifications of one database in batches.
+
+    Each batch of up to `NOTIFICATION_BATCH_SIZE` rows (default 200) that are
+    due is claimed by moving it to Sending (with `SELECT ... FOR UPDATE SKIP
+    LOCKED` where the database supports it), so several dispatchers can share
+    the outbox. Emails of a batch go through one SMTP connection, and SMS are
+    packed into one gateway call per provider. A failed row is retried
+    `NOTIFICATION_RETRY_DELAY` seconds later (default 30), doubling on every
+    attempt, until `NOTIFICATION_MAX_ATTEMPTS` (default 5) is reached. Rows
+    left Sending for `NOTIFICATION_CLAIM_TIMEOUT` seconds (default 600) by a
+    dispatcher that died are queued again.
+    """
+
+    def __init__(self, using=None, batch_size=None):
+        from ..models import Notification
+
+        self.using = using or router.db_for_write(Notification)
+        self.batch_size = batch_size or getattr(
+            settings, "NOTIFICATION_BATCH_SIZE", 200
+        )
+
+    def claim_batch(self, now):
+        """
+        Move up to a batch of due rows to Sending under a fresh claim token
+        and return the rows this call claimed. The conditional UPDATE keeps
+        two dispatchers from claiming the same row where the database has no
+        SKIP LOCKED.
+        """
+        from ..models import Notification
+
+        queryset = Notification.objects.using(self.using).filter(
+            status="Queued", next_attempt_at__lte=now
+        )
+        if connections[self.using].features.has_select_for_update_skip_locked:
+            queryset = queryset.select_for_update(skip_locked=True)
+
+        with transaction.atomic(using=self.using):
+            ids = list(
+                queryset.order_by("next_attempt_at").values_list("id", flat=True)[
+                    : self.batch_size
+                ]
+            )
+            if not ids:
+                return []
+            token = uuid.uuid4().hex
+            # Claimed rows are pushed past the claim timeout, which is when a
+            # crashed dispatcher's rows become due again
+            Notification.objects.using(self.using).filter(
+                id__in=ids, status="Queued"
+            ).update(
+                status="Sending",
+                claim_token=token,
+                next_attempt_at=now + timedelta(seconds=self.claim_timeout),
+            )
+        return list(
+            Notification.objects.using(self.using)
+            .filter(id__in=ids, claim_token=token)
+            .order_by("next_attempt_at", "id")
+        )
+
+    @property
+    def claim_timeout(self):
+        return getattr(settings, "NOTIFICATION_CLAIM_TIMEOUT", 600)
+
+    def requeue_stale(self, now):
+        from ..models import Notification
+
+        return (
+            Notification.objects.using(self.using)
+            .filter(status="Sending", next_attempt_at__lte=now)
+            .update(status="Queued")
+        )
+
+    def send_emails(self, notifications):
+        """
+        Returns:
+            dict: The error of each notification id, None when sent.
+        """
+        results = {}
+        connection = get_connection(fail_silently=False)
+        try:
+            connection.open()
+            for notification in notifications:
+                message = build_email(
+                    notification.subject,
+                    notification.body,
+                    notification.html_body,
+                    notification.from_email,
+                    [notification.recipient],
+                    connection=connection,
+                )
+                try:
+                    connection.send_messages([message])
+                    results[notification.id] = None
+                except Exception as e:
+                    results[notification.id] = str(e) or e.__class__.__name__
+                    # The connection may be broken, start a new one
+                    connection.close()
+                    connection.open()
+        except Exception as e:
+            error = str(e) or e.__class__.__name__
+            for notification in notifications:
+                results.setdefault(notification.id, error)
+        finally:
+            connection.close()
+        return results
+
+    def send_sms(self, notifications):
+        """
+        Returns:
+            dict: The error of each notification id, None when sent.
+        """
+        results = {}
+        by_provider = {}
+        for notification in notifications:
+            provider = get_provider(notification.recipient)
+            if provider is None:
+                results[notification.id] = "No SMS gateway for this number"
+            else:
+                by_provider.setdefault(provider, []).append(notification)
+
+        for provider, provider_notifications in by_provider.items():
+            try:
+                errors = SMS_SENDERS[provider](
+                    [
+                        (notification.recipient, notification.body)
+                        for notification in provider_notifications
+                    ]
+                )
+            except Exception as e:
+                errors = {
+                    notification.recipient: str(e) or e.__class__.__name__
+                    for notification in provider_notifications
+                }
+            for notification in provider_notifications:
+                results[notification.id] = errors.get(
+                    notification.recipient, "No delivery report"
+                )
+        return results
+
+    def record_results(self, notifications, results, now):
+        """
+        Apply the send results to the claimed rows and save them with one
+        `bulk_update`.
+
+        Returns:
+            dict: Counts of sent, failed and retried notifications.
+        """
+        from ..models import Notification
+
+        max_attempts = getattr(settings, "NOTIFICATION_MAX_ATTEMPTS", 5)
+        retry_delay = getattr(settings, "NOTIFICATION_RETRY_DELAY", 30)
+        counts = {"sent": 0, "failed": 0, "retried": 0}
+
+        for notification in notifications:
+            error = results.get(notification.id, "Not sent")
+            notification.attempts += 1
+            if error is None:
+                notification.status = "Sent"
+                notification.sent_at = now
+                notification.error = None
+                counts["sent"] += 1
+            elif notification.attempts < max_attempts:
+                notification.status = "Queued"
+                notification.next_attempt_at = now + timedelta(
+                    seconds=retry_delay * 2 ** (notification.attempts - 1)
+                )
+                notification.error = error
+                counts["retried"] += 1
+            else:
+                notification.status = "Failed"
+                notification.error = error
+                counts["failed"] += 1
+                logger.error(
+                    f"Giving up on {notification.channel} to {notification.recipient}: {error}"
+                )
+
+        Notification.objects.using(self.using).bulk_update(
+            notifications, UPDATE_FIELDS, batch_size=self.batch_size
+        )
+        return counts
+
+    def run_batch(self, now=None):
+        """
+        Claim and send one batch.
+
+        Returns:
+            int: The number of notifications claimed.
+        """
+        notifications = self.claim_batch(now or timezone.now())
+        by_channel = {}
+        for notification in notifications:
+            by_channel.setdefault(notification.channel, []).append(notification)
+
+        for channel, channel_notifications in by_channel.items():
+            started = time.monotonic()
+            if channel == "email":
+                results = self.send_emails(channel_notifications)
+            else:
+                results = self.send_sms(channel_notifications)
+            counts = self.record_results(channel_notifications, results, timezone.now())
+            notification_stats.record(
+                channel, seconds=time.monotonic() - started, **counts
+            )
+        return len(notifications)
+
+    def run(self, now=None):
+        """
+        Send everything due, batch after batch.
+
+        Returns:
+            int: The number of notifications processed.
+        """
+        self.requeue_stale(now or timezone.now())
+        processed = 0
+        while True:
+            claimed = self.run_batch(now)
+            processed += claimed
+            if claimed < self.batch_size:
+                break
+        if processed:
+            logger.info(f"Dispatched {processed} notifications from {self.using}")
+        return processed
+
+
+def prune_notifications(using=None, now=None):
+    """
+    Delete Sent and Failed notifications older than
+    `NOTIFICATION_RETENTION_DAYS` (default 30), so message bodies are not
+    kept indefinitely.
+
+    Returns:
+        int: The number of rows deleted.
+    """
+    from ..models import Notification
+
+    using = using or router.db_for_write(Notification)
+    cutoff = (now or timezone.now()) - timedelta(
+        days=getattr(settings, "NOTIFICATION_RETENTION_DAYS", 30)
+    )
+    deleted, _ = (
+        Notification.objects.using(using)
+        .filter(status__in=["Sent", "Failed"], created__lt=cutoff)
+        .delete()
+    )
+    return deleted
+
+
+def dispatch_notifications(poll_interval=None, once=False):
+    """
+    Run a `NotificationDispatcher` over every configured database, once or
+    polling every `NOTIFICATION_POLL_INTERVAL` seconds (default 2).
+
+    Returns:
+        int: The number of notifications processed (when `once`).
+    """
+    poll_interval = poll_interval or getattr(settings, "NOTIFICATION_POLL_INTERVAL", 2)
+    while True:
+        processed = 0
+        for using in settings.DATABASES:
+            try:
+                processed += NotificationDispatcher(using=using).run()
+            except Exception:
+                logger.exception(f"Notification dispatch failed on {using}")
+        if once:
+            return processed
+        if not processed:
+            time.sleep(poll_interval)
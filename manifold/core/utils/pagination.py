@@ -0,0 +1,242 @@
+import base64
+import datetime
+import decimal
+import hashlib
+import json
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
+from django.db import connections
+from django.db.models import F, Q
+
+COUNT_MODES = ("exact", "estimate", "none")
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_value(value):
+    """
+    JSON-safe form of a sort value that keeps its exact type, e.g.
+    datetimes with their microseconds, which `DjangoJSONEncoder` drops.
+    """
+    if isinstance(value, datetime.datetime):
+        return {"t": "datetime", "v": value.isoformat()}
+    if isinstance(value, datetime.date):
+        return {"t": "date", "v": value.isoformat()}
+    if isinstance(value, datetime.time):
+        return {"t": "time", "v": value.isoformat()}
+    if isinstance(value, decimal.Decimal):
+        return {"t": "decimal", "v": str(value)}
+    if isinstance(value, uuid.UUID):
+        return {"t": "uuid", "v": str(value)}
+    return value
+
+
+def decode_value(value):
+    if not isinstance(value, dict):
+        return value
+    decoders = {
+        "datetime": datetime.datetime.fromisoformat,
+        "date": datetime.date.fromisoformat,
+        "time": datetime.time.fromisoformat,
+        "decimal": decimal.Decimal,
+        "uuid": uuid.UUID,
+    }
+    return decoders[value["t"]](value["v"])
+
+
+def encode_cursor(position, direction):
+    """
+    Build an opaque token from the (sort value, id) of a boundary row.
+    """
+    payload = json.dumps(
+        {
+            "v": encode_value(position[0]),
+            "id": encode_value(position[1]),
+            "d": direction,
+        },
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token):
+    """
+    Returns:
+        tuple: ((sort value, id), direction) as stored by `encode_cursor`.
+
+    Raises:
+        InvalidCursor: If the token was not produced by `encode_cursor`.
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return (
+            (decode_value(payload["v"]), decode_value(payload["id"])),
+            payload["d"],
+        )
+    except (ValueError, TypeError, KeyError, decimal.InvalidOperation):
+        raise InvalidCursor("Invalid cursor.")
+
+
+class KeysetPaginator:
+    """
+    Cursor pagination on (sort field, primary key).
+
+    Each page is fetched with a `WHERE (sort, id) beyond the cursor` filter and
+    a `LIMIT`, so its cost does not depend on how deep the page is, unlike
+    OFFSET slicing. The primary key breaks ties between equal sort values and
+    NULL sort values are always ordered last.
+    """
+
+    def __init__(self, queryset, sort_field, descending, page_length):
+        self.queryset = queryset
+        self.model = queryset.model
+        self.pk_name = self.model._meta.pk.name
+        self.sort_field = sort_field
+        self.field = self.model._meta.get_field(sort_field)
+        self.descending = descending
+        self.page_length = page_length
+
+    def order(self, reverse=False):
+        descending = self.descending != reverse
+        if self.sort_field == self.pk_name:
+            return [F(self.pk_name).desc() if descending else F(self.pk_name).asc()]
+        nulls = {"nulls_first": True} if reverse else {"nulls_last": True}
+        if descending:
+            return [F(self.sort_field).desc(**nulls), F(self.pk_name).desc()]
+        return [F(self.sort_field).asc(**nulls), F(self.pk_name).asc()]
+
+    def after(self, position, reverse=False):
+        """
+        Condition selecting the rows that come after `position` in the page
+        order, or before it when `reverse` is set.
+        """
+        value, pk = position
+        lookup = "lt" if self.descending != reverse else "gt"
+        pk_after = Q(**{f"{self.pk_name}__{lookup}": pk})
+        if self.sort_field == self.pk_name:
+            return pk_after
+
+        sort_null = Q(**{f"{self.sort_field}__isnull": True})
+        if value is None:
+            # Nulls come last: moving forward stays among nulls, moving back
+            # reaches every non-null row
+            return (sort_null & pk_after) if not reverse else (~sort_null | pk_after)
+
+        condition = Q(**{f"{self.sort_field}__{lookup}": value}) | (
+            Q(**{self.sort_field: value}) & pk_after
+        )
+        return condition | sort_null if not reverse else condition
+
+    def position(self, instance):
+        return (
+            self.field.value_from_object(instance),
+            getattr(instance, self.model._meta.pk.attname),
+        )
+
+    def page(self, cursor=None):
+        """
+        Fetch one page.
+
+        Args:
+            cursor (str, optional): A `next` or `previous` token of an earlier page.
+
+        Returns:
+            tuple: (rows, next token or None, previous token or None).
+        """
+        direction = "next"
+        queryset = self.queryset
+        if cursor:
+            (value, pk), direction = decode_cursor(cursor)
+            if value is not None:
+                value = self.field.to_python(value)
+            queryset = queryset.filter(
+                self.after((value, pk), reverse=direction == "prev")
+            )
+
+        reverse = direction == "prev"
+        rows = list(queryset.order_by(*self.order(reverse))[: self.page_length + 1])
+        has_more = len(rows) > self.page_length
+        rows = rows[: self.page_length]
+        if reverse:
+            rows.reverse()
+
+        if not rows:
+            return rows, None, None
+
+        has_next = has_more if not reverse else True
+        has_prev = bool(cursor) if not reverse else has_more
+        next_token = (
+            encode_cursor(self.position(rows[-1]), "next") if has_next else None
+        )
+        prev_token = encode_cursor(self.position(rows[0]), "prev") if has_prev else None
+        return rows, next_token, prev_token
+
+
+def count_queryset(queryset, mode="estimate"):
+    """
+    Count the rows of a filtered queryset without paying for it on every page.
+
+    Args:
+        queryset: The filtered queryset.
+        mode (str): `exact` counts and caches the result per filter signature
+            for `PAGINATION_COUNT_CACHE_TIMEOUT` seconds (default 60);
+            `estimate` reads the table statistics when the queryset is
+            unfiltered and falls back to the cached exact count; `none` skips
+            counting.
+
+    Returns:
+        tuple: (count or None, whether the count is an estimate).
+    """
+    if mode == "none":
+        return None, False
+
+    if mode == "estimate" and not queryset.query.where:
+        estimate = estimate_table_rows(queryset.model, queryset.db)
+        if estimate is not None:
+            return estimate, True
+
+    try:
+        sql, params = queryset.query.sql_with_params()
+    except EmptyResultSet:
+        # Django knows the filter matches nothing, e.g. pk__in=[]
+        return 0, False
+    signature = hashlib.sha1(f"{queryset.db}:{sql}:{params!r}".encode()).hexdigest()
+    key = f"list_count:{signature}"
+    total = cache.get(key)
+    if total is None:
+        total = queryset.count()
+        cache.set(
+            key, total, timeout=getattr(settings, "PAGINATION_COUNT_CACHE_TIMEOUT", 60)
+        )
+    return total, False
+
+
+def estimate_table_rows(model, using):
+    """
+    Row count of a table from the database statistics, or None on backends
+    that keep none (SQLite) or when the statistics are not populated yet.
+    """
+    connection = connections[using]
+    table = model._meta.db_table
+    if connection.vendor == "postgresql":
+        sql = "SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(%s)"
+    elif connection.vendor == "mysql":
+        sql = (
+            "SELECT TABLE_ROWS FROM information_schema.TABLES "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s"
+        )
+    else:
+        return None
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [table])
+        row = cursor.fetchone()
+    if not row or row[0] is None or row[0] < 0:
+        return None
+    return int(row[0])
@@ -0,0 +1,187 @@
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
+
+SNAPSHOT_CACHE_KEY = "permission_snapshot:{using}:{user_id}:{version}"
+
+
+class PermissionSnapshot:
+    """
+    What a user may do, as of one permission version: whether they belong to
+    any group, every "app_label.codename" permission they hold directly or
+    through a group, and the codenames granted by their groups.
+    """
+
+    __slots__ = ("has_groups", "permissions", "group_codenames")
+
+    def __init__(self, has_groups, permissions, group_codenames):
+        self.has_groups = has_groups
+        self.permissions = frozenset(permissions)
+        self.group_codenames = frozenset(group_codenames)
+
+    def to_dict(self):
+        return {
+            "has_groups": self.has_groups,
+            "permissions": sorted(self.permissions),
+            "group_codenames": sorted(self.group_codenames),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["has_groups"], data["permissions"], data["group_codenames"])
+
+
+class PermissionCache:
+    """
+    Per-user permission snapshots, kept in the process and in the Django
+    cache and keyed by a permission version per database.
+
+    The version is a `PermissionVersion` row of each database, bumped by
+    signals after any commit that changes group membership, group or user
+    permissions, or a Group or Permission, which retires every snapshot of
+    that database in every process at once. Processes re-read the version at
+    most every `PERMISSION_VERSION_CHECK_INTERVAL` seconds (default 1), so a
+    permission check costs no queries most of the time. Snapshots are kept in the shared cache
+    for `PERMISSION_SNAPSHOT_TTL` seconds (default 3600).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._versions = {}
+        self._snapshots = {}
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+
+    def get_version(self, using):
+        interval = getattr(settings, "PERMISSION_VERSION_CHECK_INTERVAL", 1)
+        cached = self._versions.get(using)
+        if cached is not None and time.monotonic() - cached[1] < interval:
+            return cached[0]
+
+        from ..models import PermissionVersion
+
+        version = (
+            PermissionVersion.objects.using(using)
+            .filter(pk=1)
+            .values_list("version", flat=True)
+            .first()
+        ) or 0
+        self._versions[using] = (version, time.monotonic())
+        return version
+
+    def bump(self, using):
+        """
+        Invalidate every snapshot of database `using`, in every process.
+        Call it once the change is committed, so that no process rebuilds a
+        snapshot from the old data under the new version.
+        """
+        from ..models import PermissionVersion
+
+        updated = (
+            PermissionVersion.objects.using(using)
+            .filter(pk=1)
+            .update(version=F("version") + 1)
+        )
+        if not updated:
+            PermissionVersion.objects.using(using).get_or_create(
+                pk=1, defaults={"version": 1}
+            )
+
+        with self._lock:
+            self._versions.pop(using, None)
+            self._snapshots = {
+                user_key: entry
+                for user_key, entry in self._snapshots.items()
+                if user_key[0] != using
+            }
+
+    def get(self, user):
+        """
+        Return the permission snapshot of `user`, building it with three
+        queries when neither the process nor the shared cache holds one for
+        the current version.
+        """
+        using = user._state.db or "default"
+        version = self.get_version(using)
+        user_key = (using, user.pk)
+
+        entry = self._snapshots.get(user_key)
+        if entry is not None and entry[0] == version:
+            self.hits += 1
+            return entry[1]
+
+        shared_key = SNAPSHOT_CACHE_KEY.format(
+            using=using, user_id=user.pk, version=version
+        )
+        data = cache.get(shared_key)
+        if data is not None:
+            self.shared_hits += 1
+            snapshot = PermissionSnapshot.from_dict(data)
+        else:
+            self.misses += 1
+            snapshot = self._build(user, using)
+            cache.set(
+                shared_key,
+                snapshot.to_dict(),
+                timeout=getattr(settings, "PERMISSION_SNAPSHOT_TTL", 3600),
+            )
+
+        with self._lock:
+            if len(self._snapshots) >= getattr(
+                settings, "PERMISSION_CACHE_MAX_USERS", 10000
+            ):
+                self._snapshots.clear()
+            self._snapshots[user_key] = (version, snapshot)
+        return snapshot
+
+    def _build(self, user, using):
+        from django.contrib.auth.models import Permission
+
+        group_ids = list(user.groups.values_list("id", flat=True))
+        group_permissions = list(
+            Permission.objects.using(using)
+            .filter(group__in=group_ids)
+            .values_list("content_type__app_label", "codename")
+        )
+        user_permissions = list(
+            user.user_permissions.values_list("content_type__app_label", "codename")
+        )
+        return PermissionSnapshot(
+            has_groups=bool(group_ids),
+            permissions={
+                f"{app_label}.{codename}"
+                for app_label, codename in group_permissions + user_permissions
+            },
+            group_codenames={codename for _, codename in group_permissions},
+        )
+
+    def has_perm(self, user, permission):
+        """
+        Same answer as `user.has_perm(permission)` with the model backend.
+        """
+        if not user.is_active:
+            return False
+        if user.is_superuser:
+            return True
+        return permission in self.get(user).permissions
+
+    def stats(self):
+        return {
+            "versions": {using: entry[0] for using, entry in self._versions.items()},
+            "users": len(self._snapshots),
+            "hits": self.hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+        }
+
+    def clear(self):
+        with self._lock:
+            self._versions.clear()
+            self._snapshots.clear()
+
+
+permission_cache = PermissionCache()
@@ -0,0 +1,166 @@
+import threading
+
+from django.conf import settings
+from rest_framework.serializers import ALL_FIELDS
+
+# Relations that are never serialized
+SKIP_RELATED_MODELS = ("Token", "Session")
+
+_lookups = {}
+_lookups_lock = threading.Lock()
+
+
+def _forward_relations(model):
+    """
+    Yield the forward relation fields of a model: foreign keys, one-to-one and
+    many-to-many fields declared on it, skipping reverse accessors.
+    """
+    for field in model._meta.get_fields():
+        if not field.is_relation or field.auto_created:
+            continue
+        if field.related_model is None:  # Generic foreign keys
+            continue
+        if field.related_model.__name__ in SKIP_RELATED_MODELS:
+            continue
+        yield field
+
+
+def _serialized_field_names(serializer_class):
+    """
+    The model field names a serializer outputs, or None when it outputs all of them.
+    """
+    meta = getattr(serializer_class, "Meta", None)
+    fields = getattr(meta, "fields", ALL_FIELDS)
+    exclude = set(getattr(meta, "exclude", None) or ())
+    if fields == ALL_FIELDS:
+        return None if not exclude else ("exclude", exclude)
+    return ("include", set(fields))
+
+
+def _is_serialized(name, field_names):
+    if field_names is None:
+        return True
+    mode, names = field_names
+    return name in names if mode == "include" else name not in names
+
+
+def _nested_prefetches(model, prefix, depth, max_depth):
+    """
+    Many-to-many lookups below a related object. Nested objects are flattened
+    with `model_to_dict`, which reads their many-to-many values but keeps
+    foreign keys as raw ids, so only many-to-many relations are followed.
+    """
+    if depth > max_depth:
+        return []
+    lookups = []
+    for field in _forward_relations(model):
+        if field.many_to_many:
+            path = f"{prefix}__{field.name}"
+            lookups.append(path)
+            lookups += _nested_prefetches(
+                field.related_model, path, depth + 1, max_depth
+            )
+    return lookups
+
+
+def _reverse_one_to_one(model):
+    """
+    Reverse one-to-one accessors of a model, which the detail view reads on
+    every related object it expands.
+    """
+    return [
+        field.name
+        for field in model._meta.get_fields()
+        if field.one_to_one
+        and field.auto_created
+        and not field.concrete
+        and field.related_model.__name__ not in SKIP_RELATED_MODELS
+    ]
+
+
+def get_related_lookups(
+    model, serializer_class=None, detail=False, expand=None, fields=None
+):
+    """
+    Work out the `select_related` and `prefetch_related` lookups needed to
+    serialize a queryset of `model` without a query per row.
+
+    Forward foreign keys are joined when their object is read: always in
+    detail views, which expand every relation, and in list views only for the
+    serializer's `related_fields` (other foreign keys are rendered from the raw
+    id). Many-to-many fields the serializer outputs are prefetched. Detail
+    views also read the reverse one-to-one accessors of every expanded object,
+    which are joined or prefetched along with it. In detail
+    views `related_fields` are flattened with `model_to_dict`, so their own
+    many-to-many values are prefetched too, down to `SERIALIZER_PREFETCH_DEPTH`
+    levels (default 2).
+
+    Args:
+        expand (frozenset, optional): In detail views, the relations to expand;
+            None expands all of them.
+        fields (frozenset, optional): The only fields in the output; None
+            keeps every serializer field.
+
+    Results are cached per (model, serializer class, detail, expand, fields).
+
+    Returns:
+        tuple: (select_related lookups, prefetch_related lookups).
+    """
+    key = (model, serializer_class, detail, expand, fields)
+    lookups = _lookups.get(key)
+    if lookups is not None:
+        return lookups
+
+    max_depth = getattr(settings, "SERIALIZER_PREFETCH_DEPTH", 2)
+    meta = getattr(serializer_class, "Meta", None)
+    related_fields = getattr(meta, "related_fields", None) or {}
+    field_names = _serialized_field_names(serializer_class)
+
+    select, prefetch = [], []
+    for field in _forward_relations(model):
+        if fields is not None and field.name not in fields:
+            continue
+        serialized = _is_serialized(field.name, field_names)
+        expanded = field.name in related_fields or (
+            detail and (expand is None or field.name in expand)
+        )
+        nested = field.related_model
+        if field.many_to_many:
+            if serialized or expanded:
+                prefetch.append(field.name)
+            if detail and expanded:
+                prefetch += [
+                    f"{field.name}__{name}" for name in _reverse_one_to_one(nested)
+                ]
+        elif expanded:
+            select.append(field.name)
+            if detail:
+                select += [
+                    f"{field.name}__{name}" for name in _reverse_one_to_one(nested)
+                ]
+        else:
+            continue
+
+        if detail and field.name in related_fields and max_depth > 1:
+            prefetch += _nested_prefetches(nested, field.name, 2, max_depth)
+
+    lookups = (tuple(select), tuple(prefetch))
+    with _lookups_lock:
+        _lookups[key] = lookups
+    return lookups
+
+
+def optimize_queryset(
+    queryset, serializer_class=None, detail=False, expand=None, fields=None
+):
+    """
+    Apply the lookups from `get_related_lookups` to a queryset.
+    """
+    select, prefetch = get_related_lookups(
+        queryset.model, serializer_class, detail, expand, fields
+    )
+    if select:
+        queryset = queryset.select_related(*select)
+    if prefetch:
+        queryset = queryset.prefetch_related(*prefetch)
+    return queryset
@@ -0,0 +1,256 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.db.models import Prefetch, Q
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+UPDATE_FIELDS = ["next_run", "prereminder_ran", "schedule_exhausted", "next_fire_at"]
+
+
+def notify_user(reminder, user, pre_reminder=False, using=None):
+    notify_users(reminder, [user], pre_reminder=pre_reminder, using=using)
+
+
+def notify_users(reminder, users, pre_reminder=False, using=None):
+    """
+    Queue the email and SMS of one reminder for all of its users.
+
+    Args:
+        reminder (Reminder): The reminder that fired.
+        users (list): The users to notify.
+        pre_reminder (bool): Announce the upcoming run rather than the run.
+        using (str, optional): The database whose outbox gets the messages,
+            default the one the reminder was read from.
+    """
+    from .notifications import queue_email, queue_sms
+
+    using = using or reminder._state.db
+    if pre_reminder:
+        subject = f"Upcoming Reminder - {reminder.name}"
+        message = reminder.message
+        if reminder.next_run:
+            due = reminder.next_run.astimezone(reminder.get_timezone())
+            message = f"{message}\nDue: {due:%Y-%m-%d %H:%M %Z}"
+    else:
+        subject = f"Reminder Notification - {reminder.name}"
+        message = reminder.message
+    context = {
+        "message": message,
+    }
+
+    emails = [user.email for user in users if user.email]
+    if emails:
+        logger.info(f"Queueing email to {len(emails)} users")
+        queue_email(
+            subject=subject,
+            template_name="email/default.html",
+            context=context,
+            recipient_list=emails,
+            using=using,
+        )
+
+    phones = [user.phone for user in users if user.phone]
+    if phones:
+        logger.info(f"Queueing SMS to {len(phones)} users")
+        queue_sms(phones, f"{subject} \n{message}", using=using)
+
+
+class ReminderScheduler:
+    """
+    Fires due reminders from the `next_fire_at` index.
+
+    Every run pulls only rows with `next_fire_at <= now`, oldest first, in
+    batches of `REMINDER_BATCH_SIZE` (default 500) with their users
+    prefetched. Each batch is claimed (with `SELECT ... FOR UPDATE SKIP
+    LOCKED` where the database supports it), advanced and written with one
+    `bulk_update`; its notifications are queued after the commit. Runs sent
+    more than `REMINDER_MISFIRE_GRACE` seconds late (default 3600) are
+    skipped and only rescheduled, and a reminder that fails is retried after
+    `REMINDER_RETRY_DELAY` seconds (default 300).
+    """
+
+    def __init__(self, using=None, batch_size=None):
+        from ..models import Reminder
+
+        self.using = using or router.db_for_write(Reminder)
+        self.batch_size = batch_size or getattr(settings, "REMINDER_BATCH_SIZE", 500)
+
+    def due_reminders(self, now):
+        from ..models import Reminder, User
+
+        queryset = (
+            Reminder.objects.using(self.using)
+            .filter(enabled=True, next_fire_at__lte=now)
+            .order_by("next_fire_at")
+            .prefetch_related(
+                Prefetch(
+                    "users",
+                    queryset=User.objects.using(self.using).only(
+                        "id", "email", "phone"
+                    ),
+                )
+            )
+        )
+        if connections[self.using].features.has_select_for_update_skip_locked:
+            queryset = queryset.select_for_update(skip_locked=True)
+        return queryset
+
+    def advance(self, reminder, now):
+        """
+        Move one due reminder to its next state.
+
+        Returns:
+            bool or None: True for a run, False for a pre-reminder, None when
+            nothing is to be sent.
+        """
+        grace = timedelta(seconds=getattr(settings, "REMINDER_MISFIRE_GRACE", 3600))
+
+        if reminder.next_run and reminder.next_run <= now:
+            send = now - reminder.next_run <= grace
+            if not send:
+                logger.warning(f"Skipping missed run of reminder {reminder.pk}")
+            reminder.next_run = reminder.calculate_next_run(after=now)
+            reminder.prereminder_ran = False
+            if reminder.next_run and reminder.next_run <= now:
+                # The schedule does not produce a future run
+                logger.warning(f"Reminder {reminder.pk} has no future run")
+                reminder.next_run = None
+            reminder.schedule_exhausted = reminder.next_run is None
+            kind = True if send else None
+        else:
+            pre_reminder_time = reminder.get_pre_reminder_datetime()
+            if (
+                pre_reminder_time
+                and pre_reminder_time <= now
+                and not reminder.prereminder_ran
+            ):
+                reminder.prereminder_ran = True
+                kind = False
+            else:
+                # A stale index entry, only reschedule
+                kind = None
+
+        reminder.next_fire_at = reminder.get_next_fire_at()
+        return kind
+
+    def run_batch(self, now):
+        """
+        Claim and advance one batch of due reminders.
+
+        Returns:
+            tuple: (number of reminders claimed, list of (reminder, is_run)
+            notifications to send).
+        """
+        from ..models import Reminder
+
+        notifications = []
+        with transaction.atomic(using=self.using):
+            reminders = list(self.due_reminders(now)[: self.batch_size])
+            retry_at = now + timedelta(
+                seconds=getattr(settings, "REMINDER_RETRY_DELAY", 300)
+            )
+            for reminder in reminders:
+                stored = (reminder.next_run, reminder.prereminder_ran)
+                try:
+                    kind = self.advance(reminder, now)
+                except Exception:
+                    logger.exception(f"Failed to schedule reminder {reminder.pk}")
+                    reminder.next_run, reminder.prereminder_ran = stored
+                    reminder.next_fire_at = retry_at
+                    continue
+                if kind is not None:
+                    notifications.append((reminder, kind))
+
+            Reminder.objects.using(self.using).bulk_update(
+                reminders, UPDATE_FIELDS, batch_size=self.batch_size
+            )
+        return len(reminders), notifications
+
+    def dispatch(self, notifications):
+        sent = 0
+        for reminder, is_run in notifications:
+            users = list(reminder.users.all())
+            try:
+                notify_users(reminder, users, pre_reminder=not is_run, using=self.using)
+                sent += len(users)
+            except Exception:
+                logger.exception(
+                    f"Failed to notify the users of reminder {reminder.pk}"
+                )
+        return sent
+
+    def refresh_next_runs(self, now=None):
+        """
+        Recalculate `next_run` where it is missing, unreachable or stale, and
+        clear `next_fire_at` of disabled reminders, in batches written with
+        `bulk_update`. Due reminders are left to `run`, and reminders whose
+        schedule is exhausted are skipped until they are saved again.
+
+        Returns:
+            int: The number of reminders whose schedule changed.
+        """
+        from ..models import Reminder
+
+        now = now or timezone.now()
+        horizon = now + timedelta(days=365)
+        queryset = (
+            Reminder.objects.using(self.using)
+            .filter(
+                Q(enabled=False, next_fire_at__isnull=False)
+                | Q(enabled=True, next_run__isnull=True, schedule_exhausted=False)
+                | Q(enabled=True, next_run__gt=horizon)
+                | Q(enabled=True, next_run__lt=now, next_fire_at__isnull=True)
+            )
+            .order_by("pk")
+        )
+
+        updated = 0
+        last_pk = None
+        while True:
+            batch_queryset = (
+                queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+            )
+            reminders = list(batch_queryset[: self.batch_size])
+            if not reminders:
+                break
+            changed = []
+            for reminder in reminders:
+                stored = [getattr(reminder, field) for field in UPDATE_FIELDS]
+                try:
+                    reminder.ensure_next_run_is_valid()
+                except Exception:
+                    logger.exception(f"Failed to refresh reminder {reminder.pk}")
+                reminder.next_fire_at = reminder.get_next_fire_at()
+                if [getattr(reminder, field) for field in UPDATE_FIELDS] != stored:
+                    changed.append(reminder)
+            if changed:
+                Reminder.objects.using(self.using).bulk_update(
+                    changed, UPDATE_FIELDS, batch_size=self.batch_size
+                )
+            updated += len(changed)
+            last_pk = reminders[-1].pk
+        return updated
+
+    def run(self, now=None):
+        """
+        Fire everything due at `now` (default: the current time).
+
+        Returns:
+            dict: Counts of reminders processed and notifications sent.
+        """
+        now = now or timezone.now()
+        processed = sent = 0
+        while True:
+            claimed, notifications = self.run_batch(now)
+            processed += claimed
+            sent += self.dispatch(notifications)
+            if claimed < self.batch_size:
+                break
+
+        if processed:
+            logger.info(f"Processed {processed} reminders, sent {sent} notifications")
+        return {"processed": processed, "sent": sent}
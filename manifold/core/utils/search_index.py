@@ -0,0 +1,537 @@
+import functools
+import logging
+import operator
+import re
+import threading
+import time
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.db import connections, router, transaction
+from django.db.models import Case, F, IntegerField, Max, Q, Value, When
+from django.utils import timezone
+
+from .doctype_registry import doctype_registry
+
+logger = logging.getLogger(__name__)
+
+FTS_TABLE = "core_search_fts"
+TOKEN_MAX_LENGTH = 64
+TOKEN_RE = re.compile(r"\w+")
+
+# Models of the search subsystem itself and other internal tables
+SKIP_MODELS = {
+    "SearchIndex",
+    "SearchToken",
+    "SearchDocument",
+    "DataJob",
+    "ChangeLog",
+    "Session",
+    "Token",
+    "LogEntry",
+}
+
+
+def tokenize(value):
+    """
+    Split a value into lower case words, e.g. "INV-2024 Acme" → ["inv", "2024", "acme"].
+    """
+    if value in (None, ""):
+        return []
+    return [token[:TOKEN_MAX_LENGTH] for token in TOKEN_RE.findall(str(value).lower())]
+
+
+class SearchPlan:
+    """
+    The searchable columns of one model, derived once from its doctype config:
+    `id` (weight 3), the `title_field` (weight 2) and the `search_fields`
+    (weight 1). Foreign keys are searched by their raw id.
+    """
+
+    def __init__(self, model, config):
+        self.model = model
+        self.doctype = model._meta.label_lower
+        self.config = config
+        self.loaded_at = time.monotonic()
+
+        config = config if isinstance(config, dict) and "error" not in config else {}
+        search_fields = config.get("search_fields") or []
+        if isinstance(search_fields, str):
+            search_fields = [field.strip() for field in search_fields.split(",")]
+        title_field = config.get("title_field") or ""
+
+        # Only doctypes that configure search are indexed on save
+        self.indexed = bool(search_fields or title_field)
+        self.lookups = []
+        self.columns = []
+
+        seen = set()
+        candidates = [("id", 3), (title_field, 2)] + [(f, 1) for f in search_fields]
+        for name, weight in candidates:
+            if not name or name in seen:
+                continue
+            seen.add(name)
+            try:
+                field = model._meta.get_field(name)
+            except FieldDoesNotExist:
+                continue
+            if not getattr(field, "concrete", False) or field.many_to_many:
+                continue
+            self.lookups.append(f"{name}__id" if field.is_relation else name)
+            self.columns.append((field.attname, weight))
+
+    @property
+    def attnames(self):
+        return [attname for attname, _ in self.columns]
+
+    def document(self, instance):
+        """
+        Returns:
+            tuple: (object id, list of (text, weight)) for one instance.
+        """
+        return self.document_from_row(
+            [instance.pk]
+            + [getattr(instance, attname, None) for attname in self.attnames]
+        )
+
+    def document_from_row(self, row):
+        """
+        Same as `document`, for a `values_list("pk", *attnames)` row.
+        """
+        values = [
+            (str(value), weight)
+            for value, (_, weight) in zip(row[1:], self.columns)
+            if value not in (None, "")
+        ]
+        return str(row[0]), values
+
+    def rows(self, queryset):
+        return queryset.values_list("pk", *self.attnames)
+
+
+class TokenBackend:
+    """
+    Inverted index in the `SearchToken` table. Every query word is matched as
+    a prefix of the indexed words through the (doctype, token) index, and
+    records are ranked by the summed weight of the fields the words hit.
+    Works on every database.
+    """
+
+    name = "token"
+
+    def __init__(self, using):
+        self.using = using
+
+    @property
+    def manager(self):
+        from ..models import SearchToken
+
+        return SearchToken.objects.using(self.using)
+
+    def write(self, doctype, documents, replace=True):
+        from ..models import SearchToken
+
+        if replace:
+            self.delete(doctype, [object_id for object_id, _ in documents])
+        rows = []
+        for object_id, values in documents:
+            tokens = {}
+            for text, weight in values:
+                for token in tokenize(text):
+                    tokens[token] = max(weight, tokens.get(token, 0))
+            rows.extend(
+                SearchToken(
+                    doctype=doctype, object_id=object_id, token=token, weight=weight
+                )
+                for token, weight in tokens.items()
+            )
+        self.manager.bulk_create(rows, batch_size=1000)
+
+    def delete(self, doctype, object_ids):
+        self.manager.filter(doctype=doctype, object_id__in=object_ids).delete()
+
+    def clear(self, doctype):
+        self.manager.filter(doctype=doctype).delete()
+
+    def _prefix(self, term):
+        if connections[self.using].vendor == "sqlite":
+            # SQLite only uses the index for LIKE with a case-insensitive
+            # collation; an explicit range works with the default one
+            return Q(token__gte=term, token__lt=term + "\U0010ffff")
+        return Q(token__startswith=term)
+
+    def search(self, doctype, terms, limit):
+        matches = Q()
+        per_term = {}
+        for index, term in enumerate(terms):
+            condition = self._prefix(term)
+            matches |= condition
+            per_term[f"term_{index}"] = Max(
+                Case(
+                    When(condition, then="weight"),
+                    default=Value(0),
+                    output_field=IntegerField(),
+                )
+            )
+
+        rows = (
+            self.manager.filter(matches, doctype=doctype)
+            .values("object_id")
+            .annotate(**per_term)
+            .filter(**{f"{name}__gt": 0 for name in per_term})
+            .annotate(rank=functools.reduce(operator.add, map(F, per_term)))
+            .order_by("-rank", "object_id")
+            .values_list("object_id", "rank")
+        )
+        return list(rows[:limit])
+
+
+class FullTextBackend:
+    """
+    MySQL FULLTEXT index over `SearchDocument` (title, content), queried in
+    boolean mode with every word required and matched as a prefix. Words
+    shorter than the server's `innodb_ft_min_token_size` are not indexed.
+    """
+
+    name = "fulltext"
+
+    def __init__(self, using):
+        self.using = using
+
+    @property
+    def manager(self):
+        from ..models import SearchDocument
+
+        return SearchDocument.objects.using(self.using)
+
+    @property
+    def table(self):
+        return self.manager.model._meta.db_table
+
+    def write(self, doctype, documents, replace=True):
+        from ..models import SearchDocument
+
+        if replace:
+            self.delete(doctype, [object_id for object_id, _ in documents])
+        self.manager.bulk_create(
+            [
+                SearchDocument(
+                    doctype=doctype,
+                    object_id=object_id,
+                    title=" ".join(text for text, weight in values if weight > 1),
+                    content=" ".join(text for text, weight in values if weight == 1),
+                )
+                for object_id, values in documents
+            ],
+            batch_size=1000,
+        )
+
+    def delete(self, doctype, object_ids):
+        self.manager.filter(doctype=doctype, object_id__in=object_ids).delete()
+
+    def clear(self, doctype):
+        self.manager.filter(doctype=doctype).delete()
+
+    def search(self, doctype, terms, limit):
+        match = " ".join(f"+{term}*" for term in terms)
+        with connections[self.using].cursor() as cursor:
+            cursor.execute(
+                "SELECT object_id, MATCH (title, content) AGAINST (%s IN BOOLEAN MODE) "
+                f"AS score FROM {self.table} WHERE doctype = %s AND "
+                "MATCH (title, content) AGAINST (%s IN BOOLEAN MODE) "
+                "ORDER BY score DESC LIMIT %s",
+                [match, doctype, match, limit],
+            )
+            return list(cursor.fetchall())
+
+
+class FTS5Backend(FullTextBackend):
+    """
+    SQLite FTS5 virtual table (`core_search_fts`) keyed by the id of the
+    record's `SearchDocument` row, ranked with bm25 and the title weighted
+    twice the other fields. Query words match as prefixes.
+    """
+
+    name = "fts5"
+
+    def write(self, doctype, documents, replace=True):
+        super().write(doctype, documents, replace)
+        rows = self.manager.filter(
+            doctype=doctype, object_id__in=[object_id for object_id, _ in documents]
+        ).values_list("id", "title", "content")
+        with connections[self.using].cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {FTS_TABLE} (rowid, title, content) VALUES (%s, %s, %s)",
+                list(rows),
+            )
+
+    def delete(self, doctype, object_ids):
+        ids = list(
+            self.manager.filter(doctype=doctype, object_id__in=object_ids).values_list(
+                "id", flat=True
+            )
+        )
+        if ids:
+            with connections[self.using].cursor() as cursor:
+                cursor.execute(
+                    f"DELETE FROM {FTS_TABLE} WHERE rowid IN "
+                    f"({', '.join(['%s'] * len(ids))})",
+                    ids,
+                )
+        super().delete(doctype, object_ids)
+
+    def clear(self, doctype):
+        with connections[self.using].cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {FTS_TABLE} WHERE rowid IN "
+                f"(SELECT id FROM {self.table} WHERE doctype = %s)",
+                [doctype],
+            )
+        super().clear(doctype)
+
+    def search(self, doctype, terms, limit):
+        match = " ".join(f'"{term}"*' for term in terms)
+        with connections[self.using].cursor() as cursor:
+            cursor.execute(
+                f"SELECT document.object_id, bm25({FTS_TABLE}, 2.0, 1.0) AS score "
+                f"FROM {FTS_TABLE} JOIN {self.table} AS document "
+                f"ON document.id = {FTS_TABLE}.rowid "
+                f"WHERE {FTS_TABLE} MATCH %s AND document.doctype = %s "
+                "ORDER BY score LIMIT %s",
+                [match, doctype, limit],
+            )
+            # bm25 scores are negative, lower is better
+            return [(object_id, -score) for object_id, score in cursor.fetchall()]
+
+
+BACKENDS = {
+    backend.name: backend for backend in (TokenBackend, FTS5Backend, FullTextBackend)
+}
+
+
+class SearchIndexManager:
+    """
+    Entry point of the search subsystem.
+
+    Doctypes whose config sets `search_fields` or a `title_field` are indexed
+    on save and delete, in the database of the record. The backend is chosen
+    per database by `SEARCH_BACKEND` (default "auto": "fulltext" on MySQL,
+    "fts5" on SQLite builds with FTS5, "token" otherwise). Searches use the
+    index once `rebuild` has filled it for the doctype; until then they fall
+    back to `icontains`.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._plans = {}
+        self._backends = {}
+        self._states = {}
+        self.searches = 0
+        self.fallbacks = 0
+
+    def get_plan(self, model):
+        """
+        Return the cached search plan of a model class, re-validated against
+        the doctype registry at most every `SEARCH_PLAN_REFRESH_SECONDS`
+        (default 30).
+        """
+        refresh_seconds = getattr(settings, "SEARCH_PLAN_REFRESH_SECONDS", 30)
+        plan = self._plans.get(model)
+        if plan and time.monotonic() - plan.loaded_at < refresh_seconds:
+            return plan
+
+        config = doctype_registry.get_config(model.__name__)
+        if plan and plan.config is config:
+            plan.loaded_at = time.monotonic()
+            return plan
+
+        with self._lock:
+            plan = SearchPlan(model, config)
+            self._plans[model] = plan
+        return plan
+
+    def get_backend(self, using):
+        backend = self._backends.get(using)
+        if backend is not None:
+            return backend
+
+        name = getattr(settings, "SEARCH_BACKEND", "auto")
+        if name == "auto":
+            connection = connections[using]
+            if connection.vendor == "mysql":
+                name = "fulltext"
+            elif (
+                connection.vendor == "sqlite"
+                and FTS_TABLE in connection.introspection.table_names()
+            ):
+                name = "fts5"
+            else:
+                name = "token"
+
+        backend = BACKENDS[name](using)
+        self._backends[using] = backend
+        return backend
+
+    def is_built(self, model, using):
+        """
+        Whether the index of `model` in `using` has been built with the
+        current backend. Index states are re-read every
+        `SEARCH_INDEX_STATE_TTL` seconds (default 60).
+        """
+        from ..models import SearchIndex
+
+        state = self._states.get(using)
+        ttl = getattr(settings, "SEARCH_INDEX_STATE_TTL", 60)
+        if state is None or time.monotonic() - state[0] >= ttl:
+            built = dict(
+                SearchIndex.objects.using(using)
+                .filter(built_at__isnull=False)
+                .values_list("doctype", "backend")
+            )
+            state = (time.monotonic(), built)
+            self._states[using] = state
+        return state[1].get(model._meta.label_lower) == self.get_backend(using).name
+
+    def is_indexed(self, model):
+        """
+        Whether records of `model` are indexed on save.
+        """
+        return model.__name__ not in SKIP_MODELS and self.get_plan(model).indexed
+
+    def update(self, instance, using):
+        """
+        Index one saved instance. Failures are logged, never raised, so a
+        broken index cannot block saves.
+        """
+        model = type(instance)
+        if not self.is_indexed(model):
+            return
+        plan = self.get_plan(model)
+        try:
+            with transaction.atomic(using=using):
+                self.get_backend(using).write(plan.doctype, [plan.document(instance)])
+        except Exception:
+            logger.exception(f"Failed to index {plan.doctype} {instance.pk}")
+
+    def remove(self, instance, using):
+        model = type(instance)
+        if not self.is_indexed(model):
+            return
+        plan = self.get_plan(model)
+        try:
+            with transaction.atomic(using=using):
+                self.get_backend(using).delete(plan.doctype, [str(instance.pk)])
+        except Exception:
+            logger.exception(
+                f"Failed to remove {plan.doctype} {instance.pk} from index"
+            )
+
+    def reindex(self, model, pks, using=None):
+        """
+        Index the given records, e.g. after a `bulk_create` that sent no
+        signals.
+        """
+        if not pks or not self.is_indexed(model):
+            return
+        using = using or router.db_for_write(model)
+        plan = self.get_plan(model)
+        try:
+            with transaction.atomic(using=using):
+                rows = plan.rows(model._base_manager.using(using).filter(pk__in=pks))
+                self.get_backend(using).write(
+                    plan.doctype, [plan.document_from_row(row) for row in rows]
+                )
+        except Exception:
+            logger.exception(f"Failed to index {len(pks)} {plan.doctype} records")
+
+    def rebuild(self, model, using=None, chunk_size=1000):
+        """
+        Index every record of `model` and mark its index as built.
+
+        Returns:
+            int: The number of records indexed.
+        """
+        from ..models import SearchIndex
+
+        using = using or router.db_for_write(model)
+        plan = self.get_plan(model)
+        backend = self.get_backend(using)
+        backend.clear(plan.doctype)
+
+        # Rows rather than instances, so no model __init__ runs per record
+        queryset = plan.rows(model._base_manager.using(using).order_by("pk"))
+        documents = 0
+        last_pk = None
+        while True:
+            chunk_queryset = (
+                queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+            )
+            chunk = list(chunk_queryset[:chunk_size])
+            if not chunk:
+                break
+            with transaction.atomic(using=using):
+                backend.write(
+                    plan.doctype,
+                    [plan.document_from_row(row) for row in chunk],
+                    replace=False,
+                )
+            documents += len(chunk)
+            last_pk = chunk[-1][0]
+
+        SearchIndex.objects.using(using).update_or_create(
+            doctype=plan.doctype,
+            defaults={
+                "backend": backend.name,
+                "documents": documents,
+                "built_at": timezone.now(),
+            },
+        )
+        self._states.pop(using, None)
+        return documents
+
+    def search(self, model, query, using, limit=None):
+        """
+        Search the index of `model`.
+
+        Args:
+            limit (int, optional): The most matches returned, default
+                `SEARCH_MAX_RESULTS` (1000).
+
+        Returns:
+            tuple: (results, truncated). `results` holds (object id, rank)
+            pairs, best first, or is None when the index is not built or the
+            query has no words; `truncated` tells whether more records matched
+            than were returned.
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms or not self.is_built(model, using):
+            self.fallbacks += 1
+            return None, False
+
+        self.searches += 1
+        limit = limit or getattr(settings, "SEARCH_MAX_RESULTS", 1000)
+        # One extra row tells whether the limit cut the matches short
+        results = self.get_backend(using).search(
+            self.get_plan(model).doctype, terms, limit + 1
+        )
+        return results[:limit], len(results) > limit
+
+    def stats(self):
+        return {
+            "backends": {
+                using: backend.name for using, backend in self._backends.items()
+            },
+            "built": {using: sorted(state[1]) for using, state in self._states.items()},
+            "plans": len(self._plans),
+            "searches": self.searches,
+            "fallbacks": self.fallbacks,
+        }
+
+    def clear(self):
+        with self._lock:
+            self._plans.clear()
+            self._backends.clear()
+            self._states.clear()
+
+
+search_index = SearchIndexManager()
@@ -0,0 +1,215 @@
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import IntegrityError, router, transaction
+from django.db.models import F
+
+from ..models import Series
+
+
+def get_block_size(name=None, config=None):
+    """
+    Resolve how many numbers a worker reserves at once for a series.
+
+    Lookup order: the doctype config `naming_block_size`, the per-series
+    `NAMING_SERIES_BLOCK_SIZES` setting, then `NAMING_SERIES_BLOCK_SIZE`.
+    A block size of 1 (the default) keeps series gapless; larger blocks trade
+    gaps on worker restart for one database write per block.
+    """
+    block_size = (config or {}).get("naming_block_size")
+    if not block_size and name:
+        block_size = getattr(settings, "NAMING_SERIES_BLOCK_SIZES", {}).get(name)
+    if not block_size:
+        block_size = getattr(settings, "NAMING_SERIES_BLOCK_SIZE", 1)
+    try:
+        return max(int(block_size), 1)
+    except (TypeError, ValueError):
+        return 1
+
+
+class SeriesAllocator:
+    """
+    Hands out series numbers without duplicates across workers.
+
+    Numbers are reserved in the `Series` table with a single atomic
+    `current = current + N` update, which row-locks the series until the
+    transaction commits. With a block size above 1 the reserved range is kept
+    in an in-memory cursor per (database, series), a queue of ranges, and
+    served without touching the database until it runs out.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._blocks = {}
+        self._local = threading.local()
+
+    def next(self, name, block_size=1, seed=None):
+        """
+        Return the next number of the series `name`.
+
+        Args:
+            name (str): The series name.
+            block_size (int): How many numbers to reserve when the cursor is empty.
+            seed (callable, optional): Returns the last number already in use,
+                called only when the series row has to be created.
+
+        Returns:
+            int: The allocated number.
+        """
+        using = router.db_for_write(Series)
+        key = (using, name)
+
+        counts = getattr(self._local, "counts", None)
+        if counts is not None:
+            counts[key] = counts.get(key, 0) + 1
+            return 0
+
+        batch = getattr(self._local, "batch", None)
+        if batch is not None:
+            number = self._next_in_batch(batch, key, seed)
+            if number is not None:
+                return number
+
+        with self._lock:
+            ranges = self._blocks.get(key)
+            if ranges:
+                block = ranges[0]
+                number = block[0]
+                block[0] += 1
+                if block[0] > block[1]:
+                    ranges.pop(0)
+                return number
+
+        start, end = self.reserve(name, block_size, using=using, seed=seed)
+        if end > start:
+            self._store_block(key, start + 1, end, using)
+        return start
+
+    def _next_in_batch(self, batch, key, seed):
+        block = batch["blocks"].get(key)
+        if block is None:
+            count = batch["counts"].get(key)
+            if not count:
+                # Not counted up front, allocate as outside the batch
+                return None
+            using, name = key
+            start, end = self.reserve(name, count, using=using, seed=seed)
+            block = batch["blocks"][key] = [start, end]
+        if block[0] > block[1]:
+            return None
+
+        number = block[0]
+        block[0] += 1
+        return number
+
+    def count(self, allocate):
+        """
+        Call `allocate` with every allocation only counted, per series, and
+        return those counts for `batch`. The numbers handed out meanwhile are
+        all 0, so `allocate` must be safe to run again for real.
+        """
+        previous = getattr(self._local, "counts", None)
+        counts = self._local.counts = {}
+        try:
+            allocate()
+        finally:
+            self._local.counts = previous
+        return counts
+
+    @contextmanager
+    def batch(self, counts):
+        """
+        Allocate numbers for upcoming records with one reservation per series
+        instead of one per record.
+
+        Args:
+            counts (dict): How many numbers each series needs, as returned by
+                `count`. Exactly that many are reserved for each series, so a
+                batch leaves no gaps even for gapless series.
+
+        The reserved range lives in a cursor private to the current thread, so
+        it is usable inside the surrounding transaction. Numbers left over when
+        the batch ends are queued behind the shared cursor once that
+        transaction commits; on rollback they are dropped together with the
+        reservation.
+        """
+        previous = getattr(self._local, "batch", None)
+        batch = {"counts": counts, "blocks": {}}
+        self._local.batch = batch
+        try:
+            yield
+        finally:
+            self._local.batch = previous
+            for (using, name), (start, end) in batch["blocks"].items():
+                if start <= end:
+                    self._store_block((using, name), start, end, using)
+
+    def reserve(self, name, count=1, using=None, seed=None):
+        """
+        Atomically reserve `count` consecutive numbers of the series `name`.
+        A missing series starts after `seed()`, or after 0 without a seed.
+
+        Returns:
+            tuple: The first and last reserved numbers.
+        """
+        using = using or router.db_for_write(Series)
+        with transaction.atomic(using=using):
+            updated = (
+                Series.objects.using(using)
+                .filter(name=name)
+                .update(current=F("current") + count)
+            )
+            if not updated:
+                self._create_series(name, count, using, seed() if seed else 0)
+            current = (
+                Series.objects.using(using)
+                .filter(name=name)
+                .values_list("current", flat=True)
+                .get()
+            )
+        return current - count + 1, current
+
+    def _create_series(self, name, count, using, start=0):
+        try:
+            with transaction.atomic(using=using):
+                Series.objects.using(using).create(name=name, current=start + count)
+        except IntegrityError:
+            # Another worker created the series first; take the next range instead
+            Series.objects.using(using).filter(name=name).update(
+                current=F("current") + count
+            )
+
+    def _store_block(self, key, start, end, using):
+        """
+        Keep the rest of a reserved block for later calls. Inside an outer
+        transaction the block is only kept once it commits, so a rollback can
+        never leave numbers in memory that the database has handed back.
+        """
+
+        def store():
+            with self._lock:
+                self._blocks.setdefault(key, []).append([start, end])
+
+        connection = transaction.get_connection(using)
+        if connection.in_atomic_block:
+            transaction.on_commit(store, using=using)
+        else:
+            store()
+
+    def clear(self):
+        """
+        Forget every in-memory block. Unused numbers become gaps.
+        """
+        with self._lock:
+            self._blocks.clear()
+
+
+series_allocator = SeriesAllocator()
+
+
+def next_series_value(name, digits=0, block_size=1):
+    """
+    Allocate the next number of a series and return it zero-padded to `digits`.
+    """
+    return str(series_allocator.next(name, block_size)).zfill(digits)
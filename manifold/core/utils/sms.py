@@ -1,11 +1,13 @@
 import json
 import logging
+import threading
 
 import requests
 from core.models import Reminder
 from core.utils import send_custom_email
 from django.conf import settings
 from django.utils import timezone
+from requests.adapters import HTTPAdapter
 from requests.auth import HTTPBasicAuth
 
 logger = logging.getLogger(__name__)
@@ -13,8 +15,36 @@ from datetime import timedelta
 
 from django.utils import timezone
 
+_local = threading.local()
 
-def send_sms(phone_number, message, code="254"):
+
+class SmsError(Exception):
+    pass
+
+
+def get_session():
+    """
+    Return this thread's pooled HTTP session for the SMS gateways, so repeated
+    sends reuse their connections.
+    """
+    session = getattr(_local, "session", None)
+    if session is None:
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=getattr(settings, "SMS_POOL_SIZE", 10),
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        _local.session = session
+    return session
+
+
+def get_timeout():
+    return getattr(settings, "SMS_TIMEOUT", 10)
+
+
+def normalize_phone_number(phone_number, code="254"):
     no = phone_number
     phone_number = phone_number.strip()
     if phone_number.startswith("+"):
@@ -23,26 +53,49 @@ def send_sms(phone_number, message, code="254"):
         no = f"{phone_number[-12:]}"
     elif 9 <= len(phone_number) <= 10:
         no = f"{code}{phone_number[-9:]}"
-        
+    return no
+
+
+def get_provider(phone_number):
+    """Returns the gateway of a normalized number: "254", "27" or None."""
+    if phone_number.startswith("254"):
+        return "254"
+    if phone_number.startswith("27"):
+        return "27"
+    return None
+
+
+def send_sms(phone_number, message, code="254"):
+    no = normalize_phone_number(phone_number, code)
+
     if no.startswith("254"):
         send_254_sms(no, message)
     elif no.startswith("27"):
         send_sms_to_27(no, message)
-        
-def send_254_sms(phone_number, message):
-    api_url = settings.SMS_API_URL
+
+
+def post_254_sms(message_parameters):
     payload = {
         "SenderId": settings.SMS_SENDER_ID,
-        "IsUnicode": True,
-        "IsFlash": True,
-        "MessageParameters": [{"Number": phone_number, "Text": message}],
+        "IsUnicode": getattr(settings, "SMS_IS_UNICODE", True),
+        "IsFlash": getattr(settings, "SMS_IS_FLASH", True),
+        "MessageParameters": message_parameters,
         "ApiKey": settings.SMS_API_KEY,
         "ClientId": settings.SMS_CLIENT_ID,
     }
     json_payload = json.dumps(payload)
     headers = {"Content-Type": "application/json", "Accept": "application/json"}
 
-    response = requests.post(api_url, data=json_payload, headers=headers)
+    return get_session().post(
+        settings.SMS_API_URL,
+        data=json_payload,
+        headers=headers,
+        timeout=get_timeout(),
+    )
+
+
+def send_254_sms(phone_number, message):
+    response = post_254_sms([{"Number": phone_number, "Text": message}])
     if response.status_code == 200:
         response_data = response.json()
         if response_data.get("ErrorCode") == 0:
@@ -63,6 +116,58 @@ def send_254_sms(phone_number, message):
     return response
 
 
+def send_254_sms_batch(messages):
+    """
+    Send many messages in one gateway call.
+
+    Args:
+        messages (list): (normalized number, text) pairs.
+
+    Returns:
+        dict: The error of each number, None for the ones accepted.
+
+    Raises:
+        SmsError: When the gateway rejects the whole request.
+    """
+    response = post_254_sms(
+        [{"Number": number, "Text": text} for number, text in messages]
+    )
+    if response.status_code != 200:
+        raise SmsError(f"HTTP {response.status_code}: {response.text[:500]}")
+    response_data = response.json()
+    if response_data.get("ErrorCode") != 0:
+        raise SmsError(response_data.get("ErrorDescription") or "Gateway error")
+
+    results = {number: "No delivery report" for number, _ in messages}
+    for data in response_data.get("Data", []):
+        number = str(data.get("MobileNumber"))
+        if data.get("MessageErrorCode") == 0:
+            results[number] = None
+        else:
+            results[number] = data.get("MessageErrorDescription") or "Rejected"
+    return results
+
+
+def send_sms_to_27_batch(messages):
+    """
+    Same as `send_254_sms_batch` for the South African gateway, which accepts
+    or rejects a request as a whole.
+    """
+    response = get_session().post(
+        settings.SA_SMS_API_URL,
+        auth=HTTPBasicAuth(settings.SA_API_KEY, settings.SA_API_SECRET),
+        json={
+            "messages": [
+                {"content": text, "destination": number} for number, text in messages
+            ]
+        },
+        timeout=get_timeout(),
+    )
+    if response.status_code != 200:
+        raise SmsError(f"HTTP {response.status_code}: {response.text[:500]}")
+    return {number: None for number, _ in messages}
+
+
 def send_sms_to_27(phone_number, message):
     apiKey = settings.SA_API_KEY
     apiSecret = settings.SA_API_SECRET
@@ -74,9 +179,10 @@ def send_sms_to_27(phone_number, message):
     }
 
     try:
-        sendResponse = requests.post(apiUrl,
+        sendResponse = get_session().post(apiUrl,
                                     auth=basic,
-                                    json=sendRequest)
+                                    json=sendRequest,
+                                    timeout=get_timeout())
 
         # Check the status code and handle different scenarios
         if sendResponse.status_code == 200:
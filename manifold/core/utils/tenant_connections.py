@@ -0,0 +1,152 @@
+import logging
+import threading
+import time
+import weakref
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+ACTIVITY_CACHE_KEY = "tenant_connection_activity"
+
+
+class TenantConnectionManager:
+    """
+    Keeps tenant database connections open between requests, within bounds.
+
+    Django opens one connection per thread and database alias and closes it
+    at a request boundary once `close_at` has passed. The manager uses that
+    mechanism per tenant:
+
+    - every request that uses a tenant pushes its connection's `close_at` to
+      `TENANT_CONNECTION_IDLE_TTL` seconds from now (default: the alias's
+      CONN_MAX_AGE), so busy tenants keep their connections and idle ones are
+      closed by Django once the TTL passes;
+    - at most `TENANT_MAX_CONNECTIONS` connections (default 8) per alias stay
+      open in a process; a request finishing above that bound closes its own
+      connection instead of keeping it;
+    - `prewarm` opens the default database and the most active tenants when
+      a worker starts, so its first requests skip the connection handshake.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._wrappers = {}
+        self._in_use = Counter()
+        self._requests = Counter()
+        self._last_used = {}
+        self._activity_saved_at = time.monotonic()
+
+    def _track(self, alias):
+        wrapper = connections[alias]
+        with self._lock:
+            self._wrappers.setdefault(alias, weakref.WeakSet()).add(wrapper)
+        return wrapper
+
+    def acquire(self, alias):
+        """
+        Mark the current thread's connection to `alias` as in use by a request.
+        """
+        self._track(alias)
+        with self._lock:
+            self._in_use[alias] += 1
+            self._requests[alias] += 1
+
+    def release(self, alias):
+        """
+        End a request on `alias`: keep its connection for the idle TTL, or close
+        it when the alias already holds more open connections than allowed.
+        """
+        wrapper = self._track(alias)
+        with self._lock:
+            self._in_use[alias] = max(self._in_use[alias] - 1, 0)
+            self._last_used[alias] = time.time()
+
+        if wrapper.connection is not None and not wrapper.in_atomic_block:
+            max_connections = getattr(settings, "TENANT_MAX_CONNECTIONS", 8)
+            if max_connections and self.open_count(alias) > max_connections:
+                wrapper.close()
+            else:
+                ttl = getattr(
+                    settings,
+                    "TENANT_CONNECTION_IDLE_TTL",
+                    wrapper.settings_dict.get("CONN_MAX_AGE", 0),
+                )
+                if ttl:
+                    wrapper.close_at = time.monotonic() + ttl
+
+        self._save_activity()
+
+    def open_count(self, alias):
+        wrappers = self._wrappers.get(alias) or ()
+        return sum(1 for wrapper in list(wrappers) if wrapper.connection is not None)
+
+    def _save_activity(self):
+        """
+        Share request counts through the cache every minute, so a restarting
+        worker knows which tenants to pre-warm.
+        """
+        if time.monotonic() - self._activity_saved_at < 60:
+            return
+        with self._lock:
+            self._activity_saved_at = time.monotonic()
+            requests = dict(self._requests)
+        try:
+            activity = Counter(cache.get(ACTIVITY_CACHE_KEY) or {})
+            activity.update(requests)
+            cache.set(ACTIVITY_CACHE_KEY, dict(activity), timeout=None)
+            with self._lock:
+                self._requests.subtract(requests)
+        except Exception:
+            logger.exception("Failed to save tenant activity")
+
+    def most_active(self, count):
+        try:
+            activity = Counter(cache.get(ACTIVITY_CACHE_KEY) or {})
+        except Exception:
+            activity = Counter()
+        activity.update(self._requests)
+        return [
+            alias for alias, _ in activity.most_common() if alias in settings.DATABASES
+        ][:count]
+
+    def prewarm(self):
+        """
+        Open connections for the default database and the
+        `TENANT_PREWARM_COUNT` (default 3) most active tenants in the current
+        thread.
+        """
+        aliases = ["default"] + self.most_active(
+            getattr(settings, "TENANT_PREWARM_COUNT", 3)
+        )
+        for alias in dict.fromkeys(aliases):
+            try:
+                self._track(alias).ensure_connection()
+            except Exception as e:
+                logger.warning(f"Could not pre-warm connection to {alias}: {e}")
+
+    def stats(self):
+        """
+        Per-alias connection counts of this process.
+        """
+        with self._lock:
+            aliases = set(self._wrappers) | set(self._in_use)
+            in_use = dict(self._in_use)
+            last_used = dict(self._last_used)
+
+        report = {}
+        for alias in sorted(aliases):
+            open_connections = self.open_count(alias)
+            report[alias] = {
+                "open": open_connections,
+                "in_use": in_use.get(alias, 0),
+                "idle": max(open_connections - in_use.get(alias, 0), 0),
+                "last_used": last_used.get(alias),
+            }
+        return report
+
+
+tenant_connections = TenantConnectionManager()
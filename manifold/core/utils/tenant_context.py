@@ -0,0 +1,38 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+_current_tenant = ContextVar("current_tenant", default=None)
+
+
+def get_current_tenant():
+    """
+    Return the database alias of the tenant the current request or job runs
+    for, or None outside of any tenant context.
+    """
+    return _current_tenant.get()
+
+
+def set_current_tenant(alias):
+    """
+    Route the ORM queries of the current context to `alias`.
+
+    Returns:
+        Token: Pass it to `reset_current_tenant` to restore the previous tenant.
+    """
+    return _current_tenant.set(alias)
+
+
+def reset_current_tenant(token):
+    _current_tenant.reset(token)
+
+
+@contextmanager
+def use_tenant(alias):
+    """
+    Run a block of code against the database of `alias`.
+    """
+    token = set_current_tenant(alias)
+    try:
+        yield
+    finally:
+        reset_current_tenant(token)
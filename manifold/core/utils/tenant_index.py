@@ -0,0 +1,171 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.utils import timezone
+
+
+class TenantIndex:
+    """
+    Process-wide map of tenant domains to site names, built from every
+    `sites/*/site_config.json`.
+
+    Lookups are a dict access. At most once every `TENANT_INDEX_CHECK_INTERVAL`
+    seconds (default 5) the site folders and config files are stat'ed, and the
+    map is rebuilt only if one of them was added, removed or modified. Unknown
+    domains are cached as misses until the next rebuild, so a host that matches
+    no site does not trigger a check of the site folders on every request. The
+    miss cache keeps the `TENANT_INDEX_MAX_MISSES` (default 10000) most recent
+    hosts, and the check forced by a new unknown host runs at most once every
+    `TENANT_INDEX_FORCE_INTERVAL` seconds (default 1), so a flood of random
+    Host headers cannot make every request scan the site folders.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._signature = None
+        self._domains = {}
+        self._misses = OrderedDict()
+        self._checked_at = None
+        self._forced_at = None
+        self.built_at = None
+        self.build_seconds = 0
+        self.builds = 0
+        self.sites = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _site_config_files(self):
+        try:
+            folders = sorted(os.scandir(settings.SITE_PATH), key=lambda e: e.name)
+        except OSError:
+            return []
+        return [
+            os.path.join(folder.path, "site_config.json")
+            for folder in folders
+            if folder.is_dir()
+        ]
+
+    def _get_signature(self):
+        signature = []
+        for path in self._site_config_files():
+            try:
+                signature.append((path, os.stat(path).st_mtime_ns))
+            except OSError:
+                continue
+        return tuple(signature)
+
+    def refresh(self, force=False):
+        """
+        Rebuild the map if the site configs changed. The check itself runs at
+        most once per check interval, or with `force` once per force interval.
+
+        Returns:
+            bool: Whether the site configs were checked.
+        """
+        now = time.monotonic()
+        if force:
+            interval = getattr(settings, "TENANT_INDEX_FORCE_INTERVAL", 1)
+            last_check = self._forced_at
+        else:
+            interval = getattr(settings, "TENANT_INDEX_CHECK_INTERVAL", 5)
+            last_check = self._checked_at
+        if last_check is not None and now - last_check < interval:
+            return False
+
+        with self._lock:
+            self._checked_at = now
+            if force:
+                self._forced_at = now
+            signature = self._get_signature()
+            if signature == self._signature:
+                return True
+
+            started = time.monotonic()
+            domains = {}
+            for path, _ in signature:
+                try:
+                    with open(path, "r") as f:
+                        config = json.load(f)
+                except (OSError, json.JSONDecodeError):
+                    print(f"Error decoding JSON in {path}")
+                    continue
+                if not isinstance(config, dict):
+                    continue
+                for domain in config.get("domains") or []:
+                    # The first site listing a domain wins
+                    domains.setdefault(domain, config.get("site_name"))
+
+            self._domains = domains
+            self._misses = OrderedDict()
+            self._signature = signature
+            self.sites = len(signature)
+            self.builds += 1
+            self.build_seconds = time.monotonic() - started
+            self.built_at = timezone.now()
+        return True
+
+    def get_site(self, domain):
+        """
+        Return the site name serving `domain`, or None if no site lists it.
+        """
+        if not domain:
+            return None
+
+        self.refresh()
+        site = self._domains.get(domain)
+        if site is not None:
+            self.hits += 1
+            return site
+
+        with self._lock:
+            known_miss = domain in self._misses
+            if known_miss:
+                self._misses.move_to_end(domain)
+
+        if not known_miss:
+            # A new domain may belong to a site created since the last check
+            checked = self.refresh(force=True)
+            site = self._domains.get(domain)
+            if site is not None:
+                self.hits += 1
+                return site
+            if not checked:
+                # Not looked up yet, so not cached; a later request retries
+                self.misses += 1
+                return None
+            max_misses = getattr(settings, "TENANT_INDEX_MAX_MISSES", 10000)
+            with self._lock:
+                self._misses[domain] = None
+                while len(self._misses) > max_misses:
+                    # Forget the least recently seen unknown host
+                    self._misses.popitem(last=False)
+
+        self.misses += 1
+        return None
+
+    def stats(self):
+        return {
+            "built_at": self.built_at,
+            "build_seconds": round(self.build_seconds, 6),
+            "builds": self.builds,
+            "sites": self.sites,
+            "domains": len(self._domains),
+            "negative_cached": len(self._misses),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    def clear(self):
+        with self._lock:
+            self._signature = None
+            self._checked_at = None
+            self._forced_at = None
+            self._domains = {}
+            self._misses = OrderedDict()
+
+
+tenant_index = TenantIndex()
@@ -2,6 +2,8 @@ from .auth import *
 from .communication import *
 from .core import *
 from .data import *
+from .data_job import DataJobViewSet
+from .diagnostics import DiagnosticsAPIView
 from .template import *
 from .file_upload import FileUploadView
 from .sidebar_link import SidebarLinkViewSet
\ No newline at end of file
@@ -14,6 +14,7 @@ from core.serializers import (
     UserSerializer,
 )
 from core.utils import generate_simple_password, send_custom_email
+from core.utils.permission_cache import permission_cache
 from core.utils.sms import send_sms
 from django.contrib.auth import authenticate, login
 from django.contrib.auth import logout as django_logout
@@ -62,19 +63,10 @@ class UserGroupPermissions(APIView):
         if user.is_superuser:
             return Response("all")
 
-        # Get all groups the user belongs to
-        groups = user.groups.all()
-
-        # Initialize a set to store unique permissions
-        user_permissions = set()
-
-        # Loop through each group to get the permissions
-        for group in groups:
-            permissions = group.permissions.all()  # Get all permissions for the group
-            user_permissions.update(perm.codename for perm in permissions)
-
-        # Return the list of all unique permissions
-        return Response(list(user_permissions))
+        # Unique codenames of the permissions granted by the user's groups,
+        # from the cached permission snapshot
+        snapshot = permission_cache.get(user)
+        return Response(sorted(snapshot.group_codenames))
 
 
 class GroupViewSet(GenericViewSet):
@@ -319,6 +311,8 @@ class UserViewSet(GenericViewSet):
                 "password": password,
             }
             try:
+                # Sent directly, not queued, so the password is never stored
+                # in the notification outbox
                 recipient_list = [user.email]
                 send_custom_email(subject, template_name, context, recipient_list)
 
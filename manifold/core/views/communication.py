@@ -5,7 +5,7 @@ from core.filters import ReminderFilter
 from core.models import Reminder
 from core.models.communication import Reminder
 from core.serializers import ReminderSerializer
-from core.utils import send_custom_email, send_sms
+from core.utils.notifications import queue_email, queue_sms
 from core.views.template import GenericViewSet
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
@@ -50,16 +50,16 @@ class SendEmailView(APIView):
             )
 
         try:
-            # Use send_custom_email for each recipient
-            for recipient in recipients:
-                context = {
-                    "message": message,
-                }
-                send_custom_email(
-                    subject, "email/default.html", context, [recipient]  # Template path
-                )
+            # Rendered once, each recipient gets its own message from the outbox
+            context = {
+                "message": message,
+            }
+            queued = queue_email(
+                subject, "email/default.html", context, recipients  # Template path
+            )
             return Response(
-                {"message": "Email(s) sent successfully."}, status=status.HTTP_200_OK
+                {"message": "Email(s) queued for sending.", "queued": len(queued)},
+                status=status.HTTP_200_OK,
             )
         except Exception as e:
             return Response(
@@ -86,10 +86,10 @@ class SendSmsView(APIView):
             )
 
         try:
-            for phone_number in phone_numbers:
-                send_sms(phone_number, message)
+            queued = queue_sms(phone_numbers, message)
             return Response(
-                {"message": "SMS sent successfully."}, status=status.HTTP_200_OK
+                {"message": "SMS queued for sending.", "queued": len(queued)},
+                status=status.HTTP_200_OK,
             )
         except Exception as e:
             return Response(
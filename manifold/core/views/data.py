@@ -1,77 +1,24 @@
 import re
-import threading
-from concurrent.futures import ThreadPoolExecutor
-from difflib import get_close_matches
 
-import pandas as pd
-from core.models import Document  # Assuming core.Document is a Django model
-from django.apps import apps
+from core.serializers.data_job import DataJobSerializer
+from core.utils.bulk_delete import BulkDeleter
+from core.utils.data_import import (
+    SUPPORTED_EXTENSIONS,
+    DataImporter,
+    NoValidColumnsError,
+    UnsupportedFileFormat,
+)
+from core.utils.data_jobs import submit_job
+from core.utils.model_resolver import model_resolver
+from django.db import router
 from rest_framework import serializers, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from .core import run_subprocess
-
-# Dynamically fetch all models from all apps in the project
-all_models = {model.__name__: model for model in apps.get_models()}
-
-
-# Helper function to normalize headers
-def normalize_header(header):
-    header = re.sub(r"[^\w\s]", "", header)  # Remove non-alphanumeric characters
-    return header.strip().lower().replace(" ", "_")
-
-
-def normalize_name(name):
-    """Convert name to title case and remove spaces."""
-    return re.sub(r"\s+", "", name).title()
-
-
-def get_matching_app(associated_app):
-    """Find the best matching app from installed apps."""
-    installed_apps = [app_config.name for app_config in apps.get_app_configs()]
-
-    # First, check for an exact match
-    if associated_app in installed_apps:
-        return associated_app
-
-    # If not found, check for alternative naming conventions like "pos" → "pos_app"
-    alternative_name = f"{associated_app}_app"
-    if alternative_name in installed_apps:
-        return alternative_name
-
 
 def get_model_by_name(model_name):
-    normalized_name = normalize_name(model_name)
-
-    # Fetch all document names from core.Document
-    document_names = Document.objects.values_list("name", flat=True)
-
-    # Find the closest match ignoring case and spaces
-    closest_match = get_close_matches(
-        normalized_name, [normalize_name(name) for name in document_names], n=1
-    )
-
-    if not closest_match:
-        return None  # No match found
-
-    # Retrieve the actual document entry from core.Document
-    document_entry = Document.objects.filter(name__iexact=closest_match[0]).first()
-    if not document_entry:
-        return None
-
-    associated_app = get_matching_app(document_entry.app)
-
-    # Fetch models from the identified app
-    app_models = {
-        model.__name__: model
-        for model in apps.get_app_config(associated_app).get_models()
-    }
-
-    # Find the closest match in models
-    matched_model = get_close_matches(normalized_name, app_models.keys(), n=1)
-
-    return app_models.get(matched_model[0]) if matched_model else None
+    """Resolve a model class from a doctype or model name, or return None."""
+    return model_resolver.resolve(model_name)
 
 
 def to_titlecase_no_space(input_str):
@@ -92,6 +39,7 @@ class DataUploadSerializer(serializers.Serializer):
     file = serializers.FileField(required=False)
     data = serializers.ListField(child=serializers.DictField(), required=False)
     model_name = serializers.CharField()
+    background = serializers.BooleanField(required=False, default=False)
 
     # Ensure at least one of `file` or `data` is provided
     def validate(self, data):
@@ -118,6 +66,7 @@ class BulkDeleteSerializer(serializers.Serializer):
         child=serializers.CharField(),  # Changed to CharField to accept any type of ID
         allow_empty=False,
     )
+    background = serializers.BooleanField(required=False, default=False)
 
 
 # View for importing data from CSV, Excel, TXT, or JSON
@@ -136,81 +85,51 @@ class DataImportAPIView(APIView):
                     {"error": "Invalid model name"}, status=status.HTTP_400_BAD_REQUEST
                 )
 
-            data_list = []
+            if serializer.validated_data["background"]:
+                return self.queue_import(request, model, file, json_data)
 
-            # If file is provided, read it
-            if file:
-                file_extension = file.name.split(".")[-1].lower()
-                if file_extension == "csv":
-                    df = pd.read_csv(file)
-                elif file_extension in ["xls", "xlsx"]:
-                    df = pd.read_excel(file)
-                elif file_extension == "txt":
-                    df = pd.read_csv(
-                        file, delimiter="\t"
-                    )  # Assuming tab-separated for TXT
+            importer = DataImporter(model)
+            try:
+                # Files are streamed chunk by chunk; JSON data is already in memory
+                if file:
+                    chunks = importer.iter_file_chunks(file, file.name.split(".")[-1])
                 else:
-                    return Response(
-                        {"error": "Unsupported file format"},
-                        status=status.HTTP_400_BAD_REQUEST,
-                    )
-
-                # Normalize the headers
-                df.columns = [normalize_header(col) for col in df.columns]
-
-                # Convert DataFrame rows to dict
-                data_list = df.to_dict(orient="records")
-
-            # If JSON data is provided, use it directly
-            elif json_data:
-                data_list = json_data
-
-            # Get the model fields
-            model_fields = [f.name for f in model._meta.fields]
-
-            # Filter columns that match model fields
-            valid_columns = [col for col in data_list[0].keys() if col in model_fields]
-            if not valid_columns:
-                return Response(
-                    {
-                        "error": "No valid fields found in the data matching model fields"
-                    },
-                    status=status.HTTP_400_BAD_REQUEST,
-                )
-
-            errors = []
-            records = 0  # Count of successfully imported records
-
-            # Iterate over rows and create objects
-            for data in data_list:
-                try:
-                    data = {col: data[col] for col in valid_columns}
-
-                    # Check if 'id' exists in the data, use update_or_create for each record
-                    if "id" in data:
-                        # Update the record if it exists, otherwise create a new one
-                        model.objects.update_or_create(id=data["id"], defaults=data)
-                    else:
-                        # Create a new record without specifying 'id'
-                        obj = model(**data)
-                        obj.save()  # Save the record individually
-
-                    records += 1  # Increment successfully imported record count
-                except Exception as e:
-                    errors.append(
-                        {"data": data, "error": str(e)}  # Store the error message
-                    )
+                    chunks = importer.iter_data_chunks(json_data)
+                result = importer.run(chunks)
+            except (UnsupportedFileFormat, NoValidColumnsError) as e:
+                return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
             return Response(
                 {
-                    "success": f"{records} records imported successfully",
-                    "errors": errors if errors else None,  # Return errors if any
+                    "success": f"{result.imported} records imported successfully",
+                    "errors": result.errors if result.errors else None,
+                    "summary": result.as_dict(),
                 },
                 status=status.HTTP_200_OK,
             )
         else:
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    def queue_import(self, request, model, file, json_data):
+        """
+        Store the upload as a data job for the `run_data_jobs` worker and
+        return it straight away; progress is polled on `core/data_job/<id>/`.
+        """
+        if file and file.name.split(".")[-1].lower() not in SUPPORTED_EXTENSIONS:
+            return Response(
+                {"error": "Unsupported file format"}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        job = submit_job(
+            "import",
+            model,
+            using=router.db_for_write(model),
+            file=file,
+            payload={"data": json_data} if json_data else None,
+            owner=request.user if request.user.is_authenticated else None,
+        )
+        return Response(DataJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+
 
 class BulkDeleteAPIView(APIView):
     def post(self, request, *args, **kwargs):
@@ -221,64 +140,43 @@ class BulkDeleteAPIView(APIView):
 
             # Get the model by model name
             model = get_model_by_name(model_name)
-            print(model_name)
             if not model:
                 return Response(
                     {"error": "Invalid model name"}, status=status.HTTP_400_BAD_REQUEST
                 )
 
-            # Function to delete a single record
-            def delete_record(record_id):
-                try:
-                    record = model.objects.get(id=record_id)
-                    if model_name == "Document":
-
-                        def run_subprocess_thread():
-                            run_subprocess(
-                                [
-                                    "3plug",
-                                    "dropdoc",
-                                    "--app",
-                                    record.app.name,
-                                    "--module",
-                                    record.module.name,
-                                    record.name,
-                                ],
-                                "Document deleted successfully",
-                                "Failed to delete document",
-                            )
-
-                        subprocess_thread = threading.Thread(
-                            target=run_subprocess_thread
-                        )
-                        subprocess_thread.start()
-                        subprocess_thread.join()  # Ensure subprocess completes
-
-                    record.delete()
-                    return True
-                except Exception as e:
-                    return str(e)
+            if serializer.validated_data["background"]:
+                return self.queue_delete(request, model, ids)
 
-            # Perform the bulk delete using threading
-            results = []
-            with ThreadPoolExecutor() as executor:
-                futures = [
-                    executor.submit(delete_record, record_id) for record_id in ids
-                ]
-                for future in futures:
-                    results.append(future.result())
-
-            # Check for errors in the results
-            errors = [result for result in results if result is not True]
-            if errors:
-                print(errors)
+            deleter = BulkDeleter(model).run(ids)
+            if deleter.errors:
                 return Response(
-                    {"message": "Some records could not be deleted", "errors": errors},
+                    {
+                        "message": "Some records could not be deleted",
+                        "deleted": deleter.deleted,
+                        "errors": deleter.errors,
+                    },
                     status=status.HTTP_207_MULTI_STATUS,
                 )
 
             return Response(
-                {"message": "Records deleted successfully"}, status=status.HTTP_200_OK
+                {"message": "Records deleted successfully", "deleted": deleter.deleted},
+                status=status.HTTP_200_OK,
             )
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    def queue_delete(self, request, model, ids):
+        """
+        Store the ids as a data job for the `run_data_jobs` worker, so large
+        deletes and their cascades run outside the request; progress is
+        polled on `core/data_job/<id>/`.
+        """
+        job = submit_job(
+            "delete",
+            model,
+            using=router.db_for_write(model),
+            payload={"ids": ids},
+            owner=request.user if request.user.is_authenticated else None,
+        )
+        return Response(DataJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
@@ -0,0 +1,28 @@
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from core.views.template import GenericViewSet
+from core.models.data_job import DataJob
+from core.filters.data_job import DataJobFilter
+from core.serializers.data_job import DataJobSerializer
+from core.permissions import HasGroupPermission
+
+
+class DataJobViewSet(GenericViewSet):
+    """
+    Read-only access to queued and finished data jobs, so clients can poll
+    progress. Jobs are submitted through the data import and bulk delete
+    endpoints.
+    """
+
+    queryset = DataJob.objects.all().order_by("-created")
+    filterset_class = DataJobFilter
+    permission_classes = [HasGroupPermission]
+    serializer_class = DataJobSerializer
+    http_method_names = ["get", "head", "options"]
+
+    @action(detail=True, methods=["get"])
+    def errors(self, request, pk=None):
+        """Return the row errors recorded by a job."""
+        job = self.get_object()
+        return Response({"error": job.error, "errors": job.errors or []})
@@ -0,0 +1,37 @@
+from core.utils.doctype_registry import doctype_registry
+from core.utils.email import email_renderer
+from core.utils.notifications import notification_stats, outbox_summary
+from core.utils.permission_cache import permission_cache
+from core.utils.search_index import search_index
+from core.utils.tenant_connections import tenant_connections
+from core.utils.tenant_index import tenant_index
+from rest_framework import status
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+
+class DiagnosticsAPIView(APIView):
+    """
+    Reports the state of the in-process caches so their effect can be observed
+    under load.
+    """
+
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(
+            {
+                "doctype_registry": doctype_registry.stats(),
+                "tenant_index": tenant_index.stats(),
+                "tenant_connections": tenant_connections.stats(),
+                "search_index": search_index.stats(),
+                "permission_cache": permission_cache.stats(),
+                "email_renderer": email_renderer.stats(),
+                "notifications": {
+                    "dispatcher": notification_stats.stats(),
+                    "outbox": outbox_summary(),
+                },
+            },
+            status=status.HTTP_200_OK,
+        )
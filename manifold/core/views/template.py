@@ -1,15 +1,26 @@
 import ast
 
 from django.conf import settings
-from django.db import models
-from django.db.models import Q
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
+from django.db.models import OuterRef, Q, Subquery
+from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import status, viewsets
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 
+from ..signals import generate_name_for_model
 from ..utils.data_validation import validate_serializer_data
 from ..utils.get_model_details import get_file_content
+from ..utils.pagination import (
+    COUNT_MODES,
+    KeysetPaginator,
+    count_queryset,
+)
+from ..utils.query_optimizer import optimize_queryset
+from ..utils.search_index import search_index
+from ..utils.series_allocator import series_allocator
 
 
 import traceback
@@ -65,6 +76,72 @@ class GenericViewSet(viewsets.ModelViewSet):
 
     permission_classes = [AllowAny]
     filter_backends = [DjangoFilterBackend]
+    bulk_create_mode = False
+    pagination_mode = "page"
+    search_results = None
+    search_truncated = False
+
+    def get_queryset(self):
+        """
+        Adds the `select_related`/`prefetch_related` lookups the serializer
+        needs for list and retrieve, so serialization costs a fixed number of
+        queries per page instead of a few per row.
+        """
+        queryset = super().get_queryset()
+        if self.action == "list":
+            queryset = optimize_queryset(queryset, self.get_serializer_class())
+        elif self.action == "retrieve":
+            fields, _ = self.get_sparse_fields()
+            queryset = optimize_queryset(
+                queryset,
+                self.get_serializer_class(),
+                detail=True,
+                expand=self.get_expand(),
+                fields=fields,
+            )
+        return queryset
+
+    def _get_list_param(self, name):
+        """
+        Reads a comma separated query parameter, returning None when absent.
+        """
+        if name not in self.request.query_params:
+            return None
+        value = self.request.query_params.get(name) or ""
+        return [item.strip() for item in value.split(",") if item.strip()]
+
+    def get_expand(self):
+        """
+        Relations to expand in a detail response (`?expand=customer,items`).
+
+        Returns:
+            frozenset or None: None when the parameter is absent, in which case
+            every relation is expanded.
+        """
+        expand = self._get_list_param("expand")
+        return None if expand is None else frozenset(expand)
+
+    def get_sparse_fields(self):
+        """
+        Fields to include in a detail response (`?fields=name,customer.name`).
+        Dotted names select fields of an expanded relation.
+
+        Returns:
+            tuple: (frozenset of top level field names or None when the
+            parameter is absent, dict of relation name to nested field names).
+        """
+        requested = self._get_list_param("fields")
+        if requested is None:
+            return None, {}
+
+        fields = {"id"}
+        nested = {}
+        for name in requested:
+            field_name, _, nested_name = name.partition(".")
+            fields.add(field_name)
+            if nested_name:
+                nested.setdefault(field_name, set()).add(nested_name)
+        return frozenset(fields), nested
 
     def load_model_config(self):
         """
@@ -120,9 +197,14 @@ class GenericViewSet(viewsets.ModelViewSet):
         page_length = query_params.pop("page_length", [25])[0]
         sort_field = query_params.pop("_sort_field", ["modified"])[0]
         sort_order = query_params.pop("_sort_order", ["desc"])[0]
+        cursor = query_params.pop("cursor", [None])[0]
+        pagination = query_params.pop("_pagination", [self.pagination_mode])[0]
+        count_mode = query_params.pop("_count", [None])[0]
 
         # Apply filters
         filtered_queryset = self.apply_filters(self.get_queryset(), query_params)
+        # Search results keep their relevance order unless a sort is requested
+        ranked = "_sort_field" not in request.GET and self.search_results is not None
 
         if sort_field or sort_order:
             try:
@@ -161,6 +243,19 @@ class GenericViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
+        if pagination == "cursor" or cursor is not None:
+            return self.cursor_paginated_response(
+                filtered_queryset,
+                sort_field,
+                sort_order.lower() == "desc",
+                page_length or 25,
+                cursor,
+                count_mode or "estimate",
+            )
+
+        if ranked:
+            return self.ranked_paginated_response(filtered_queryset, page, page_length)
+
         paginated_queryset, total, total_pages, current_page = self.paginate_queryset(
             filtered_queryset, page, page_length
         )
@@ -178,6 +273,45 @@ class GenericViewSet(viewsets.ModelViewSet):
                 "total": total,
                 "total_pages": total_pages,
                 "current_page": current_page,
+                **self.search_flags(),
+            }
+        )
+
+    def cursor_paginated_response(
+        self, queryset, sort_field, descending, page_length, cursor, count_mode
+    ):
+        """
+        Lists one page in cursor mode, enabled per viewset with
+        `pagination_mode = "cursor"` or per request with `_pagination=cursor` or
+        a `cursor` parameter. Pages are fetched by keyset on
+        (`_sort_field`, id) and linked with opaque `next`/`previous` tokens.
+        `_count` selects how `total` is computed: `estimate` (default),
+        `exact` or `none`.
+        """
+        if count_mode not in COUNT_MODES:
+            return Response(
+                {"error": f"Invalid _count. Use one of {', '.join(COUNT_MODES)}."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        paginator = KeysetPaginator(queryset, sort_field, descending, page_length)
+        try:
+            rows, next_cursor, previous_cursor = paginator.page(cursor)
+        except (ValueError, ValidationError):
+            return Response(
+                {"error": "Invalid cursor."}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        total, estimated = count_queryset(queryset, count_mode)
+        serializer = self.get_serializer(rows, many=True)
+        return Response(
+            {
+                "data": serializer.data,
+                "next": next_cursor,
+                "previous": previous_cursor,
+                "total": total,
+                "total_estimated": estimated,
+                **self.search_flags(),
             }
         )
 
@@ -207,30 +341,7 @@ class GenericViewSet(viewsets.ModelViewSet):
             del filter_kwargs[key]
 
         if search_query:
-            config_data = self.load_model_config()
-            search_fields = config_data.get("search_fields", [])
-
-            # If search_fields is a string, split it into a list
-            if isinstance(search_fields, str):
-                search_fields = [field.strip() for field in search_fields.split(",")]
-
-            # Always include 'id' and 'title_field' in search by default
-            default_search_fields = ["id", config_data.get("title_field", "")]
-
-            # Combine default search fields with the model-specific ones
-            search_fields = default_search_fields + search_fields
-
-            if search_fields:
-                search_conditions = Q()
-                for field in search_fields:
-                    if field:  # Ensure that field is not empty
-                        # Check if the field is a ForeignKey and adjust the lookup
-                        if "ForeignKey" in str(
-                            self.queryset.model._meta.get_field(field).__class__
-                        ):
-                            field = f"{field}__id"
-                        search_conditions |= Q(**{f"{field}__icontains": search_query})
-                queryset = queryset.filter(search_conditions)
+            queryset = self.apply_search(queryset, search_query)
 
         try:
             return queryset.filter(**filter_kwargs)
@@ -238,6 +349,73 @@ class GenericViewSet(viewsets.ModelViewSet):
             print(f"Filter error: {e}")
             return queryset
 
+    def apply_search(self, queryset, search_query):
+        """
+        Filters the queryset by `search_query` over the `id`, `title_field`
+        and `search_fields` of the model's configuration.
+
+        Doctypes with a built search index are matched word by word (as
+        prefixes) through the index, and the ids of the matches are kept best
+        first in `self.search_results`; others fall back to an OR of
+        `icontains` over the same fields.
+        """
+        model = self.queryset.model
+        results, self.search_truncated = search_index.search(
+            model, search_query, queryset.db
+        )
+        if results is None:
+            search_conditions = Q()
+            for lookup in search_index.get_plan(model).lookups:
+                search_conditions |= Q(**{f"{lookup}__icontains": search_query})
+            return queryset.filter(search_conditions)
+
+        self.search_results = [object_id for object_id, _ in results]
+        return queryset.filter(pk__in=self.search_results)
+
+    def ranked_paginated_response(self, queryset, page, page_length):
+        """
+        Paginates search results in relevance order. The matches that pass the
+        other filters are read as ids, and only the requested page is loaded.
+        """
+        matching = {str(pk) for pk in queryset.values_list("pk", flat=True)}
+        ordered = [pk for pk in self.search_results if pk in matching]
+
+        total = max(len(ordered), 1)
+        if page_length == 0:
+            total_pages, page_ids = 1, ordered
+            page = 1
+        else:
+            total_pages = (total + page_length - 1) // page_length
+            if page > total_pages:
+                return Response(
+                    {"error": f"Page out of range. Page {page} of {total_pages}."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            page_ids = ordered[(page - 1) * page_length : page * page_length]
+
+        position = {pk: index for index, pk in enumerate(page_ids)}
+        instances = sorted(
+            queryset.filter(pk__in=page_ids), key=lambda obj: position[str(obj.pk)]
+        )
+        serializer = self.get_serializer(instances, many=True)
+        return Response(
+            {
+                "data": serializer.data,
+                "total": total,
+                "total_pages": total_pages,
+                "current_page": page,
+                **self.search_flags(),
+            }
+        )
+
+    def search_flags(self):
+        """
+        Flags a response whose search matched more records than
+        `SEARCH_MAX_RESULTS`, so its data and total cover only the best
+        matches.
+        """
+        return {"truncated": True} if self.search_truncated else {}
+
     @handle_errors
     def destroy(self, request, *args, **kwargs):
         instance = self.get_object()
@@ -251,12 +429,222 @@ class GenericViewSet(viewsets.ModelViewSet):
         return self._create_single_instance(request.data)
 
     def _create_multiple_instances(self, data_list):
+        if self._use_bulk_create():
+            return self._bulk_create_instances(data_list)
+
         created_data = []
         for item_data in data_list:
             created_instance = self._create_instance(item_data)
             created_data.append(created_instance)
         return Response(created_data, status=status.HTTP_201_CREATED)
 
+    def _use_bulk_create(self):
+        """
+        Bulk mode is enabled per viewset with `bulk_create_mode = True` or per
+        request with `?bulk=1`. It inserts with `bulk_create`, so model `save()`
+        overrides and save signals other than the naming signal are not run.
+        """
+        bulk = self.request.query_params.get("bulk", "")
+        return self.bulk_create_mode or bulk.lower() in ["true", "1", "yes"]
+
+    def _bulk_create_instances(self, data_list):
+        """
+        Creates all rows of a list payload with a fixed number of queries:
+        one `in_bulk` per related model, batched naming, chunked `bulk_create`
+        and one insert per many-to-many through table, all in one transaction.
+        Rows that fail are reported by their index instead of aborting the batch.
+        """
+        model = self.queryset.model
+        batch_size = getattr(settings, "BULK_CREATE_BATCH_SIZE", 500)
+        errors = []
+
+        rows = []
+        for index, item_data in enumerate(data_list):
+            item_data = dict(item_data)
+            rows.append(
+                (
+                    index,
+                    item_data,
+                    self._extract_pk_fields(item_data),
+                    self._extract_m2m_fields(item_data),
+                )
+            )
+
+        related_instances = self._bulk_resolve_related(rows)
+
+        with transaction.atomic():
+            instances = []
+            for index, item_data, pk_fields, m2m_fields in rows:
+                try:
+                    instance = self._build_bulk_instance(
+                        item_data, pk_fields, related_instances
+                    )
+                    m2m_values = self._resolve_bulk_m2m(m2m_fields, related_instances)
+                    instances.append((index, instance, m2m_values))
+                except Exception as e:
+                    errors.append({"index": index, "error": str(e)})
+
+            def name_instances():
+                for _, instance, _ in instances:
+                    generate_name_for_model(model, instance)
+
+            with series_allocator.batch(series_allocator.count(name_instances)):
+                name_instances()
+
+            created = []
+            for start in range(0, len(instances), batch_size):
+                chunk = instances[start : start + batch_size]
+                created.extend(self._bulk_insert_chunk(model, chunk, errors))
+
+            self._bulk_set_m2m(model, created)
+
+        serializer = self.get_serializer(
+            [instance for _, instance, _ in created], many=True
+        )
+        errors.sort(key=lambda error: error["index"])
+        return Response(
+            {
+                "data": serializer.data,
+                "created": len(created),
+                "errors": errors or None,
+            },
+            status=status.HTTP_207_MULTI_STATUS if errors else status.HTTP_201_CREATED,
+        )
+
+    def _bulk_resolve_related(self, rows):
+        """
+        Loads every referenced FK and m2m instance with one `in_bulk` per
+        related model. Returns a mapping of related model to {str(pk): instance}.
+        """
+        model_meta = self.queryset.model._meta
+        ids_by_model = {}
+
+        for _, _, pk_fields, m2m_fields in rows:
+            for field_name, value in pk_fields.items():
+                related_model = model_meta.get_field(field_name).related_model
+                if isinstance(value, dict):
+                    value = value.get("id")
+                if value not in [None, ""]:
+                    ids_by_model.setdefault(related_model, set()).add(str(value))
+
+            for field_name, values in m2m_fields.items():
+                related_model = model_meta.get_field(field_name).related_model
+                for value in values if isinstance(values, list) else []:
+                    if isinstance(value, dict):
+                        value = value.get("id")
+                    if value not in [None, ""]:
+                        ids_by_model.setdefault(related_model, set()).add(str(value))
+
+        return {
+            related_model: {
+                str(pk): instance
+                for pk, instance in related_model.objects.in_bulk(list(ids)).items()
+            }
+            for related_model, ids in ids_by_model.items()
+        }
+
+    def _get_bulk_related(self, related_model, value, related_instances):
+        if isinstance(value, dict) and "id" not in value:
+            serialized_data = self._serialize_nested_data(related_model, value)
+            # Savepoint, so a failed insert does not break the bulk transaction
+            with transaction.atomic():
+                return related_model.objects.create(**serialized_data)
+
+        pk = str(value["id"] if isinstance(value, dict) else value)
+        related_instance = related_instances.get(related_model, {}).get(pk)
+        if related_instance is None:
+            raise related_model.DoesNotExist(
+                f"{related_model.__name__} with ID {pk} does not exist."
+            )
+        return related_instance
+
+    def _build_bulk_instance(self, data, pk_fields, related_instances):
+        """
+        Validates one row through the serializer and builds an unsaved instance.
+        """
+        model = self.queryset.model
+        serializer = self.get_serializer(data=data)
+        updated_serializer = validate_serializer_data(serializer, data)
+        updated_serializer.is_valid(raise_exception=True)
+
+        concrete_fields = {}
+        for field in model._meta.concrete_fields:
+            concrete_fields[field.name] = field.name
+            concrete_fields[field.attname] = field.attname
+
+        values = {
+            concrete_fields[key]: value
+            for key, value in updated_serializer.validated_data.items()
+            if key in concrete_fields
+        }
+        for field_name, value in pk_fields.items():
+            if value in [None, ""]:
+                values[field_name] = None
+                continue
+            related_model = model._meta.get_field(field_name).related_model
+            values[field_name] = self._get_bulk_related(
+                related_model, value, related_instances
+            )
+
+        return model(**values)
+
+    def _resolve_bulk_m2m(self, m2m_fields, related_instances):
+        m2m_values = {}
+        for field_name, related_data in m2m_fields.items():
+            if not isinstance(related_data, list):
+                raise ValueError(
+                    f"Invalid data type for field '{field_name}': {related_data}"
+                )
+            related_model = self.queryset.model._meta.get_field(
+                field_name
+            ).related_model
+            m2m_values[field_name] = [
+                self._get_bulk_related(related_model, item, related_instances)
+                for item in related_data
+            ]
+        return m2m_values
+
+    def _bulk_insert_chunk(self, model, chunk, errors):
+        """
+        Inserts a chunk with one `bulk_create`. If the chunk is rejected by the
+        database, its rows are retried one by one so only the failing rows are
+        reported.
+        """
+        try:
+            with transaction.atomic():
+                model.objects.bulk_create([instance for _, instance, _ in chunk])
+            search_index.reindex(model, [instance.pk for _, instance, _ in chunk])
+            return chunk
+        except Exception:
+            pass
+
+        created = []
+        for index, instance, m2m_values in chunk:
+            try:
+                with transaction.atomic():
+                    model.objects.bulk_create([instance])
+                created.append((index, instance, m2m_values))
+            except Exception as e:
+                errors.append({"index": index, "error": str(e)})
+        search_index.reindex(model, [instance.pk for _, instance, _ in created])
+        return created
+
+    def _bulk_set_m2m(self, model, created):
+        """
+        Writes all many-to-many links with one insert per through table.
+        """
+        for field in model._meta.many_to_many:
+            through = field.remote_field.through
+            source = f"{field.m2m_field_name()}_id"
+            target = f"{field.m2m_reverse_field_name()}_id"
+            links = [
+                through(**{source: instance.pk, target: related.pk})
+                for _, instance, m2m_values in created
+                for related in m2m_values.get(field.name, [])
+            ]
+            if links:
+                through.objects.bulk_create(links, ignore_conflicts=True)
+
     def _create_single_instance(self, data):
         created_instance = self._create_instance(data)
         return Response(created_instance, status=status.HTTP_201_CREATED)
@@ -384,32 +772,70 @@ class GenericViewSet(viewsets.ModelViewSet):
 
     @handle_errors
     def retrieve(self, request, *args, **kwargs):
-        instance = self.get_object()
-        model_fields = [field.name for field in self.queryset.model._meta.fields]
-        sort_field = "modified" if "modified" in model_fields else "id"
-        queryset = self.get_queryset().order_by(sort_field)
-
-        next_instance = queryset.filter(
-            **{f"{sort_field}__lt": getattr(instance, sort_field)}
-        ).last()
-        prev_instance = queryset.filter(
-            **{f"{sort_field}__gt": getattr(instance, sort_field)}
-        ).first()
-
-        prev_id = prev_instance.id if prev_instance else None
-        next_id = next_instance.id if next_instance else None
-
+        """
+        Returns the instance with `_prev` (the next newer record) and `_next`
+        (the next older one) by `modified`, or `id` for models without it.
+
+        The neighbours are correlated subqueries on the instance's own row, so
+        the record and its navigation cost a single query; prefetches for
+        expanded many-to-many relations add one each. `?expand=` limits the
+        relations serialized in full (all of them when absent) and `?fields=`
+        limits the fields returned.
+        """
+        instance = self.get_retrieve_object()
         data = self._serialize_retrieve_instance(instance)
-        data["_prev"] = prev_id
-        data["_next"] = next_id
+        data["_prev"] = instance._prev_id
+        data["_next"] = instance._next_id
 
         return Response(data)
 
+    def get_retrieve_object(self):
+        """
+        `get_object`, with the ids of the neighbouring records annotated as
+        `_prev_id` and `_next_id`.
+        """
+        model_fields = [field.name for field in self.queryset.model._meta.fields]
+        sort_field = "modified" if "modified" in model_fields else "id"
+        neighbours = (
+            self.get_queryset()
+            .select_related(None)
+            .prefetch_related(None)
+            .values("pk")
+        )
+        sort_value = OuterRef(sort_field)
+        queryset = self.filter_queryset(self.get_queryset()).annotate(
+            _prev_id=Subquery(
+                neighbours.filter(**{f"{sort_field}__gt": sort_value}).order_by(
+                    sort_field, "pk"
+                )[:1]
+            ),
+            _next_id=Subquery(
+                neighbours.filter(**{f"{sort_field}__lt": sort_value}).order_by(
+                    f"-{sort_field}", "-pk"
+                )[:1]
+            ),
+        )
+
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        instance = get_object_or_404(
+            queryset, **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        )
+        self.check_object_permissions(self.request, instance)
+        return instance
+
     def _serialize_retrieve_instance(self, instance):
         """
-        Serializes the instance, including all fields from relational models.
+        Serializes the instance, including all fields from the relational
+        models selected by `?expand=` and the fields selected by `?fields=`.
         """
+        expand = self.get_expand()
+        fields, nested_fields = self.get_sparse_fields()
+
         serializer = self.get_serializer(instance)
+        if fields is not None:
+            for field_name in list(serializer.fields):
+                if field_name not in fields:
+                    serializer.fields.pop(field_name)
         serialized_data = serializer.data
 
         # Extract relational fields
@@ -423,50 +849,65 @@ class GenericViewSet(viewsets.ModelViewSet):
 
             if related_model.__name__ in ["Token", "Session"]:
                 continue  # Skip serialization for Token and Session models
+            if expand is not None and field_name not in expand:
+                continue  # Left as the raw id(s) from the serializer
+            if fields is not None and field_name not in fields:
+                continue
+            only = nested_fields.get(field_name)
 
             if isinstance(field, models.ForeignKey):
                 # Serialize ForeignKey fields with all fields from the related instance
                 related_instance = getattr(instance, field_name, None)
                 if related_instance:
                     serialized_data[field_name] = (
-                        self._serialize_retrieve_related_instance(related_instance)
+                        self._serialize_retrieve_related_instance(
+                            related_instance, only
+                        )
                     )
 
             elif isinstance(field, models.ManyToManyField):
                 # Serialize ManyToMany fields with all fields from related instances
                 related_instances = getattr(instance, field_name).all()
                 serialized_data[field_name] = [
-                    self._serialize_retrieve_related_instance(related_instance)
+                    self._serialize_retrieve_related_instance(related_instance, only)
                     for related_instance in related_instances
                 ]
 
         return serialized_data
 
-    def _serialize_retrieve_related_instance(self, related_instance):
+    def _serialize_retrieve_related_instance(self, related_instance, only=None):
         """
         Serializes all fields of a related instance, including 'id' for nested relations.
+        `only` restricts the output to the given field names (and 'id').
         """
         related_data = {}
         for field in related_instance._meta.get_fields():
             field_name = field.name
-            value = getattr(related_instance, field_name, None)
+            if only is not None and field_name != "id" and field_name not in only:
+                continue
+            if field.is_relation and (field.many_to_many or field.one_to_many):
+                continue  # Many-valued relations are never included
+            if field.is_relation and field.related_model.__name__ in ["Token", "Session"]:
+                continue  # Skip serialization for Token and Session models
+
+            if field.is_relation and field.concrete:
+                # Read the raw id so the nested object is never loaded
+                value = getattr(related_instance, field.attname, None)
+            else:
+                value = getattr(related_instance, field_name, None)
 
             # Exclude class-like fields (customize this condition as needed)
             if isinstance(value, list) or isinstance(value, dict):
                 continue
 
             if field.is_relation:
-                # Skip serialization for Token and Session models
-                if field.related_model.__name__ in ["Token", "Session"]:
-                    continue
-
                 # Include only the 'id' for nested relations
                 if isinstance(value, models.Model):
                     serialized_value = (
                         value.id
                     )  # Serialize related model with only its 'id'
-                elif hasattr(value, "all"):  # Handle ManyToMany or reverse relations
-                    serialized_value = None
+                elif field.concrete:
+                    serialized_value = value  # Already the raw id
                 else:
                     serialized_value = None
             else:
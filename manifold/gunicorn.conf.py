@@ -0,0 +1,59 @@
+"""
+Gunicorn settings for serving manifold in production.
+
+Used by `3plug start prod` and the Supervisor program written by
+`3plug deploy`. Every value can be overridden from the environment.
+
+Workers are preloaded, so `kill -HUP` on the master (or
+`supervisorctl signal HUP <project>_django`) replaces the workers gracefully
+but keeps the code loaded at start; deploy new code with a restart.
+"""
+
+import multiprocessing
+import os
+
+
+def _int_env(name, default):
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8000")
+
+# (2 x cores) + 1 sync workers, unless WEB_CONCURRENCY says otherwise
+workers = _int_env("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1)
+threads = _int_env("GUNICORN_THREADS", 1)
+worker_class = "gthread" if threads > 1 else "sync"
+
+# Load Django once in the master and fork the workers from it
+preload_app = True
+
+# Recycle workers now and then so slow leaks never pile up; the jitter keeps
+# them from restarting all at once
+max_requests = _int_env("GUNICORN_MAX_REQUESTS", 1000)
+max_requests_jitter = _int_env("GUNICORN_MAX_REQUESTS_JITTER", 100)
+
+timeout = _int_env("GUNICORN_TIMEOUT", 60)
+graceful_timeout = _int_env("GUNICORN_GRACEFUL_TIMEOUT", 30)
+keepalive = _int_env("GUNICORN_KEEPALIVE", 5)
+
+accesslog = os.environ.get("GUNICORN_ACCESS_LOG", "-")
+errorlog = os.environ.get("GUNICORN_ERROR_LOG", "-")
+loglevel = os.environ.get("GUNICORN_LOG_LEVEL", "info")
+
+
+def when_ready(server):
+    # Preloading runs TenantMiddleware, which pre-warms connections in the
+    # master; close them so no worker inherits a shared socket
+    from django.db import connections
+
+    connections.close_all()
+
+
+def post_fork(server, worker):
+    # Each worker opens its own connections to the busiest databases
+    from core.utils.tenant_connections import tenant_connections
+
+    tenant_connections.prewarm()
@@ -37,7 +37,7 @@ SECRET_KEY = config(
 )
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+DEBUG = config("DEBUG", default=True, cast=bool)
 
 ALLOWED_HOSTS = ["*"]
 
@@ -82,6 +82,7 @@ INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + CUSTOM_APPS
 MIDDLEWARE = [
     "core.middleware.TenantMiddleware",
     "django.middleware.security.SecurityMiddleware",
+    "whitenoise.middleware.WhiteNoiseMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "allauth.account.middleware.AccountMiddleware",
@@ -157,6 +158,17 @@ MEDIA_URL = "/media/"
 STATIC_ROOT = os.path.join(BASE_DIR, "static/")
 MEDIA_ROOT = os.path.join(BASE_DIR.parent, "sites")
 
+# Static files are served by WhiteNoise from STATIC_ROOT, compressed and with
+# hashed names so they can be cached forever; run `collectstatic` on deploy
+STORAGES = {
+    "default": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+    },
+    "staticfiles": {
+        "BACKEND": "whitenoise.storage.CompressedManifestStaticFilesStorage",
+    },
+}
+
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
@@ -263,10 +275,25 @@ SMS_IS_FLASH = True
 
 CRONJOBS = [
     (
-        "0 * * * *",
+        "* * * * *",
         "core.crons.send_reminder_notifications",
         f">> {os.path.join(BASE_DIR, 'core', 'logs','send_upcoming_event_notifications.log')} 2>&1",
     ),
+    (
+        "0 * * * *",
+        "core.crons.refresh_reminder_schedules",
+        f">> {os.path.join(BASE_DIR, 'core', 'logs','send_upcoming_event_notifications.log')} 2>&1",
+    ),
+    (
+        "* * * * *",
+        "core.crons.send_queued_notifications",
+        f">> {os.path.join(BASE_DIR, 'core', 'logs','send_upcoming_event_notifications.log')} 2>&1",
+    ),
+    (
+        "30 2 * * *",
+        "core.crons.prune_sent_notifications",
+        f">> {os.path.join(BASE_DIR, 'core', 'logs','send_upcoming_event_notifications.log')} 2>&1",
+    ),
 ]
 
 
@@ -278,6 +305,12 @@ CRONJOBS = [
 default_site = "default"
 common_config_file = os.path.join(SITE_PATH, "common_site_config.json")  # Use os.path.join
 
+# Seconds a tenant connection stays open for reuse across requests (0 closes it
+# after every request). Routing is request-local, so persistent connections are
+# safe; override with "conn_max_age" in common_site_config.json or CONN_MAX_AGE
+# in a site's database config.
+TENANT_CONN_MAX_AGE = 60
+
 # Check if common_config_file exists and load it
 if os.path.exists(common_config_file):
     try:
@@ -285,6 +318,8 @@ if os.path.exists(common_config_file):
             common_config = json.load(f)
             if isinstance(common_config, dict) and "default_site" in common_config:
                 default_site = common_config["default_site"]
+            if isinstance(common_config, dict) and "conn_max_age" in common_config:
+                TENANT_CONN_MAX_AGE = common_config["conn_max_age"]
     except json.JSONDecodeError:
         pass
 
@@ -305,6 +340,8 @@ for site_folder in os.listdir(SITE_PATH):
                     and "site_name" in site_config
                     and "database" in site_config
                 ):
+                    site_config["database"].setdefault("CONN_MAX_AGE", TENANT_CONN_MAX_AGE)
+                    site_config["database"].setdefault("CONN_HEALTH_CHECKS", True)
                     DATABASES[site_config["site_name"]] = site_config["database"]
         except json.JSONDecodeError:
             pass
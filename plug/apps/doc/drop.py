@@ -1,6 +1,6 @@
 import os
 import shutil
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 import click
 
@@ -10,7 +10,7 @@ from ...utils.text import to_snake_case
 
 
 @click.command()
-@click.argument("doc_name")
+@click.argument("doc_names", nargs=-1, required=True)
 @click.option("--app", type=str, help="Select the app by number or name.")
 @click.option("--module", type=str, help="Select the module by number or name.")
 @click.option(
@@ -21,18 +21,21 @@ from ...utils.text import to_snake_case
     help="Optional submodule name/number (3plug hierarchy).",
 )
 def dropdoc(
-    doc_name: str, app: Optional[str], module: Optional[str], submodule_name: Optional[str]
+    doc_names: Tuple[str, ...],
+    app: Optional[str],
+    module: Optional[str],
+    submodule_name: Optional[str],
 ) -> None:
     """
-    Delete the specified document folder from the module and remove it from the document list.
+    Delete the specified document folders from the module and remove them from the document list.
+    Several documents of the same module can be dropped at once; the migration runs only once.
 
     Args:
-        doc_name (str): The name of the document folder to delete.
+        doc_names (Tuple[str, ...]): The names of the document folders to delete.
         app (Optional[str]): The app name or number.
         module (Optional[str]): The module name or number.
     """
     # Convert inputs to snake_case
-    doc_name = to_snake_case(doc_name)
     app = to_snake_case(app) if app else None
     module = to_snake_case(module) if module else None
     submodule_name = to_snake_case(submodule_name) if submodule_name else None
@@ -76,6 +79,24 @@ def dropdoc(
 
     module_path = os.path.join(module_base_path, selected_module)
 
+    dropped = [
+        doc_name
+        for doc_name in (to_snake_case(name) for name in doc_names)
+        if _drop_doc_folder(module_path, doc_name, submodule_name)
+    ]
+    if dropped:
+        run_migration(app=selected_app, module=selected_module)
+
+
+def _drop_doc_folder(
+    module_path: str, doc_name: str, submodule_name: Optional[str]
+) -> bool:
+    """
+    Remove one doc folder and its index entries.
+
+    Returns:
+        bool: True if the doc was found and removed.
+    """
     # Path to the doc folder (prefer 3plug hierarchy if submodule is provided/found)
     doc_path = None
     if submodule_name:
@@ -95,7 +116,7 @@ def dropdoc(
     # Check if the doc folder exists
     if doc_path is None and not os.path.exists(legacy_doc_path):
         click.echo(f"Doc '{doc_name}' not found.")
-        return
+        return False
 
     # Remove the doc directory/directories
     if doc_path and os.path.exists(doc_path):
@@ -104,7 +125,7 @@ def dropdoc(
         shutil.rmtree(legacy_doc_path)
 
     _remove_doc_from_indexes(module_path, doc_name, submodule_name)
-    run_migration(app=selected_app, module=selected_module)
+    return True
 
 
 def determine_app_selection(app: Optional[str], apps: List[str]) -> Optional[str]:
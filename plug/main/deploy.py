@@ -7,6 +7,8 @@ import re
 from typing import List, Dict, Optional
 from pathlib import Path
 
+from ..utils.app_server import collect_static, django_server_command
+
 # Constants
 PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
 NGINX_AVAILABLE_DIR = "/etc/nginx/sites-available"
@@ -117,8 +119,10 @@ def get_ports_from_supervisor_conf(project_name: str) -> Dict[str, int]:
     with open(conf_path, "r") as file:
         content = file.read()
 
-        # Extract Django port
-        django_match = re.search(r"command=.+runserver 0\.0\.0\.0:(\d+)", content)
+        # Extract Django port, served by Gunicorn or, in older configs, runserver
+        django_match = re.search(
+            r"command=.+(?:--bind|runserver) 0\.0\.0\.0:(\d+)", content
+        )
         if django_match:
             ports["django_port"] = int(django_match.group(1))
 
@@ -219,12 +223,24 @@ def setup_supervisor(project_name: str, django_port: int, nextjs_port: int) -> N
     if sys.platform.startswith("win"):
         python_executable = os.path.join(venv_path, "Scripts", "python.exe")
 
+    # Gunicorn when the venv has it, else the development server as `start`
+    # falls back, so Supervisor never restarts a missing executable in a loop
+    django_command = " ".join(
+        django_server_command(python_executable, django_port, "prod")
+    )
+
+    # Gunicorn stops gracefully on TERM; give it longer than its
+    # graceful_timeout before Supervisor kills the group
     supervisor_conf = f"""
     [program:{project_name}_django]
-    command={python_executable} manage.py runserver 0.0.0.0:{django_port}
+    command={django_command}
     directory={PROJECT_ROOT}/manifold
     autostart=true
     autorestart=true
+    stopsignal=TERM
+    stopwaitsecs=40
+    stopasgroup=true
+    killasgroup=true
     stderr_logfile={django_log}
     stdout_logfile={django_log}
     user={username}
@@ -241,6 +257,8 @@ def setup_supervisor(project_name: str, django_port: int, nextjs_port: int) -> N
 
     conf_path = os.path.join(SUPERVISOR_CONF_DIR, f"{project_name}.conf")
 
+    collect_static(python_executable, os.path.join(PROJECT_ROOT, "manifold"))
+
     # Write the configuration to /etc/supervisor/conf.d with sudo
     with open(conf_path, "w") as file:
         file.write(supervisor_conf)
@@ -289,6 +307,7 @@ def deploy(project_name: str):
 
         setup_supervisor(project_name, django_port, nextjs_port)
         click.echo(f"Project {project_name} has been deployed and is running on ports Django: {django_port}, Next.js: {nextjs_port}.")
+        click.echo(f"Reload the Django workers gracefully with: supervisorctl signal HUP {project_name}_django")
     except Exception as e:
         click.echo(f"Error during deployment: {e}")
         rollback()
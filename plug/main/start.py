@@ -9,6 +9,7 @@ from typing import List, Optional, Tuple
 
 import click
 
+from ..utils.app_server import collect_static, django_server_command
 from ..utils.config import PROJECT_ROOT, get_all_sites, get_site_config, write_running_ports
 from ..utils.default_site import get_default_site_info
 from ..utils.initialize_django import initialize_django_env
@@ -143,13 +144,16 @@ def start(mode, site_name, all_sites):
 
         initialize_django_env()
 
+        if mode == "prod":
+            collect_static(python_executable, django_path)
+
         startup_errors = []
         process_holder = {"django": None, "nextjs": None}
 
         def launch_django():
             try:
                 process_holder["django"] = run_subprocess(
-                    [python_executable, "manage.py", "runserver", f"0.0.0.0:{django_port}"],
+                    django_server_command(python_executable, django_port, mode),
                     cwd=django_path,
                 )
             except Exception as launch_error:
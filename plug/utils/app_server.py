@@ -0,0 +1,65 @@
+import subprocess
+import sys
+from typing import List
+
+import click
+
+WSGI_APPLICATION = "manifold.wsgi:application"
+GUNICORN_CONFIG = "gunicorn.conf.py"
+
+
+def can_use_gunicorn(python_executable: str) -> bool:
+    """Return True when Gunicorn can serve Django from this interpreter."""
+    if sys.platform.startswith("win"):
+        return False
+    result = subprocess.run(
+        [python_executable, "-c", "import gunicorn"],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    return result.returncode == 0
+
+
+def gunicorn_command(python_executable: str, port: int) -> List[str]:
+    """
+    Return the command serving Django with Gunicorn, configured by
+    manifold/gunicorn.conf.py (workers sized to the cores, preloading and
+    max-requests recycling).
+    """
+    return [
+        python_executable,
+        "-m",
+        "gunicorn",
+        "--config",
+        GUNICORN_CONFIG,
+        "--bind",
+        f"0.0.0.0:{port}",
+        WSGI_APPLICATION,
+    ]
+
+
+def django_server_command(python_executable: str, port: int, mode: str) -> List[str]:
+    """
+    Return the command serving Django: Gunicorn in prod mode, the
+    development server otherwise or where Gunicorn is unavailable.
+    """
+    if mode == "prod":
+        if can_use_gunicorn(python_executable):
+            return gunicorn_command(python_executable, port)
+        click.echo(
+            click.style(
+                "Gunicorn is not available here, falling back to the Django development server.",
+                fg="yellow",
+            )
+        )
+    return [python_executable, "manage.py", "runserver", f"0.0.0.0:{port}"]
+
+
+def collect_static(python_executable: str, django_path: str) -> None:
+    """Gather static files into STATIC_ROOT for WhiteNoise to serve."""
+    click.echo("Collecting static files...")
+    subprocess.run(
+        [python_executable, "manage.py", "collectstatic", "--noinput"],
+        cwd=django_path,
+        check=True,
+    )